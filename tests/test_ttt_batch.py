@@ -0,0 +1,75 @@
+"""
+Test module for ttt_batch.py
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ttt_game.ttt_batch import *
+from ttt_game.ttt_board import *
+
+
+def test_check_win() -> None:
+    """Test that the game state of every board matches TTTBoard.
+    """
+    grids = [[[PLAYERX, PLAYERX, PLAYERX], [PLAYERO, PLAYERO, EMPTY],
+              [EMPTY, EMPTY, EMPTY]],
+             [[PLAYERX, PLAYERX, PLAYERO], [EMPTY, PLAYERO, PLAYERX],
+              [PLAYERO, EMPTY, EMPTY]],
+             [[PLAYERX, PLAYERO, PLAYERX], [PLAYERX, PLAYERO, PLAYERO],
+              [PLAYERO, PLAYERX, PLAYERX]],
+             [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+              [EMPTY, EMPTY, EMPTY]]]
+    boards = [TTTBoard(3, _custom_board=grid) for grid in grids]
+    batch = TTTBatchBoard.from_boards(boards)
+    assert [PLAYERX, PLAYERO, DRAW, EMPTY] == batch.check_win().tolist()
+
+    # lines shorter than the board, in every direction
+    grids = np.zeros((4, 4, 5), dtype=np.int8)
+    grids[0, 1, 1:4] = PLAYERX
+    grids[1, 0:3, 4] = PLAYERO
+    grids[2, [1, 2, 3], [2, 3, 4]] = PLAYERX
+    grids[3, [0, 1, 2], [2, 1, 0]] = PLAYERO
+    batch = TTTBatchBoard(grids, 3)
+    assert [PLAYERX, PLAYERO, PLAYERX, PLAYERO] == batch.check_win().tolist()
+    for board, state in zip(batch.to_boards(), batch.check_win()):
+        assert board.check_win() == state
+
+
+def test_legal_moves() -> None:
+    """Test that only empty squares of unfinished boards can be played.
+    """
+    batch = TTTBatchBoard.empty(3, 3)
+    batch.move(np.array([0, 1, 2]), np.array([0, 1, 2]), PLAYERX)
+    batch.move(0, 0, PLAYERO)
+    assert PLAYERX == batch.get_grids()[0, 0, 0]
+    batch.move(0, 1, PLAYERX, where=np.array([True, False, False]))
+    batch.move(0, 2, PLAYERX, where=np.array([True, False, False]))
+
+    moves = batch.legal_moves()
+    assert not moves[0].any()
+    assert 7 == moves[1].sum()
+    assert not moves[1, 1, 1] and not moves[1, 0, 0]
+    assert [PLAYERO, PLAYERX, PLAYERX] == batch.side_to_move().tolist()
+    assert [3, 1, 1] == batch.count_stones()[0].tolist()
+    assert [0, 1, 1] == batch.count_stones()[1].tolist()
+
+
+def test_boards() -> None:
+    """Test converting between a batch and TTTBoards.
+    """
+    board = TTTBoard(3, None, 4, 3)
+    board.move(1, 3, PLAYERX)
+    board.move(2, 0, PLAYERO)
+    batch = TTTBatchBoard.from_boards([board, TTTBoard(3, None, 4, 3)])
+    assert (2, 3, 4) == batch.get_grids().shape
+    assert (3, 4) == batch.get_size()
+    assert 3 == batch.get_win_length()
+
+    copy = batch.get_board(0)
+    assert str(board) == str(copy)
+    assert board.get_hash() == copy.get_hash()
+    assert 12 == len(batch.to_boards()[1].get_empty_squares())
+
+    with pytest.raises(ValueError):
+        TTTBatchBoard.from_boards([board, TTTBoard(3)])
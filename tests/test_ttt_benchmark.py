@@ -0,0 +1,57 @@
+"""
+Test module for ttt_benchmark.py
+"""
+import pytest
+
+from ttt_game.ttt_benchmark import *
+
+
+def test_run_suite() -> None:
+    """Test that every benchmark of a position is run and measured.
+    """
+    results = run_suite(['3x3-late'], repeats=1)
+    assert {'board.check_win/3x3-late', 'board.clone/3x3-late',
+            'board.get_empty_squares/3x3-late', 'board.move_undo/3x3-late',
+            'search/3x3-late'} == set(results)
+    for result in results.values():
+        assert result['seconds'] > 0
+        assert result['relative'] > 0
+        assert result['peak_bytes'] >= 0
+    assert results['search/3x3-late']['nodes'] > 0
+
+
+def test_compare() -> None:
+    """Test that slower, larger and wider benchmarks are regressions, and
+    that tiny differences in time are not.
+    """
+    baseline = {'search/a': {'seconds': 1.0, 'relative': 10.0,
+                             'peak_bytes': 1000, 'nodes': 50},
+                'board.clone/a': {'seconds': 0.0001, 'relative': 0.001,
+                                  'peak_bytes': 0}}
+    assert [] == compare(baseline, baseline)
+
+    results = {'search/a': {'seconds': 2.0, 'relative': 20.0,
+                            'peak_bytes': 2000, 'nodes': 51},
+               'board.clone/a': {'seconds': 0.0002, 'relative': 0.002,
+                                 'peak_bytes': 0},
+               'search/b': {'seconds': 1.0, 'relative': 1.0,
+                            'peak_bytes': 0, 'nodes': 1}}
+    regressions = compare(results, baseline)
+    assert 3 == len(regressions)
+    assert all(regression.startswith('search/a ')
+               for regression in regressions)
+
+
+def test_results_file(tmp_path) -> None:
+    """Test that results are read back as written, and that results of
+    another version are refused.
+    """
+    path = str(tmp_path / 'results.json')
+    results = {'search/a': {'seconds': 1.0, 'nodes': 5}}
+    write_results(path, results)
+    assert results == load_results(path)
+
+    with open(path, 'w') as results_file:
+        results_file.write('{"version": 0, "benchmarks": {}}')
+    with pytest.raises(ValueError):
+        load_results(path)
@@ -0,0 +1,119 @@
+"""
+Test module for ttt_bitboard.py
+"""
+from ttt_game.ttt_bitboard import *
+from ttt_game.ttt_board import *
+from ttt_game.ttt_computer import get_move
+
+
+def test_clone() -> None:
+    """Test clone method and that alias isn't created with original board.
+    """
+    board = TTTBitBoard(3)
+    clone_board = board.clone()
+
+    board.move(1, 2, PLAYERX)
+    assert PLAYERX == board.get_square(1, 2)
+    assert EMPTY == clone_board.get_square(1, 2)
+
+
+def test_equality() -> None:
+    """Test that boards holding the same position compare equal, however
+    the position was reached.
+    """
+    grid = [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    board = TTTBitBoard(3, grid)
+    assert board == board.clone()
+
+    moved_board = TTTBitBoard(3)
+    moved_board.move(0, 0, PLAYERX)
+    moved_board.move(1, 1, PLAYERO)
+    assert board == moved_board
+    moved_board.move(2, 2, PLAYERX)
+    assert board != moved_board
+
+
+def test_win_masks() -> None:
+    """Test that a board has one win mask per row, column and diagonal.
+    """
+    assert 8 == len(get_win_masks(3))
+    assert 10 == len(get_win_masks(4))
+    assert 0b111 in get_win_masks(3)
+    assert 0b100010001 in get_win_masks(3)
+
+
+def test_matches_list_board() -> None:
+    """
+    x o x | x o   | x o x | x o
+    o o x | o x o | x o x | x   o
+    x x o | x x o | o x o | x   o
+
+    Test that the bitboard agrees with TTTBoard on every query.
+    """
+    game_boards = [
+        [[PLAYERX, PLAYERO, PLAYERX], [PLAYERO, PLAYERO, PLAYERX],
+         [PLAYERX, PLAYERX, PLAYERO]],
+        [[PLAYERX, PLAYERO, EMPTY], [PLAYERO, PLAYERX, PLAYERO],
+         [PLAYERX, PLAYERX, PLAYERO]],
+        [[PLAYERX, PLAYERO, PLAYERX], [PLAYERX, PLAYERO, PLAYERX],
+         [PLAYERO, PLAYERX, PLAYERO]],
+        [[PLAYERX, PLAYERO, EMPTY], [PLAYERX, EMPTY, PLAYERO],
+         [PLAYERX, EMPTY, PLAYERO]],
+    ]
+    for game_board in game_boards:
+        board = TTTBoard(3, _custom_board=game_board)
+        bit_board = TTTBitBoard(3, _custom_board=game_board)
+        assert board.check_win() == bit_board.check_win()
+        assert board.get_empty_squares() == bit_board.get_empty_squares()
+        assert str(board) == str(bit_board)
+        assert board.get_hash() == bit_board.get_hash()
+
+
+def test_win_length() -> None:
+    """Test that the bitboard agrees with TTTBoard on k-in-a-row rules
+    while a game is played and taken back.
+    """
+    board = TTTBoard(4, _cols=5, _win_length=3)
+    bit_board = TTTBitBoard(4, _cols=5, _win_length=3)
+    moves = [(1, 1), (0, 0), (2, 2), (3, 3), (1, 2), (0, 4), (2, 1), (1, 3),
+             (3, 0)]
+    player = PLAYERX
+    for row, col in moves:
+        board.move(row, col, player)
+        bit_board.move(row, col, player)
+        assert board.check_win() == bit_board.check_win()
+        assert board.get_hash() == bit_board.get_hash()
+        player = switch_player(player)
+    assert PLAYERX == bit_board.check_win()
+
+    for row, col in reversed(moves):
+        board.undo_move(row, col)
+        bit_board.undo_move(row, col)
+        assert board.check_win() == bit_board.check_win()
+        assert board.get_empty_squares() == bit_board.get_empty_squares()
+
+
+def test_get_move() -> None:
+    """
+    x x   | o x x
+    o o x | x o
+    o     | o
+
+    Test that the computer player works on a bitboard.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, PLAYERO, PLAYERX],
+                  [PLAYERO, EMPTY, EMPTY]]
+    board = TTTBitBoard(3, _custom_board=game_board)
+    assert (0, 2) == get_move(board, PLAYERO)
+
+    game_board = [[PLAYERO, PLAYERX, PLAYERX], [PLAYERX, PLAYERO, EMPTY],
+                  [PLAYERO, EMPTY, EMPTY]]
+    board = TTTBitBoard(3, _custom_board=game_board)
+    assert (2, 2) == get_move(board, PLAYERO)
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_ttt_bitboard.py'])
@@ -1,6 +1,8 @@
 """
 Test module for ttt_board.py
 """
+import pytest
+
 from ttt_game.ttt_board import *
 
 
@@ -129,7 +131,247 @@ def test_check_win_playing() -> None:
     assert None is state
 
 
-if __name__ == '__main__':
-    import pytest
+def test_check_win_after_move() -> None:
+    """
+    x o   | x o x
+    o x   | x o
+          | o x x
+
+    Test if check win method follows the game as moves are made.
+    """
+    game_board = [[PLAYERX, PLAYERO, EMPTY], [PLAYERO, PLAYERX, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert None is board.check_win()
+
+    board.move(2, 2, PLAYERX)
+    assert PLAYERX == board.check_win()
+
+    board = TTTBoard(4)
+    for col in range(4):
+        assert None is board.check_win()
+        board.move(3 - col, col, PLAYERO)
+    assert PLAYERO == board.check_win()
+
+    game_board = [[PLAYERX, PLAYERO, PLAYERX], [PLAYERX, PLAYERO, EMPTY],
+                  [PLAYERO, PLAYERX, PLAYERX]]
+    board = TTTBoard(3, _custom_board=game_board)
+    board.move(1, 2, PLAYERO)
+    assert DRAW == board.check_win()
+
+
+def test_undo_move() -> None:
+    """
+    x o   | x o
+    o x   | o x
+          |     x
+
+    Test that undo move restores the squares and the game state.
+    """
+    game_board = [[PLAYERX, PLAYERO, EMPTY], [PLAYERO, PLAYERX, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+
+    board.move(2, 2, PLAYERX)
+    assert PLAYERX == board.check_win()
+    board.undo_move(2, 2)
+    assert EMPTY == board.get_square(2, 2)
+    assert None is board.check_win()
+    assert 5 == len(board.get_empty_squares())
+
+    for row, col in board.get_empty_squares():
+        board.move(row, col, PLAYERO)
+    assert PLAYERO == board.check_win()
+    board.undo_move(2, 0)
+    assert PLAYERO == board.check_win()
+    board.undo_move(0, 2)
+    assert None is board.check_win()
+
+
+def test_hash() -> None:
+    """Test that the board hash only depends on the squares taken.
+    """
+    game_board = [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+
+    other = TTTBoard(3)
+    empty_hash = other.get_hash()
+    other.move(1, 1, PLAYERO)
+    other.move(0, 0, PLAYERX)
+    assert board.get_hash() == other.get_hash()
+
+    other.move(2, 2, PLAYERX)
+    assert board.get_hash() != other.get_hash()
+    other.undo_move(2, 2)
+    assert board.get_hash() == other.get_hash()
+
+    assert empty_hash != TTTBoard(4).get_hash()
+
+
+def test_canonicalize() -> None:
+    """
+    x o   |     x |
+          |     o |   o
+          |       |     x
+
+    Test that symmetric boards share a canonical form and that the returned
+    transform maps each board onto it.
+    """
+    boards = [
+        [[PLAYERX, PLAYERO, EMPTY], [EMPTY, EMPTY, EMPTY],
+         [EMPTY, EMPTY, EMPTY]],
+        [[EMPTY, EMPTY, PLAYERX], [EMPTY, EMPTY, PLAYERO],
+         [EMPTY, EMPTY, EMPTY]],
+    ]
+    forms = set()
+    for game_board in boards:
+        board = TTTBoard(3, _custom_board=game_board)
+        form, transform = canonicalize(board)
+        forms.add(form)
+        for row in range(3):
+            for col in range(3):
+                new_row, new_col = transform_square(row, col, 3, transform)
+                assert form[new_row * 3 + new_col] == board.get_square(row,
+                                                                       col)
+                assert (row, col) == transform_square(
+                    new_row, new_col, 3, inverse_transform(transform))
+    assert 1 == len(forms)
+
+    game_board = [[EMPTY, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, PLAYERX]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert canonicalize(board)[0] not in forms
 
+
+def test_win_length() -> None:
+    """
+      x x x
+    o   o
+          o
+
+    Test if check win method finds lines shorter than the board.
+    """
+    game_board = [[EMPTY, PLAYERX, PLAYERX, PLAYERX, EMPTY],
+                  [PLAYERO, EMPTY, PLAYERO, EMPTY, EMPTY],
+                  [EMPTY, EMPTY, EMPTY, PLAYERO, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board, _cols=5, _win_length=3)
+    assert (3, 5) == board.get_size()
+    assert 3 == board.get_win_length()
+    assert PLAYERX == board.check_win()
+    assert 9 == len(board.get_empty_squares())
+
+    board.undo_move(0, 2)
+    assert None is board.check_win()
+    board.move(1, 1, PLAYERO)
+    assert PLAYERO == board.check_win()
+    board.undo_move(1, 1)
+    assert None is board.check_win()
+
+    board = TTTBoard(6, _win_length=4)
+    for idx in range(4):
+        assert None is board.check_win()
+        board.move(idx + 1, 4 - idx, PLAYERX)
+    assert PLAYERX == board.check_win()
+    board.move(0, 0, PLAYERO)
+    board.undo_move(2, 3)
+    assert None is board.check_win()
+
+
+def test_rectangular_board() -> None:
+    """
+    x |   |
+    --------
+      |   | o
+
+    Test printing, cloning and canonical forms of boards that are not
+    square.
+    """
+    board = TTTBoard(2, _cols=3)
+    board.move(0, 0, PLAYERX)
+    board.move(1, 2, PLAYERO)
+    assert "X |   |  \n---------\n  |   | O\n" == str(board)
+
+    clone_board = board.clone()
+    assert (2, 3) == clone_board.get_size()
+    assert 2 == clone_board.get_win_length()
+    assert board.get_hash() == clone_board.get_hash()
+
+    other = TTTBoard(2, _cols=3)
+    other.move(1, 2, PLAYERX)
+    other.move(0, 0, PLAYERO)
+    form, transform = canonicalize(board)
+    assert form == canonicalize(other)[0]
+    assert transform in (0, 2, 4, 5)
+    assert board.get_hash() != TTTBoard(3, _cols=2).get_hash()
+
+
+def test_is_winning_move() -> None:
+    """
+    x x   |
+    o o   |
+          |
+
+    Test that winning moves are found without changing the board.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    for cols, win_length in ((3, 3), (4, 3)):
+        grid = [row + [EMPTY] * (cols - 3) for row in game_board]
+        board = TTTBoard(3, _custom_board=grid, _cols=cols,
+                         _win_length=win_length)
+        assert board.is_winning_move(0, 2, PLAYERX)
+        assert not board.is_winning_move(0, 2, PLAYERO)
+        assert board.is_winning_move(1, 2, PLAYERO)
+        assert not board.is_winning_move(2, 2, PLAYERX)
+        assert EMPTY == board.get_square(0, 2)
+        assert None is board.check_win()
+
+
+def test_equality() -> None:
+    """Test that boards holding the same position compare equal, and that
+    boards won with lines of different lengths hash differently.
+    """
+    board = TTTBoard(4, _win_length=3)
+    board.move(1, 1, PLAYERX)
+    clone_board = board.clone()
+    assert board == clone_board
+    board.move(2, 2, PLAYERO)
+    assert board != clone_board
+
+    assert TTTBoard(4).get_hash() != TTTBoard(4, _win_length=3).get_hash()
+
+
+def test_to_bytes() -> None:
+    """
+    x   o |
+      o   |
+    x     |
+
+    Test that boards are encoded compactly and decoded unchanged.
+    """
+    game_board = [[PLAYERX, EMPTY, PLAYERO], [EMPTY, PLAYERO, EMPTY],
+                  [PLAYERX, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    data = board.to_bytes(PLAYERX)
+    assert 6 == len(data)
+    decoded, player = TTTBoard.from_bytes(data)
+    assert PLAYERX == player
+    assert str(board) == str(decoded)
+    assert board.get_hash() == decoded.get_hash()
+
+    board = TTTBoard(4, _cols=7, _win_length=4)
+    board.move(3, 6, PLAYERO)
+    decoded, player = TTTBoard.from_bytes(board.to_bytes(PLAYERX))
+    assert (4, 7) == decoded.get_size()
+    assert 4 == decoded.get_win_length()
+    assert PLAYERO == decoded.get_square(3, 6)
+
+    for data in (b'', data[:-1], b'\x03\x03\x03\x00\x00\x00',
+                 b'\x03\x03\x03\x01\xff\xff'):
+        with pytest.raises(ValueError):
+            TTTBoard.from_bytes(data)
+
+
+if __name__ == '__main__':
     pytest.main(['test_ttt_board.py'])
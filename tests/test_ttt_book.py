@@ -0,0 +1,60 @@
+"""
+Test module for ttt_book.py
+"""
+from ttt_game.ttt_board import *
+from ttt_game.ttt_book import *
+from ttt_game.ttt_computer import alpha_beta_pruning_move, get_move
+
+
+def test_shipped_book() -> None:
+    """Test that the shipped book is current and matches a fresh solve.
+    """
+    book = load_book()
+    assert 627 == len(book)
+    assert generate_book() == dict(book.items())
+
+
+def test_book_matches_search() -> None:
+    """Test every position of the shipped book against a full search.
+    """
+    book = load_book(BOOK_PATH)
+    for form in generate_book():
+        grid = [list(form[row * 3:row * 3 + 3]) for row in range(3)]
+        board = TTTBoard(3, _custom_board=grid)
+        player = side_to_move(board)
+        score, move = alpha_beta_pruning_move(board, player, -2, 2)
+
+        entry = book.probe(board, player)
+        assert score == entry[0]
+        assert move in book.get_moves(board)
+        assert entry[1] in book.get_moves(board)
+
+
+def test_book_probe() -> None:
+    """
+    x     |     x
+      o   |   o
+          |
+
+    Test that symmetric positions are both answered and that positions
+    with the wrong player to move are not.
+    """
+    book = load_book()
+    game_board = [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert (0, (0, 1)) == book.probe(board, PLAYERX)
+    assert None is book.probe(board, PLAYERO)
+    assert (0, 1) == get_move(board, PLAYERX, lookup=book)
+
+    game_board = [[EMPTY, EMPTY, PLAYERX], [EMPTY, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert (0, (0, 0)) == book.probe(board, PLAYERX)
+    assert None is book.probe(TTTBoard(4), PLAYERX)
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_ttt_book.py'])
@@ -0,0 +1,88 @@
+"""
+Test module for ttt_cache.py
+"""
+import pytest
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_cache import *
+
+
+def test_store_probe() -> None:
+    """Test that stored entries can be found again by their key.
+    """
+    table = TranspositionTable(16)
+    table.store(5, 3, 1, EXACT, (0, 1))
+    assert (5, 3, 1, EXACT, (0, 1)) == table.probe(5)
+    assert None is table.probe(21)
+    assert 1 == len(table)
+
+
+def test_bounded_size() -> None:
+    """Test that the table never holds more entries than its size.
+    """
+    table = TranspositionTable(8, 'always')
+    for key in range(100):
+        table.store(key, 0, 0, LOWER, None)
+    assert 8 == len(table)
+    assert None is table.probe(0)
+    assert None is not table.probe(99)
+
+
+def test_replacement_policy() -> None:
+    """Test that the depth policy keeps deeper entries and the always
+    policy replaces them.
+    """
+    table = TranspositionTable(8, 'depth')
+    table.store(1, 5, 1, EXACT, (0, 0))
+    table.store(9, 2, 0, UPPER, (1, 1))
+    assert None is not table.probe(1)
+    assert None is table.probe(9)
+
+    table = TranspositionTable(8, 'always')
+    table.store(1, 5, 1, EXACT, (0, 0))
+    table.store(9, 2, 0, UPPER, (1, 1))
+    assert None is table.probe(1)
+    assert None is not table.probe(9)
+
+    with pytest.raises(ValueError):
+        TranspositionTable(8, 'never')
+
+
+def test_symmetry_cache() -> None:
+    """
+    x o   |     x
+          |     o
+          |
+
+    Test that a move stored for a board is found for its symmetries and
+    mapped back onto them.
+    """
+    cache = SymmetryCache()
+    game_board = [[PLAYERX, PLAYERO, EMPTY], [EMPTY, EMPTY, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    cache.put(TTTBoard(3, _custom_board=game_board), PLAYERX, 1, (2, 2))
+
+    game_board = [[EMPTY, EMPTY, PLAYERX], [EMPTY, EMPTY, PLAYERO],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert (1, (2, 0)) == cache.get(board, PLAYERX)
+    assert None is cache.get(board, PLAYERO)
+    assert 1 == len(cache)
+
+
+def test_symmetry_cache_bounded() -> None:
+    """Test that the least recently used entry is dropped when full.
+    """
+    cache = SymmetryCache(2)
+    boards = [TTTBoard(3) for _ in range(3)]
+    boards[1].move(1, 1, PLAYERX)
+    boards[2].move(0, 0, PLAYERX)
+    for board in boards:
+        cache.put(board, PLAYERO, 0, (0, 1))
+    assert 2 == len(cache)
+    assert None is cache.get(boards[0], PLAYERO)
+    assert None is not cache.get(boards[2], PLAYERO)
+
+
+if __name__ == '__main__':
+    pytest.main(['test_ttt_cache.py'])
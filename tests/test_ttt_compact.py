@@ -0,0 +1,121 @@
+"""
+Test module for ttt_compact.py
+"""
+import tracemalloc
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_compact import *
+from ttt_game.ttt_computer import get_move
+
+
+def test_clone() -> None:
+    """Test clone method and that alias isn't created with original board.
+    """
+    board = TTTCompactBoard(3)
+    clone_board = board.clone()
+
+    board.move(1, 2, PLAYERX)
+    assert PLAYERX == board.get_square(1, 2)
+    assert EMPTY == clone_board.get_square(1, 2)
+    assert board.get_hash() != clone_board.get_hash()
+    assert not hasattr(board, '__dict__')
+
+
+def test_equality() -> None:
+    """Test that boards holding the same position under the same rules
+    compare equal, however the position was reached.
+    """
+    grid = [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    board = TTTCompactBoard(3, grid)
+    assert board == board.clone()
+
+    moved_board = TTTCompactBoard(3)
+    moved_board.move(0, 0, PLAYERX)
+    moved_board.move(1, 1, PLAYERO)
+    assert board == moved_board
+    assert board != TTTCompactBoard(3, grid, _win_length=2)
+    moved_board.move(2, 2, PLAYERX)
+    assert board != moved_board
+
+
+def test_matches_list_board() -> None:
+    """Test that the compact board agrees with TTTBoard on every query
+    while a k-in-a-row game is played and taken back.
+    """
+    board = TTTBoard(4, _cols=5, _win_length=3)
+    compact_board = TTTCompactBoard(4, _cols=5, _win_length=3)
+    moves = [(1, 1), (0, 0), (2, 2), (3, 3), (1, 2), (0, 4), (2, 1), (1, 3),
+             (3, 0)]
+    player = PLAYERX
+    for row, col in moves:
+        board.move(row, col, player)
+        compact_board.move(row, col, player)
+        assert board.check_win() == compact_board.check_win()
+        assert board.get_hash() == compact_board.get_hash()
+        assert (board.is_winning_move(0, 1, player)
+                == compact_board.is_winning_move(0, 1, player))
+        player = switch_player(player)
+    assert PLAYERX == compact_board.check_win()
+    assert str(board) == str(compact_board)
+    assert board.get_hash() == TTTCompactBoard.from_board(board).get_hash()
+
+    for row, col in reversed(moves):
+        board.undo_move(row, col)
+        compact_board.undo_move(row, col)
+        assert board.check_win() == compact_board.check_win()
+        assert board.get_empty_squares() == compact_board.get_empty_squares()
+
+    game_board = [[PLAYERX, PLAYERO, PLAYERX], [PLAYERX, PLAYERO, PLAYERX],
+                  [PLAYERO, PLAYERX, PLAYERO]]
+    assert DRAW == TTTCompactBoard(3, _custom_board=game_board).check_win()
+
+
+def test_snapshot() -> None:
+    """Test that equal positions have equal snapshots, which give back the
+    position.
+    """
+    board = TTTCompactBoard(3, None, 4)
+    board.move(1, 3, PLAYERX)
+    other_board = TTTCompactBoard(3, None, 4)
+    other_board.move(1, 3, PLAYERX)
+    snapshots = {board.snapshot(): 1}
+    assert other_board.snapshot() in snapshots
+
+    other_board.move(0, 0, PLAYERO)
+    assert other_board.snapshot() not in snapshots
+    restored = TTTCompactBoard.from_snapshot(other_board.snapshot())
+    assert str(other_board) == str(restored)
+    assert other_board.get_hash() == restored.get_hash()
+    assert (3, 4) == restored.get_size()
+
+
+def test_memory() -> None:
+    """Test that compact boards take much less memory than TTTBoards.
+    """
+    sizes = []
+    for board in (TTTBoard(4), TTTCompactBoard(4)):
+        board.move(1, 1, PLAYERX)
+        tracemalloc.start()
+        boards = [board.clone() for _ in range(1000)]
+        sizes.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        del boards
+    # about 7x on 4x4 boards, the byte grid and the slots taking about
+    # 180 bytes a board
+    assert 6 * sizes[1] < sizes[0]
+
+
+def test_get_move() -> None:
+    """Test that the computer player works on a compact board.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, PLAYERO, PLAYERX],
+                  [PLAYERO, EMPTY, EMPTY]]
+    board = TTTCompactBoard(3, _custom_board=game_board)
+    assert (0, 2) == get_move(board, PLAYERO)
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_ttt_compact.py'])
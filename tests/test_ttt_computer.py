@@ -1,8 +1,15 @@
 """
 Test module for ttt_computer.py
 """
+import threading
+import time
+
+import pytest
+
+from ttt_game import ttt_computer
 from ttt_game.ttt_computer import *
 from ttt_game.ttt_board import *
+from ttt_game.ttt_cache import TranspositionTable, SymmetryCache
 
 
 def test_minimax_win_row() -> None:
@@ -173,7 +180,287 @@ def test_minimax_def_diag() -> None:
     assert move[1] == 0, "Bad Move Y: " + str(move[1])
 
 
-if __name__ == '__main__':
-    import pytest
+def test_transposition_table() -> None:
+    """
+    x     |
+      o   |
+          |
+
+    Test that searching with a transposition table gives the same score
+    as searching without one, and that the table is filled in.
+    """
+    game_board = [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    table = TranspositionTable()
+    expected = alpha_beta_pruning_move(board, PLAYERX, -2, 2)
+    result = alpha_beta_pruning_move(board, PLAYERX, -2, 2, table)
+    assert expected[0] == result[0]
+    assert len(table) > 0
+    assert result == alpha_beta_pruning_move(board, PLAYERX, -2, 2, table)
+
+    board = TTTBoard(3)
+    assert 0 == alpha_beta_pruning_move(board, PLAYERX, -2, 2, table)[0]
+    assert 0 == alpha_beta_pruning_move(board, PLAYERO, -2, 2, table)[0]
+
+
+def test_minimax_win_length() -> None:
+    """
+    x x   o
+    o
+      o   x
+
+    Test if computer can win when fewer squares than the board side make a
+    line.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY, PLAYERO],
+                  [PLAYERO, EMPTY, EMPTY, EMPTY],
+                  [EMPTY, PLAYERO, EMPTY, PLAYERX]]
+    board = TTTBoard(3, _custom_board=game_board, _cols=4, _win_length=3)
+    assert (0, 2) == get_move(board, PLAYERX)
+    assert (1, 2) == get_move(board, PLAYERO)
+
+
+def test_evaluate() -> None:
+    """
+    x
+      x
+          o
+
+    Test that the evaluation favours the player with more open lines.
+    """
+    game_board = [[PLAYERX, EMPTY, EMPTY], [EMPTY, PLAYERX, EMPTY],
+                  [EMPTY, EMPTY, PLAYERO]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert evaluate(board, PLAYERX) > 0
+    assert evaluate(board, PLAYERO) == -evaluate(board, PLAYERX)
+    assert 0 == evaluate(TTTBoard(3), PLAYERX)
+
+
+def test_time_limit() -> None:
+    """
+    x x     |
+    o o     |
+            |
+            |
+
+    Test that a time limited search returns a good move on boards too big
+    to solve in time.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY, EMPTY],
+                  [PLAYERO, PLAYERO, EMPTY, EMPTY],
+                  [EMPTY, EMPTY, EMPTY, EMPTY],
+                  [EMPTY, EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(4, _custom_board=game_board, _win_length=3)
+    score, move = iterative_deepening_move(board, PLAYERX, 0.5)
+    assert (0, 2) == move
+    assert WIN_SCORE == score
+    assert (1, 2) == get_move(board, PLAYERO, time_limit=0.5)
+
+    board = TTTBoard(7, _win_length=4)
+    board.move(3, 3, PLAYERX)
+    start = time.perf_counter()
+    move = get_move(board, PLAYERO, time_limit=0.2)
+    assert time.perf_counter() - start < 1.0
+    assert EMPTY == board.get_square(move[0], move[1])
+
+    # the board is left as it was when the search is cut off
+    before = str(board)
+    iterative_deepening_move(board, PLAYERO, 0.2)
+    assert before == str(board)
+    assert 48 == len(board.get_empty_squares())
+
+    # even the one move search stops on time on large boards
+    for dim in (15, 20):
+        board = TTTBoard(dim, _win_length=5)
+        board.move(dim // 2, dim // 2, PLAYERX)
+        start = time.perf_counter()
+        move = get_move(board, PLAYERO, time_limit=0.01)
+        assert time.perf_counter() - start < 0.05
+        assert EMPTY == board.get_square(move[0], move[1])
+
+
+def test_cancel() -> None:
+    """Test that setting the cancel event from another thread stops a
+    search, leaving the board unchanged.
+    """
+    board = TTTBoard(5, _win_length=4)
+    table = TranspositionTable()
+    cancel = threading.Event()
+    timer = threading.Timer(0.2, cancel.set)
+    timer.start()
+    start = time.perf_counter()
+    with pytest.raises(SearchCancelled):
+        get_move(board, PLAYERX, table, SymmetryCache(), cancel=cancel)
+    timer.join()
+    assert time.perf_counter() - start < 1.0
+    assert 25 == len(board.get_empty_squares())
+
+    with pytest.raises(SearchCancelled):
+        get_move(board, PLAYERX, table, SymmetryCache(), time_limit=5.0,
+                 cancel=cancel)
+    with pytest.raises(SearchCancelled):
+        alpha_beta_pruning_move(board.clone(), PLAYERX, -2, 2, table,
+                                cancel=cancel)
+
 
+def test_order_moves() -> None:
+    """
+    x x   |
+    o o   |
+          |
+
+    Test that winning moves come first, then blocks, then central squares.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    moves = order_moves(board, PLAYERX, board.get_empty_squares())
+    assert [(0, 2), (1, 2)] == moves[:2]
+    moves = order_moves(board, PLAYERO, board.get_empty_squares())
+    assert [(1, 2), (0, 2)] == moves[:2]
+
+    board = TTTBoard(3)
+    moves = order_moves(board, PLAYERX, board.get_empty_squares())
+    assert (1, 1) == moves[0]
+    moves = order_moves(board, PLAYERX, board.get_empty_squares(), (2, 0))
+    assert [(2, 0), (1, 1)] == moves[:2]
+
+
+def test_count_nodes() -> None:
+    """Test that move ordering reduces the number of positions searched.
+    """
+    board = TTTBoard(3)
+    assert count_nodes(board, PLAYERX) * 4 < count_nodes(board, PLAYERX,
+                                                         ordering=False)
+    assert (alpha_beta_pruning_move(board, PLAYERX, -2, 2)[0] ==
+            alpha_beta_pruning_move(board, PLAYERX, -2, 2, ordering=False)[0])
+
+
+def test_parallel_matches_serial() -> None:
+    """Test that the parallel search picks the same score and move as the
+    serial search.
+    """
+    boards = [TTTBoard(3),
+              TTTBoard(3, _custom_board=[[PLAYERX, EMPTY, EMPTY],
+                                         [EMPTY, PLAYERO, EMPTY],
+                                         [EMPTY, EMPTY, EMPTY]]),
+              TTTBoard(3, _custom_board=[[PLAYERX, PLAYERX, EMPTY],
+                                         [PLAYERO, PLAYERO, EMPTY],
+                                         [EMPTY, EMPTY, EMPTY]]),
+              TTTBoard(4, None, 4, 3)]
+    for board in boards:
+        for player in (PLAYERX, PLAYERO):
+            serial = alpha_beta_pruning_move(board.clone(), player, -2, 2,
+                                             TranspositionTable())
+            assert serial == parallel_alpha_beta_move(board.clone(), player,
+                                                      2, TranspositionTable())
+
+    board = boards[3]
+    assert get_move(board, PLAYERX, TranspositionTable(), SymmetryCache(),
+                    workers=2) == (1, 1)
+
+    # the workers are kept for later searches
+    executor = ttt_computer._POOLS[2][0]
+    parallel_alpha_beta_move(board.clone(), PLAYERO, 2)
+    assert executor is ttt_computer._POOLS[2][0]
+    shutdown_pools()
+    assert not ttt_computer._POOLS
+
+
+def test_table_win_lengths() -> None:
+    """
+      o x   |
+    o       |
+      x x   |
+    o   x   |
+
+    Test that a table shared by boards of the same size won with lines of
+    different lengths gives each its own results.
+    """
+    game_board = [[EMPTY, PLAYERO, PLAYERX, EMPTY],
+                  [PLAYERO, EMPTY, EMPTY, EMPTY],
+                  [EMPTY, PLAYERX, PLAYERX, EMPTY],
+                  [PLAYERO, EMPTY, PLAYERX, EMPTY]]
+    table = TranspositionTable()
+    board = TTTBoard(4, _custom_board=game_board, _win_length=3)
+    alpha_beta_pruning_move(board, PLAYERO, -2, 2, table)
+
+    board = TTTBoard(4, _custom_board=game_board)
+    expected = alpha_beta_pruning_move(board, PLAYERO, -2, 2,
+                                       TranspositionTable())
+    assert 0 == expected[0]
+    assert expected == alpha_beta_pruning_move(board, PLAYERO, -2, 2, table)
+
+
+def test_search_stats() -> None:
+    """Test that get_move reports where its move came from and what its
+    search did.
+    """
+    board = TTTBoard(4, _custom_board=[[PLAYERX, EMPTY, EMPTY, EMPTY],
+                                       [EMPTY, PLAYERO, EMPTY, EMPTY],
+                                       [EMPTY, EMPTY, EMPTY, EMPTY],
+                                       [EMPTY, EMPTY, EMPTY, EMPTY]],
+                     _win_length=3)
+    stats = SearchStats()
+    table = TranspositionTable()
+    cache = SymmetryCache()
+    move = get_move(board, PLAYERX, table, cache, stats=stats)
+    assert 'search' == stats.source
+    assert count_nodes(board, PLAYERX, table=TranspositionTable()) == (
+        stats.nodes)
+    assert 0 < stats.terminals < stats.nodes
+    assert 0 in stats.cutoffs
+    assert 0 < stats.hits < stats.probes
+    assert 14 == stats.depth
+    assert 1 < stats.branching_factor() < 14
+    assert stats.seconds > 0
+
+    stats = SearchStats()
+    assert move == get_move(board, PLAYERX, table, cache, stats=stats)
+    assert 'cache' == stats.source
+    assert 0 == stats.nodes
+    stats = SearchStats()
+    get_move(TTTBoard(3), PLAYERX, stats=stats)
+    assert 'lookup' == stats.source
+
+    stats = SearchStats()
+    parallel_alpha_beta_move(TTTBoard(4, None, 4, 3), PLAYERX, 2,
+                             TranspositionTable(), stats)
+    assert 16 == stats.depth
+    assert 0 < stats.terminals < stats.nodes
+
+    stats = SearchStats()
+    iterative_deepening_move(TTTBoard(3), PLAYERX, 10, stats=stats)
+    assert stats.depth > 0
+    assert stats.nodes > 0
+
+
+def test_analyze_positions() -> None:
+    """Test that a batch of positions is solved in order, sharing results
+    between symmetric positions.
+    """
+    corner = TTTBoard(4, None, 4, 3)
+    corner.move(0, 0, PLAYERX)
+    rotated = TTTBoard(4, None, 4, 3)
+    rotated.move(3, 3, PLAYERX)
+    won = TTTBoard(3, _custom_board=[[PLAYERX, PLAYERX, PLAYERX],
+                                     [PLAYERO, PLAYERO, EMPTY],
+                                     [EMPTY, EMPTY, EMPTY]])
+    positions = [(corner, PLAYERO), (won, PLAYERO), (rotated, PLAYERO),
+                 (TTTBoard(3), PLAYERX)]
+
+    for workers in (None, 2):
+        cache = SymmetryCache()
+        results = list(analyze_positions(iter(positions), workers,
+                                         cache=cache, batch_size=3))
+        score, move = results[0]
+        assert 1 == score
+        assert (3 - move[0], 3 - move[1]) == results[2][1]
+        assert (1, (-1, -1)) == results[1]
+        assert 0 == results[3][0]
+        assert 2 == len(cache)
+
+
+if __name__ == '__main__':
     pytest.main(['test_ttt_computer.py'])
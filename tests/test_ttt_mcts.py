@@ -0,0 +1,88 @@
+"""
+Test module for ttt_mcts.py
+"""
+import io
+import time
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_mcts import *
+from ttt_game.ttt_simulation import random_move, simulate
+
+
+def test_win_and_block() -> None:
+    """
+    x x   |
+    o o   |
+          |
+
+    Test that the player takes a win, and blocks one when it cannot win.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert (0, 2) == MCTSPlayer(seed=1)(board, PLAYERX)
+    assert (1, 2) == get_move(board, PLAYERO)
+
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, EMPTY, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    assert (0, 2) == MCTSPlayer(seed=1)(board, PLAYERO)
+    assert (-1, -1) == get_move(TTTBoard(3, _custom_board=[
+        [PLAYERX, PLAYERX, PLAYERX], [PLAYERO, PLAYERO, EMPTY],
+        [EMPTY, EMPTY, EMPTY]]), PLAYERO)
+
+
+def test_seeded_get_move() -> None:
+    """Test that get_move follows the seed of the random module, so
+    simulated games can be repeated.
+    """
+    outputs = []
+    for _ in range(2):
+        output = io.StringIO()
+        simulate(get_move, random_move, 4, output=output, seed=5, dim=4,
+                 win_length=3)
+        outputs.append(output.getvalue())
+    assert outputs[0] == outputs[1]
+
+
+def test_tree_reuse() -> None:
+    """Test that the tree below the moves played is searched further.
+    """
+    board = TTTBoard(4, None, 4, 3)
+    player = MCTSPlayer(500, seed=2)
+    row, col = player(board, PLAYERX)
+    board.move(row, col, PLAYERX)
+    board.move(*board.get_empty_squares()[0], PLAYERO)
+    player(board, PLAYERX)
+    assert player._root.visits > 500
+
+    fresh = MCTSPlayer(500, reuse_tree=False, seed=2)
+    fresh(board, PLAYERX)
+    assert fresh._root is None
+
+    # a position not in the tree starts a new one
+    player(TTTBoard(4, None, 4, 3), PLAYERX)
+    assert 500 == player._root.visits
+
+
+def test_time_limit() -> None:
+    """Test that a time budget bounds the search on a large board.
+    """
+    board = TTTBoard(7, None, 7, 4)
+    start = time.perf_counter()
+    row, col = MCTSPlayer(time_limit=0.2, seed=3)(board, PLAYERX)
+    assert time.perf_counter() - start < 1
+    assert EMPTY == board.get_square(row, col)
+
+
+def test_workers() -> None:
+    """Test that root-parallel search finds a winning move.
+    """
+    game_board = [[PLAYERX, PLAYERX, EMPTY], [PLAYERO, PLAYERO, EMPTY],
+                  [EMPTY, EMPTY, EMPTY]]
+    board = TTTBoard(3, _custom_board=game_board)
+    player = MCTSPlayer(1000, workers=2, seed=4)
+    try:
+        assert (0, 2) == player(board, PLAYERX)
+    finally:
+        player.close()
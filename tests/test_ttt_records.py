@@ -0,0 +1,57 @@
+"""
+Test module for ttt_records.py
+"""
+import pytest
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_records import *
+
+
+def test_write_and_read(tmp_path) -> None:
+    """Test that games are read back in order, including after the file
+    is reopened to append more.
+    """
+    path = str(tmp_path / 'games.tttg')
+    games = [GameRecord([(1, 1), (0, 0), (2, 2), (0, 2), (0, 1), (2, 1),
+                         (1, 0), (1, 2), (2, 0)], DRAW),
+             GameRecord([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)], PLAYERX),
+             GameRecord([], None, 4, 5, 3)]
+    with GameWriter(path) as writer:
+        writer.write(games[0])
+        writer.write(games[1])
+    assert 6 + 15 + 11 == (tmp_path / 'games.tttg').stat().st_size
+
+    with GameWriter(path) as writer:
+        writer.write(games[2])
+    assert games == list(read_games(path))
+    assert PLAYERX == games[1].to_board().check_win()
+
+
+def test_large_board(tmp_path) -> None:
+    """Test that squares beyond the 256th are stored.
+    """
+    path = str(tmp_path / 'games.tttg')
+    game = GameRecord([(19, 19), (0, 0)], None, 20, 20, 5)
+    with GameWriter(path) as writer:
+        writer.write(game)
+    assert [game] == list(read_games(path))
+
+
+def test_bad_file(tmp_path) -> None:
+    """Test that files which are not record files, or are cut short, are
+    rejected.
+    """
+    path = tmp_path / 'games.tttg'
+    path.write_bytes(b'not a record file')
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
+    with pytest.raises(ValueError):
+        GameWriter(str(path))
+
+    path.unlink()
+    with GameWriter(str(path)) as writer:
+        writer.write(GameRecord([(0, 0), (1, 1)]))
+    path.write_bytes(path.read_bytes()[:-1])
+    games = read_games(str(path))
+    with pytest.raises(ValueError):
+        next(games)
@@ -0,0 +1,90 @@
+"""
+Test module for ttt_server.py and ttt_load_test.py
+"""
+import asyncio
+import time
+
+import pytest
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_load_test import *
+from ttt_game.ttt_server import *
+
+
+def test_parse_board() -> None:
+    """Test that JSON boards are read, and bad ones refused.
+    """
+    board, player = parse_board({'board': ['X.O.', '.X..', '....'],
+                                 'player': 'O', 'win_length': 3})
+    assert (3, 4) == board.get_size()
+    assert 3 == board.get_win_length()
+    assert PLAYERO == player
+    assert PLAYERO == board.get_square(0, 2)
+
+    for request in ([], {'board': ['X.', '...'], 'player': 'O'},
+                    {'board': ['X?.', '...'], 'player': 'O'},
+                    {'board': ['X..', '...'], 'player': 'Z'},
+                    {'board': ['X..', '...'], 'player': 'O',
+                     'win_length': 9},
+                    {'board': ['.' * 21] * 20, 'player': 'X'}):
+        with pytest.raises(RequestError):
+            parse_board(request)
+
+    with pytest.raises(ValueError):
+        MoveServer('0.0.0.0')
+    assert DEFAULT_TIME_LIMIT == MoveServer().time_limit
+
+
+def test_server() -> None:
+    """Test moves served over HTTP, and that concurrent requests for one
+    position share a search.
+    """
+    async def run() -> None:
+        server = MoveServer(port=0, workers=1)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                           server.port)
+            assert (200, {'move': [1, 2]}) == await request_move(
+                reader, writer, {'board': ['XX.', 'OO.', '...'],
+                                 'player': 'O'})
+            assert (200, {'move': None}) == await request_move(
+                reader, writer, {'board': ['XXX', 'OO.', '...'],
+                                 'player': 'O'})
+            status, response = await request_move(
+                reader, writer, {'board': ['XX.'], 'player': 'Q'})
+            assert 400 == status and 'error' in response
+
+            # large boards are answered within the time limit
+            start = time.perf_counter()
+            status, response = await request_move(
+                reader, writer, {'board': ['.' * 10] * 10, 'player': 'X',
+                                 'win_length': 5})
+            assert 200 == status
+            assert time.perf_counter() - start < 5 * DEFAULT_TIME_LIMIT
+            writer.close()
+
+            board = TTTBoard(4, None, 4, 3)
+            moves = await asyncio.gather(*(server.get_move(board, PLAYERX)
+                                           for _ in range(5)))
+            assert 1 == len(set(moves))
+            assert 4 == server.stats['coalesced']
+
+            result = await run_load_test(make_requests(20, seed=1),
+                                         port=server.port, concurrency=4)
+            assert 20 == len(result.latencies)
+            assert 0 == result.errors
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_percentile() -> None:
+    """Test nearest-rank percentiles.
+    """
+    values = [float(value) for value in range(100, 0, -1)]
+    assert 50.0 == percentile(values, 50)
+    assert 99.0 == percentile(values, 99)
+    assert 1.0 == percentile(values, 0)
+    assert 0.0 == percentile([], 50)
@@ -0,0 +1,71 @@
+"""
+Test module for ttt_simulation.py
+"""
+import io
+import json
+
+import pytest
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_computer import get_move
+from ttt_game.ttt_records import GameWriter, read_games
+from ttt_game.ttt_simulation import *
+
+
+def test_play_game() -> None:
+    """Test that perfect play draws and that illegal moves are refused.
+    """
+    moves, result = play_game(get_move, get_move)
+    assert DRAW == result
+    assert 9 == len(moves)
+    assert 9 == len(set(moves))
+
+    with pytest.raises(ValueError):
+        play_game(get_move, lambda board, player: (0, 0))
+
+
+def test_simulate() -> None:
+    """Test that games are recorded in order and counted for the first
+    strategy.
+    """
+    for workers in (None, 2):
+        output = io.StringIO()
+        result = simulate(get_move, random_move, 20, workers, output,
+                          alternate=True, seed=1)
+        assert 20 == result.games
+        assert 0 == result.losses
+        assert 20 == result.wins + result.draws
+
+        records = [json.loads(line) for line in output.getvalue().split("\n")
+                   if line]
+        assert list(range(20)) == [record['game'] for record in records]
+        assert ['X', 'O'] == [record['first'] for record in records[:2]]
+        for record in records:
+            assert record['result'] in ('X', 'O', 'draw')
+            assert record['result'] != ('O' if record['first'] == 'X'
+                                        else 'X')
+
+    first = io.StringIO()
+    second = io.StringIO()
+    simulate(random_move, random_move, 10, output=first, seed=3)
+    simulate(random_move, random_move, 10, 2, second, seed=3)
+    assert first.getvalue() == second.getvalue()
+
+
+def test_simulate_records(tmp_path) -> None:
+    """Test that games are appended to a record file as they are played.
+    """
+    path = str(tmp_path / 'games.tttg')
+    output = io.StringIO()
+    with GameWriter(path) as writer:
+        simulate(random_move, random_move, 5, output=output, seed=2, dim=4,
+                 win_length=3, writer=writer)
+
+    records = [json.loads(line) for line in output.getvalue().split("\n")
+               if line]
+    games = list(read_games(path))
+    assert [[tuple(move) for move in record['moves']] for record in records
+            ] == [game.moves for game in games]
+    for game in games:
+        assert (4, 4, 3) == (game.rows, game.cols, game.win_length)
+        assert game.result == game.to_board().check_win()
@@ -0,0 +1,73 @@
+"""
+Test module for ttt_table.py
+"""
+import pytest
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_book import load_book
+from ttt_game.ttt_computer import get_move
+from ttt_game.ttt_table import *
+
+
+def test_position_index() -> None:
+    """Test that squares are read as base-3 digits in row-major order.
+    """
+    board = TTTBoard(3)
+    assert (0, 0, 0) == position_index(board)
+
+    board.move(0, 0, PLAYERX)
+    board.move(0, 1, PLAYERO)
+    board.move(2, 2, PLAYERX)
+    assert (1 + 2 * 3 + 3 ** 8, 2, 1) == position_index(board)
+
+
+def test_book_table(tmp_path) -> None:
+    """Test that a table built from the opening book answers every
+    position the same way as the book.
+    """
+    path = str(tmp_path / 'table3.bin')
+    book = load_book()
+    write_book_table(path, book)
+
+    with PositionTable(path) as table:
+        assert 3 == table.get_dim()
+        for form, _ in book.items():
+            grid = [list(form[row * 3:row * 3 + 3]) for row in range(3)]
+            board = TTTBoard(3, _custom_board=grid)
+            xcount = form.count(PLAYERX)
+            player = PLAYERX if xcount == form.count(PLAYERO) else PLAYERO
+            assert book.probe(board, player) == table.probe(board, player)
+
+        # finished and unreachable boards are not in the table
+        board = TTTBoard(3)
+        board.move(0, 0, PLAYERO)
+        assert None is table.probe(board, PLAYERX)
+        assert None is table.probe(TTTBoard(4), PLAYERX)
+
+        board = TTTBoard(3)
+        board.move(1, 1, PLAYERX)
+        assert table.probe(board, PLAYERO)[1] == get_move(board, PLAYERO,
+                                                          lookup=table)
+
+
+def test_bad_table(tmp_path) -> None:
+    """Test that files which are not tables are rejected.
+    """
+    path = tmp_path / 'table.bin'
+    path.write_bytes(b'not a table at all')
+    with pytest.raises(ValueError):
+        PositionTable(str(path))
+    path.write_bytes(b'short')
+    with pytest.raises(ValueError):
+        PositionTable(str(path))
+
+    # a table cut short would be read past its end
+    write_book_table(str(path))
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError):
+        PositionTable(str(path))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_ttt_table.py'])
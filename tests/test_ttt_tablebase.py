@@ -0,0 +1,147 @@
+"""
+Test module for ttt_tablebase.py
+"""
+import random
+
+import pytest
+
+from ttt_game import ttt_computer
+from ttt_game.ttt_board import *
+from ttt_game.ttt_book import load_book, side_to_move
+from ttt_game.ttt_computer import (get_move, get_tablebase,
+                                   alpha_beta_pruning_move)
+from ttt_game.ttt_tablebase import *
+
+
+def test_build(tmp_path) -> None:
+    """Test that every reachable 3x3 position is solved the same way with
+    and without worker processes, agreeing with the opening book.
+    """
+    path = str(tmp_path / 'tablebase3.bin')
+    other_path = str(tmp_path / 'other.bin')
+    assert 5478 == build_tablebase(path, 3)
+    assert 5478 == build_tablebase(other_path, 3, workers=2)
+    with open(path, 'rb') as table_file, open(other_path, 'rb') as other:
+        assert table_file.read() == other.read()
+
+    book = load_book()
+    with Tablebase(path) as tablebase:
+        assert 3 == tablebase.get_dim()
+        assert (0, 0) == tablebase.get_result(TTTBoard(3))
+        for form, (score, _) in book.items():
+            grid = [list(form[row * 3:row * 3 + 3]) for row in range(3)]
+            board = TTTBoard(3, _custom_board=grid)
+            player = side_to_move(board)
+            table_score, move = tablebase.probe(board, player)
+            assert score == table_score
+            assert move in book.get_moves(board)
+
+        # finished, unreachable and other boards are not answered
+        board = TTTBoard(3)
+        board.move(0, 0, PLAYERO)
+        assert None is tablebase.probe(board, PLAYERX)
+        assert None is tablebase.get_result(board)
+        assert None is tablebase.probe(TTTBoard(3), PLAYERO)
+        assert None is tablebase.probe(TTTBoard(4), PLAYERX)
+        assert None is tablebase.probe(TTTBoard(3, None, 3, 2), PLAYERX)
+
+
+def test_distance(tmp_path) -> None:
+    """
+    x x   |     x
+      o   | x
+      o   | o o x
+
+    Test that the fastest win and the slowest loss are chosen.
+    """
+    path = str(tmp_path / 'tablebase3.bin')
+    build_tablebase(path, 3)
+    with Tablebase(path) as tablebase:
+        game_board = [[PLAYERX, PLAYERX, EMPTY], [EMPTY, PLAYERO, EMPTY],
+                      [EMPTY, PLAYERO, EMPTY]]
+        board = TTTBoard(3, _custom_board=game_board)
+        assert (1, 1) == tablebase.get_result(board)
+        assert (1, (0, 2)) == tablebase.probe(board, PLAYERX)
+        assert (0, 2) == get_move(board, PLAYERX, lookup=tablebase)
+
+        # O loses whatever it does, but later if it blocks
+        game_board = [[EMPTY, EMPTY, PLAYERX], [PLAYERX, EMPTY, EMPTY],
+                      [PLAYERO, PLAYERO, PLAYERX]]
+        board = TTTBoard(3, _custom_board=game_board)
+        assert (-1, 4) == tablebase.get_result(board)
+        assert (1, (1, 2)) == tablebase.probe(board, PLAYERO)
+
+        # every chosen move keeps to the distance of its position
+        for form, _ in load_book().items():
+            grid = [list(form[row * 3:row * 3 + 3]) for row in range(3)]
+            board = TTTBoard(3, _custom_board=grid)
+            player = side_to_move(board)
+            result, distance = tablebase.get_result(board)
+            row, col = tablebase.probe(board, player)[1]
+            board.move(row, col, player)
+            if result == 0:
+                assert (0, 0) == tablebase.get_result(board)
+            else:
+                assert (-result, distance - 1) == tablebase.get_result(board)
+
+
+def test_bad_tablebase(tmp_path) -> None:
+    """Test that files which are not tablebases are rejected.
+    """
+    path = tmp_path / 'tablebase.bin'
+    path.write_bytes(b'not a tablebase at all')
+    with pytest.raises(ValueError):
+        Tablebase(str(path))
+    path.write_bytes(b'short')
+    with pytest.raises(ValueError):
+        Tablebase(str(path))
+
+
+def test_default_4x4(tmp_path, monkeypatch) -> None:
+    """
+    x x x   |
+    o o     |
+    o       |
+            |
+
+    Test the 4x4 tablebase get_move looks moves up in, once it is built,
+    against a full search.
+    """
+    path = str(tmp_path / 'tablebase4.bin')
+    monkeypatch.setattr(ttt_computer, 'TABLEBASE_PATH', path)
+    monkeypatch.setattr(ttt_computer, '_TABLEBASE', None)
+    assert None is get_tablebase()
+
+    build_tablebase(path)
+    tablebase = get_tablebase()
+    try:
+        assert 4 == tablebase.get_dim()
+        assert (0, 0) == tablebase.get_result(TTTBoard(4))
+
+        game_board = [[PLAYERX, PLAYERX, PLAYERX, EMPTY],
+                      [PLAYERO, PLAYERO, EMPTY, EMPTY],
+                      [PLAYERO, EMPTY, EMPTY, EMPTY],
+                      [EMPTY, EMPTY, EMPTY, EMPTY]]
+        board = TTTBoard(4, _custom_board=game_board)
+        assert (1, 1) == tablebase.get_result(board)
+        assert (1, (0, 3)) == tablebase.probe(board, PLAYERX)
+        assert (0, 3) == get_move(board, PLAYERX)
+
+        # positions eight moves from the end agree with the search
+        rand = random.Random(4)
+        for _ in range(20):
+            board = TTTBoard(4)
+            player = PLAYERX
+            while len(board.get_empty_squares()) > 8:
+                board.move(*rand.choice(board.get_empty_squares()), player)
+                player = switch_player(player)
+                if board.check_win() is not None:
+                    board = TTTBoard(4)
+                    player = PLAYERX
+            score, move = tablebase.probe(board, player)
+            assert alpha_beta_pruning_move(board, player, -2, 2)[0] == score
+            board.move(move[0], move[1], player)
+            assert alpha_beta_pruning_move(board, switch_player(player), -2,
+                                           2)[0] == score
+    finally:
+        tablebase.close()
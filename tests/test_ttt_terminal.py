@@ -0,0 +1,52 @@
+"""
+Test module for ttt_terminal.py
+"""
+import io
+import logging
+import subprocess
+import sys
+
+from ttt_game.ttt_board import *
+from ttt_game.ttt_computer import get_move
+from ttt_game.ttt_terminal import *
+
+
+def test_parse_move() -> None:
+    """Test that only empty squares on the board are accepted.
+    """
+    board = TTTBoard(3, None, 4)
+    board.move(0, 0, PLAYERX)
+    assert (1, 3) == parse_move("2 4", board)
+    assert (2, 0) == parse_move(" 3,1 ", board)
+    assert parse_move("1 1", board) is None
+    assert parse_move("4 1", board) is None
+    assert parse_move("0 1", board) is None
+    assert parse_move("a b", board) is None
+    assert parse_move("2", board) is None
+
+
+def test_play_terminal(caplog) -> None:
+    """Test a game against the computer with scripted input, logging the
+    statistics of its moves.
+    """
+    caplog.set_level(logging.INFO)
+    moves = iter(["5 5", "1 1", "1 2", "2 1", "3 3", "3 2", "2 3"])
+    output = io.StringIO()
+    winner = play_terminal(3, PLAYERX, get_move, read=lambda _: next(moves),
+                           output=output)
+    assert winner in (PLAYERX, DRAW)
+    assert "Enter the row and column" in output.getvalue()
+    assert any(record.getMessage().startswith("AI move")
+               for record in caplog.records)
+
+    moves = iter(["2 2", "q"])
+    assert play_terminal(3, PLAYERO, get_move, read=lambda _: next(moves),
+                         output=io.StringIO()) is None
+
+
+def test_no_pygame() -> None:
+    """Test that the command line game never imports pygame.
+    """
+    code = ("import sys, ttt_game.__main__; "
+            "sys.exit('pygame' in sys.modules)")
+    assert 0 == subprocess.call([sys.executable, '-c', code])
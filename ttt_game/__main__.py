@@ -0,0 +1,64 @@
+"""
+Command line entry point, run with python -m ttt_game
+"""
+import argparse
+import functools
+import logging
+
+from .ttt_board import PLAYERX, PLAYERO
+from .ttt_computer import get_move
+from .ttt_mcts import get_move as mcts_move
+from .ttt_simulation import random_move
+from .ttt_terminal import play_terminal
+
+
+def main() -> None:
+    """Play a game against the computer in the terminal, or in a window
+    with --gui.
+
+    pygame is only imported when a window is opened.
+    """
+    parser = argparse.ArgumentParser(prog='python -m ttt_game',
+                                     description="Play Tic-Tac-Toe against "
+                                                 "the computer.")
+    parser.add_argument('--size', type=int, default=3,
+                        help="number of rows of the board")
+    parser.add_argument('--cols', type=int,
+                        help="number of columns, defaults to the size")
+    parser.add_argument('--win-length', type=int,
+                        help="squares in a line needed to win, defaults to "
+                             "the shorter side")
+    parser.add_argument('--ai-player', choices=['X', 'O'], default='O',
+                        help="side the computer plays, X moves first")
+    parser.add_argument('--ai', choices=['minimax', 'mcts', 'random'],
+                        default='minimax', help="computer player")
+    parser.add_argument('--time-limit', type=float,
+                        help="seconds the computer may think per move")
+    parser.add_argument('--gui', action='store_true',
+                        help="play in a pygame window")
+    parser.add_argument('--log-stats', action='store_true',
+                        help="log the search statistics of every computer "
+                             "move")
+    args = parser.parse_args()
+
+    if args.log_stats:
+        logging.basicConfig(level=logging.INFO)
+
+    ai_function = {'minimax': get_move, 'mcts': mcts_move,
+                   'random': random_move}[args.ai]
+    if args.time_limit is not None and args.ai != 'random':
+        ai_function = functools.partial(ai_function,
+                                        time_limit=args.time_limit)
+    ai_player = PLAYERX if args.ai_player == 'X' else PLAYERO
+
+    if args.gui:
+        from .ttt_gui import game_loop
+        game_loop(args.size, ai_player, ai_function, args.cols,
+                  args.win_length)
+    else:
+        play_terminal(args.size, ai_player, ai_function, args.cols,
+                      args.win_length)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Batches of Tic-Tac-Toe Boards Stored in NumPy Arrays
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .ttt_board import *
+
+__all__ = ['TTTBatchBoard']
+
+
+@dataclass
+class TTTBatchBoard:
+    """N boards of the same shape, held in one (N, rows, cols) int8 array of
+    EMPTY, PLAYERX and PLAYERO squares.
+
+    Every operation works on all N boards at once with array arithmetic
+    instead of a Python loop over the boards and their squares.
+    """
+    # === Private Attributes ===
+    # _grids:
+    #     The (N, rows, cols) array holding the squares of every board.
+    # _win_length:
+    #     The number of squares in a line needed to win, which defaults to
+    #     the shorter side of the boards.
+    _grids: np.ndarray
+    _win_length: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+        """
+        self._grids = np.asarray(self._grids, dtype=np.int8)
+        if self._grids.ndim != 3:
+            raise ValueError("Grids must have shape (N, rows, cols)")
+        rows, cols = self._grids.shape[1:]
+        if self._win_length is None:
+            self._win_length = min(rows, cols)
+        if not 0 < self._win_length <= max(rows, cols):
+            raise ValueError("Win length does not fit on the board")
+
+    @classmethod
+    def empty(cls, count: int, dim: int, cols: Optional[int] = None,
+              win_length: Optional[int] = None) -> TTTBatchBoard:
+        """Return a batch of count empty boards with dim rows and cols
+        columns, which defaults to dim.
+        """
+        if cols is None:
+            cols = dim
+        return cls(np.zeros((count, dim, cols), dtype=np.int8), win_length)
+
+    @classmethod
+    def from_boards(cls, boards: Iterable[TTTBoard]) -> TTTBatchBoard:
+        """Return a batch holding the grids of boards, which must all have
+        the same size and win length.
+        """
+        boards = list(boards)
+        if not boards:
+            raise ValueError("Cannot make a batch of no boards")
+        rows, cols = boards[0].get_size()
+        win_length = boards[0].get_win_length()
+        grids = np.empty((len(boards), rows, cols), dtype=np.int8)
+        for index, board in enumerate(boards):
+            if (board.get_size() != (rows, cols)
+                    or board.get_win_length() != win_length):
+                raise ValueError("Boards in a batch must have the same shape")
+            grids[index] = [[board.get_square(row, col)
+                             for col in range(cols)] for row in range(rows)]
+        return cls(grids, win_length)
+
+    def __len__(self) -> int:
+        """Return the number of boards in the batch.
+        """
+        return self._grids.shape[0]
+
+    def get_size(self) -> Tuple[int, int]:
+        """Return the number of rows and columns of the boards.
+        """
+        return self._grids.shape[1], self._grids.shape[2]
+
+    def get_win_length(self) -> int:
+        """Return the number of squares in a line needed to win.
+        """
+        return self._win_length
+
+    def get_grids(self) -> np.ndarray:
+        """Return the (N, rows, cols) array of squares of the boards.
+
+        The array is shared with the batch, not copied.
+        """
+        return self._grids
+
+    def get_board(self, index: int) -> TTTBoard:
+        """Return the board at index as a TTTBoard.
+        """
+        rows, cols = self.get_size()
+        return TTTBoard(rows, self._grids[index].tolist(), cols,
+                        self._win_length)
+
+    def to_boards(self) -> List[TTTBoard]:
+        """Return every board of the batch as a TTTBoard.
+        """
+        return [self.get_board(index) for index in range(len(self))]
+
+    def move(self, rows: Union[int, np.ndarray], cols: Union[int, np.ndarray],
+             players: Union[int, np.ndarray],
+             where: Optional[np.ndarray] = None) -> None:
+        """Place players on the boards, at position (rows[i], cols[i]) of
+        board i.
+
+        Rows, cols and players are either one value for all boards or an
+        array of N values. If where is given, only the boards where it is
+        True are played on. Boards whose square is not empty are left
+        unchanged.
+        """
+        count = len(self)
+        rows = np.broadcast_to(rows, (count,))
+        cols = np.broadcast_to(cols, (count,))
+        players = np.broadcast_to(np.asarray(players, dtype=np.int8),
+                                  (count,))
+        index = np.arange(count)
+        play = self._grids[index, rows, cols] == EMPTY
+        if where is not None:
+            play &= where
+        self._grids[index[play], rows[play], cols[play]] = players[play]
+
+    def count_stones(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the number of squares taken by PLAYERX and by PLAYERO on
+        each board.
+        """
+        return ((self._grids == PLAYERX).sum(axis=(1, 2)),
+                (self._grids == PLAYERO).sum(axis=(1, 2)))
+
+    def side_to_move(self) -> np.ndarray:
+        """Return the player whose turn it is on each board, assuming
+        PLAYERX moved first.
+        """
+        xcount, ocount = self.count_stones()
+        return np.where(xcount > ocount, PLAYERO, PLAYERX).astype(np.int8)
+
+    def check_win(self) -> np.ndarray:
+        """Return the state of the game on each board as an array of N
+        constants.
+
+        An entry is PLAYERX or PLAYERO if that player has completed a line,
+        DRAW if the board is full without one, and EMPTY if the game is
+        still in progress.
+        """
+        state = np.full(len(self), EMPTY, dtype=np.int8)
+        state[~(self._grids == EMPTY).any(axis=(1, 2))] = DRAW
+        # checked in reverse so that PLAYERX wins if both have a line
+        for player in (PLAYERO, PLAYERX):
+            state[self._has_line(self._grids == player)] = player
+        return state
+
+    def _has_line(self, stones: np.ndarray) -> np.ndarray:
+        """Return whether each of the (N, rows, cols) boolean grids stones
+        has win length squares in a row, column or diagonal.
+
+        Each direction is checked by adding up win length shifted views of
+        stones, so every window of the line is summed at once.
+        """
+        rows, cols = self.get_size()
+        length = self._win_length
+        stones = stones.astype(np.int8)
+        found = np.zeros(len(self), dtype=bool)
+        for row_step, col_step in DIRECTIONS:
+            # the windows starting at (row, col) for all valid starts
+            row_span = rows - row_step * (length - 1)
+            col_start = length - 1 if col_step < 0 else 0
+            col_span = cols - abs(col_step) * (length - 1)
+            if row_span <= 0 or col_span <= 0:
+                continue
+
+            total = np.zeros((len(self), row_span, col_span), dtype=np.int8)
+            for step in range(length):
+                row = row_step * step
+                col = col_start + col_step * step
+                total += stones[:, row:row + row_span, col:col + col_span]
+            found |= (total == length).any(axis=(1, 2))
+        return found
+
+    def legal_moves(self) -> np.ndarray:
+        """Return an (N, rows, cols) boolean array, True at every empty
+        square of a board whose game is still in progress.
+        """
+        in_progress = self.check_win() == EMPTY
+        return (self._grids == EMPTY) & in_progress[:, None, None]
@@ -0,0 +1,333 @@
+"""
+Benchmarks of the Tic-Tac-Toe Player
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_cache import TranspositionTable
+from .ttt_computer import (alpha_beta_pruning_move, count_nodes,
+                           parallel_alpha_beta_move)
+
+__all__ = ['CORPUS', 'RESULTS_VERSION', 'benchmark_parallel', 'make_position',
+           'run_suite', 'compare', 'write_results', 'load_results']
+
+# Opening moves played before the parallel benchmark searches, leaving a
+# 4x4 position that takes a few seconds to solve
+PARALLEL_OPENING = ((0, 0), (1, 1))
+
+# Version of the results file format, bumped whenever it changes
+RESULTS_VERSION = 2
+
+# Fixed positions benchmarked by the suite: name -> (rows, cols, win
+# length, moves played from the empty board, search depth or None to
+# search to the end of the game)
+CORPUS = {
+    '3x3-empty': (3, 3, 3, (), None),
+    '3x3-mid': (3, 3, 3, ((1, 1), (0, 0), (2, 2)), None),
+    '3x3-late': (3, 3, 3, ((1, 1), (0, 0), (2, 2), (0, 2), (0, 1), (2, 1)),
+                 None),
+    '4x4k3-empty': (4, 4, 3, (), None),
+    '4x4-mid': (4, 4, 4, ((0, 0), (1, 1), (3, 3), (2, 2)), None),
+    '4x4-late': (4, 4, 4, ((0, 0), (1, 1), (3, 3), (2, 2), (0, 3), (3, 0),
+                           (1, 2), (2, 1)), None),
+    '5x5k4-mid': (5, 5, 4, ((2, 2), (1, 1)), 4),
+    '7x7k4-open': (7, 7, 4, ((3, 3),), 3),
+}
+
+# Number of calls timed by each board benchmark, enough for each to take
+# some tens of milliseconds
+BOARD_CALLS = {'check_win': 200000,
+               'clone': 2000,
+               'get_empty_squares': 10000,
+               'move_undo': 10000}
+
+# Differences in wall time too small to count as a regression, in seconds
+MIN_DIFFERENCE = 0.001
+
+# Number of iterations of the calibration loop timed with each benchmark
+CALIBRATION_LOOPS = 100000
+
+# Number of times each benchmark is run, keeping the fastest
+REPEATS = 3
+
+# Results of one benchmark: metric name -> value
+Result = Dict[str, float]
+
+
+def make_position(name: str) -> Tuple[TTTBoard, int]:
+    """Return the board of the corpus position with the given name and the
+    player to move on it.
+    """
+    rows, cols, win_length, moves, _ = CORPUS[name]
+    board = TTTBoard(rows, None, cols, win_length)
+    player = PLAYERX
+    for row, col in moves:
+        board.move(row, col, player)
+        player = switch_player(player)
+    return board, player
+
+
+def _calibrate() -> float:
+    """Return the wall time of a fixed loop of Python code, in seconds.
+
+    Timed next to every benchmark, it gives the speed of the machine at
+    that moment, so results can be compared across machines and load.
+    """
+    start = time.perf_counter()
+    total = 0
+    for number in range(CALIBRATION_LOOPS):
+        total += number & 7
+    return time.perf_counter() - start
+
+
+def _measure(function: Callable[[], int], repeats: int) -> Result:
+    """Run function repeats times and return the fastest wall time, the
+    fastest wall time relative to the calibration loop, the count it
+    returns, and the peak memory it allocates in one more run.
+    """
+    seconds = float('inf')
+    relative = float('inf')
+    count = 0
+    for _ in range(repeats):
+        calibration = _calibrate()
+        start = time.perf_counter()
+        count = function()
+        elapsed = time.perf_counter() - start
+        seconds = min(seconds, elapsed)
+        relative = min(relative, elapsed / calibration)
+
+    # traced separately, since tracing slows the code down
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'relative': relative, 'count': count,
+            'peak_bytes': peak}
+
+
+def _board_benchmarks(board: TTTBoard
+                      ) -> Dict[str, Callable[[], int]]:
+    """Return functions calling each hot board method on board as many
+    times as given in BOARD_CALLS.
+    """
+    row, col = board.get_empty_squares()[0]
+
+    def check_win() -> int:
+        for _ in range(BOARD_CALLS['check_win']):
+            board.check_win()
+        return BOARD_CALLS['check_win']
+
+    def clone() -> int:
+        for _ in range(BOARD_CALLS['clone']):
+            board.clone()
+        return BOARD_CALLS['clone']
+
+    def get_empty_squares() -> int:
+        for _ in range(BOARD_CALLS['get_empty_squares']):
+            board.get_empty_squares()
+        return BOARD_CALLS['get_empty_squares']
+
+    def move_undo() -> int:
+        for _ in range(BOARD_CALLS['move_undo']):
+            board.move(row, col, PLAYERX)
+            board.undo_move(row, col)
+        return BOARD_CALLS['move_undo']
+
+    return {'check_win': check_win, 'clone': clone,
+            'get_empty_squares': get_empty_squares, 'move_undo': move_undo}
+
+
+def run_suite(names: Optional[Iterable[str]] = None,
+              repeats: int = REPEATS) -> Dict[str, Result]:
+    """Run the benchmarks of the corpus positions with the given names,
+    which default to the whole corpus.
+
+    For every position, the board methods are timed as
+    'board.<method>/<position>', with calls per second, and a search of the
+    position with a new transposition table as 'search/<position>', with
+    the number of positions it visits and nodes per second. Every result
+    also holds the fastest wall time, the fastest time relative to a
+    calibration loop run just before it, and the peak memory allocated.
+    """
+    if names is None:
+        names = CORPUS
+    results = {}
+    for name in names:
+        board, player = make_position(name)
+        depth = CORPUS[name][4]
+        for method, function in _board_benchmarks(board).items():
+            result = _measure(function, repeats)
+            result['calls_per_second'] = result.pop('count') / (
+                result['seconds'] or float('inf'))
+            results['board.{}/{}'.format(method, name)] = result
+
+        result = _measure(lambda: count_nodes(
+            board, player, table=TranspositionTable(), depth=depth), repeats)
+        result['nodes'] = result.pop('count')
+        result['nodes_per_second'] = result['nodes'] / (
+            result['seconds'] or float('inf'))
+        results['search/' + name] = result
+    return results
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result],
+            threshold: float = 0.25) -> List[str]:
+    """Return a description of every regression of results from baseline.
+
+    A benchmark regresses when its time relative to the calibration loop
+    or its peak memory is more than threshold, as a fraction, above the
+    baseline, or when a search visits more positions than in the
+    baseline. Wall times less than MIN_DIFFERENCE apart are taken as
+    equal. Benchmarks missing from either are skipped.
+    """
+    regressions = []
+    for name in sorted(set(results) & set(baseline)):
+        new, old = results[name], baseline[name]
+        for metric in ('relative', 'peak_bytes'):
+            if metric == 'relative' and (
+                    new['seconds'] - old['seconds'] < MIN_DIFFERENCE):
+                continue
+            if new[metric] > old[metric] * (1 + threshold):
+                regressions.append("{} {}: {:.6g} -> {:.6g} (+{:.0%})".format(
+                    name, metric, old[metric], new[metric],
+                    new[metric] / old[metric] - 1 if old[metric] else 1))
+        if new.get('nodes', 0) > old.get('nodes', float('inf')):
+            regressions.append("{} nodes: {} -> {}".format(
+                name, old['nodes'], new['nodes']))
+    return regressions
+
+
+def write_results(path: str, results: Dict[str, Result]) -> None:
+    """Write results to the file at path as JSON, with the versions of the
+    format and of Python.
+    """
+    with open(path, 'w') as results_file:
+        json.dump({'version': RESULTS_VERSION,
+                   'python': platform.python_version(),
+                   'benchmarks': results}, results_file, indent=2,
+                  sort_keys=True)
+        results_file.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Result]:
+    """Load the results stored in the file at path.
+
+    Raises ValueError if the file holds results of another version.
+    """
+    with open(path) as results_file:
+        data = json.load(results_file)
+    if data.get('version') != RESULTS_VERSION:
+        raise ValueError("Not version {} results: {}".format(RESULTS_VERSION,
+                                                             path))
+    return data['benchmarks']
+
+
+def benchmark_parallel(dim: int = 4,
+                       opening: Iterable[Tuple[int, int]] = PARALLEL_OPENING,
+                       worker_counts: Iterable[int] = (1, 2, 4),
+                       win_length: Optional[int] = None
+                       ) -> List[Tuple[int, float, float]]:
+    """Time a full search of the position reached by playing the opening
+    moves on an empty board, once with every number of workers.
+
+    One worker means the serial alpha_beta_pruning_move. Every search
+    starts with an empty transposition table.
+
+    Returns (workers, seconds, speedup over one worker) for every run.
+    Raises AssertionError if a parallel search disagrees with the serial
+    one.
+    """
+    board = TTTBoard(dim, None, None, win_length)
+    player = PLAYERX
+    for row, col in opening:
+        board.move(row, col, player)
+        player = switch_player(player)
+
+    start = time.perf_counter()
+    expected = alpha_beta_pruning_move(board.clone(), player, -2, 2,
+                                       TranspositionTable())
+    serial = time.perf_counter() - start
+
+    results = []
+    for workers in worker_counts:
+        if workers <= 1:
+            results.append((1, serial, 1.0))
+            continue
+        start = time.perf_counter()
+        result = parallel_alpha_beta_move(board.clone(), player, workers,
+                                          TranspositionTable())
+        elapsed = time.perf_counter() - start
+        assert result == expected, "Parallel search disagrees with serial"
+        results.append((workers, elapsed, serial / elapsed))
+
+    return results
+
+
+def _main() -> int:
+    """Run the benchmarks chosen on the command line and return the exit
+    status, 1 if a regression was found.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    commands = parser.add_subparsers(dest='command')
+
+    suite = commands.add_parser('suite', help="time the board and search "
+                                              "hot paths")
+    suite.add_argument('positions', nargs='*',
+                       help="corpus positions to run, default all of "
+                            + ", ".join(CORPUS))
+    suite.add_argument('--repeats', type=int, default=REPEATS)
+    suite.add_argument('--output', help="JSON file to write results to")
+    suite.add_argument('--baseline', help="JSON results to compare with")
+    suite.add_argument('--threshold', type=float, default=0.25,
+                       help="allowed slowdown as a fraction, default 0.25")
+
+    parallel = commands.add_parser('parallel', help="time parallel search "
+                                                    "against serial")
+    parallel.add_argument('--dim', type=int, default=4)
+    parallel.add_argument('--win-length', type=int)
+    parallel.add_argument('--workers', type=int, nargs='+',
+                          default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if args.command == 'parallel':
+        print("workers  seconds  speedup")
+        for workers, seconds, speedup in benchmark_parallel(
+                args.dim, PARALLEL_OPENING, args.workers, args.win_length):
+            print("{:7d}  {:7.2f}  {:6.2f}x".format(workers, seconds,
+                                                    speedup))
+        return 0
+
+    if args.command is None:
+        args = parser.parse_args(['suite'])
+    for name in args.positions:
+        if name not in CORPUS:
+            parser.error("unknown position: " + name)
+    results = run_suite(args.positions or None, args.repeats)
+    for name, result in results.items():
+        rate = result.get('nodes_per_second', result.get('calls_per_second'))
+        print("{:34s} {:10.3f} ms {:12.0f}/s {:9d} KiB".format(
+            name, result['seconds'] * 1000, rate,
+            result['peak_bytes'] // 1024))
+    if args.output:
+        write_results(args.output, results)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline),
+                              args.threshold)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(_main())
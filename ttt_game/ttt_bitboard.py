@@ -0,0 +1,290 @@
+"""
+Bitboard Tic-Tac-Toe Board
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, List, Tuple
+
+from .ttt_board import (EMPTY, PLAYERX, PLAYERO, DRAW, STRMAP, DIRECTIONS,
+                        zobrist_keys)
+
+__all__ = ['TTTBitBoard', 'get_win_masks']
+
+# Win masks already computed, keyed by (rows, cols, win length)
+_WIN_MASKS: Dict[Tuple[int, int, int], Tuple[int, ...]] = {}
+
+# Win masks through each square, keyed by (rows, cols, win length)
+_SQUARE_MASKS: Dict[Tuple[int, int, int], Tuple[Tuple[int, ...], ...]] = {}
+
+
+def get_win_masks(dim: int, cols: Optional[int] = None,
+                  win_length: Optional[int] = None) -> Tuple[int, ...]:
+    """Return a tuple of bitmasks, one for every winning line of a board
+    with the given dimension.
+
+    For a board that is not square, dim is its number of rows and cols its
+    number of columns. Win length defaults to the shorter side, and when it
+    equals the side of a square board the lines are its rows, columns and
+    two main diagonals.
+
+    Square (row, col) is stored in bit (row * cols + col). The masks are
+    computed once per board shape and shared by every board of that shape.
+    """
+    if cols is None:
+        cols = dim
+    if win_length is None:
+        win_length = min(dim, cols)
+
+    shape = (dim, cols, win_length)
+    if shape not in _WIN_MASKS:
+        masks = []
+        square_masks = [[] for _ in range(dim * cols)]
+        for row in range(dim):
+            for col in range(cols):
+                for row_step, col_step in DIRECTIONS:
+                    end_row = row + row_step * (win_length - 1)
+                    end_col = col + col_step * (win_length - 1)
+                    if 0 <= end_row < dim and 0 <= end_col < cols:
+                        squares = [(row + row_step * idx) * cols
+                                   + col + col_step * idx
+                                   for idx in range(win_length)]
+                        mask = sum(1 << square for square in squares)
+                        masks.append(mask)
+                        for square in squares:
+                            square_masks[square].append(mask)
+        _WIN_MASKS[shape] = tuple(masks)
+        _SQUARE_MASKS[shape] = tuple(tuple(square_mask)
+                                     for square_mask in square_masks)
+
+    return _WIN_MASKS[shape]
+
+
+@dataclass
+class TTTBitBoard:
+    """A TTT board storing each player's squares as an integer bitmask.
+
+    Offers the same interface as TTTBoard and can be used anywhere a
+    TTTBoard is expected.
+    """
+    # === Private Attributes ===
+    # _dim:
+    #     The dimension of the board, which is its number of rows.
+    # _custom_board:
+    #     A 2D list representing a pre-made game board to be loaded. It is
+    #     copied into the bitmasks and the reference dropped.
+    # _cols:
+    #     The number of columns of the board, which defaults to _dim.
+    # _win_length:
+    #     The number of squares in a line needed to win, which defaults to
+    #     the shorter side of the board.
+    # _xmask:
+    #     Bitmask of the squares taken by PLAYERX.
+    # _omask:
+    #     Bitmask of the squares taken by PLAYERO.
+    # _full:
+    #     Bitmask with a bit set for every square of the board.
+    # _winner:
+    #     The player who completed a line, or None if nobody has.
+    # _hash:
+    #     The Zobrist hash of the current game board.
+    # _keys:
+    #     The Zobrist keys of every square for each player, from
+    #     zobrist_keys.
+    _dim: int
+    _custom_board: Optional[list] = field(default=None, compare=False)
+    _cols: Optional[int] = None
+    _win_length: Optional[int] = None
+    _xmask: int = field(init=False, default=0)
+    _omask: int = field(init=False, default=0)
+    _full: int = field(init=False, default=0, compare=False)
+    _winner: Optional[int] = field(init=False, default=None, compare=False)
+    _hash: int = field(init=False, default=0, compare=False)
+    _keys: Dict[int, List[int]] = field(init=False, compare=False,
+                                        repr=False)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+        """
+        if self._cols is None:
+            self._cols = self._dim
+        if self._win_length is None:
+            self._win_length = min(self._dim, self._cols)
+        if not 0 < self._win_length <= max(self._dim, self._cols):
+            raise ValueError("Win length does not fit on the board")
+
+        self._full = (1 << (self._dim * self._cols)) - 1
+        self._hash, self._keys = zobrist_keys(self._dim, self._cols,
+                                              self._win_length)
+        get_win_masks(self._dim, self._cols, self._win_length)
+        if self._custom_board is not None:
+            # Load board grid into the bitmasks
+            for row in range(self._dim):
+                for col in range(self._cols):
+                    player = self._custom_board[row][col]
+                    if player != EMPTY:
+                        self.move(row, col, player)
+            self._custom_board = None
+
+    def __str__(self) -> str:
+        """Human readable representation of the board.
+        """
+        rep = ""
+        for row in range(self._dim):
+            for col in range(self._cols):
+                rep += STRMAP[self.get_square(row, col)]
+                if col == self._cols - 1:
+                    rep += "\n"
+                else:
+                    rep += " | "
+            if row != self._dim - 1:
+                rep += "-" * (4 * self._cols - 3)
+                rep += "\n"
+        return rep
+
+    def get_dim(self) -> int:
+        """Return the dimension of the board
+
+        For a board that is not square, this is its number of rows.
+        """
+        return self._dim
+
+    def get_size(self) -> Tuple[int, int]:
+        """Return the number of rows and columns of the board.
+        """
+        return self._dim, self._cols
+
+    def get_win_length(self) -> int:
+        """Return the number of squares in a line needed to win.
+        """
+        return self._win_length
+
+    def get_square(self, row: int, col: int) -> int:
+        """Returns one of the three constants EMPTY, PLAYERX, or PLAYERO
+        that correspond to the contents of the board at position (row, col).
+        """
+        bit = 1 << (row * self._cols + col)
+        if self._xmask & bit:
+            return PLAYERX
+        elif self._omask & bit:
+            return PLAYERO
+        return EMPTY
+
+    def get_hash(self) -> int:
+        """Return the Zobrist hash of the board.
+
+        Matches the hash of a TTTBoard holding the same grid.
+        """
+        return self._hash
+
+    def get_empty_squares(self) -> List[Tuple[int, int]]:
+        """Return a list of (row, col) tuples for all empty squares
+        """
+        empty = []
+        free = self._full & ~(self._xmask | self._omask)
+        while free:
+            low = free & -free
+            empty.append(divmod(low.bit_length() - 1, self._cols))
+            free ^= low
+
+        return empty
+
+    def move(self, row: int, col: int, player: int) -> None:
+        """Place player on the board at position (row, col).
+
+        Player should be either the constant PLAYERX or PLAYERO.
+        Does nothing if board square is not empty.
+        """
+        square = row * self._cols + col
+        bit = 1 << square
+        if (self._xmask | self._omask) & bit:
+            return
+        if player == PLAYERX:
+            self._xmask |= bit
+            stones = self._xmask
+        else:
+            self._omask |= bit
+            stones = self._omask
+        self._hash ^= self._keys[player][square]
+
+        # only lines through the new square can have been completed
+        if self._winner is None:
+            shape = (self._dim, self._cols, self._win_length)
+            for mask in _SQUARE_MASKS[shape][square]:
+                if stones & mask == mask:
+                    self._winner = player
+                    break
+
+    def is_winning_move(self, row: int, col: int, player: int) -> bool:
+        """Return whether placing player at the empty square (row, col)
+        would complete a line for player.
+
+        The board is left unchanged.
+        """
+        square = row * self._cols + col
+        stones = self._xmask if player == PLAYERX else self._omask
+        stones |= 1 << square
+        shape = (self._dim, self._cols, self._win_length)
+        for mask in _SQUARE_MASKS[shape][square]:
+            if stones & mask == mask:
+                return True
+        return False
+
+    def undo_move(self, row: int, col: int) -> None:
+        """Remove the player at position (row, col) from the board.
+
+        Reverts a previous call to move, including the game state reported
+        by check_win. Does nothing if board square is empty.
+        """
+        player = self.get_square(row, col)
+        if player == EMPTY:
+            return
+        square = row * self._cols + col
+        bit = 1 << square
+        self._xmask &= ~bit
+        self._omask &= ~bit
+        self._hash ^= self._keys[player][square]
+
+        # the removed square may have been part of the winning line
+        if self._winner is not None:
+            self._winner = self._find_winner()
+
+    def check_win(self) -> Optional[int]:
+        """Returns a constant associated with the state of the game
+
+        If PLAYERX wins, returns PLAYERX.
+        If PLAYERO wins, returns PLAYERO.
+        If game is drawn, returns DRAW.
+        If game is in progress, returns None.
+        """
+        if self._winner is not None:
+            return self._winner
+
+        # no winner, check for draw
+        if self._xmask | self._omask == self._full:
+            return DRAW
+
+        # game is still in progress
+        return None
+
+    def _find_winner(self) -> Optional[int]:
+        """Return the player holding a complete line, or None.
+        """
+        xmask = self._xmask
+        omask = self._omask
+        for mask in get_win_masks(self._dim, self._cols, self._win_length):
+            if xmask & mask == mask:
+                return PLAYERX
+            if omask & mask == mask:
+                return PLAYERO
+        return None
+
+    def clone(self) -> TTTBitBoard:
+        """Return a copy of the board
+        """
+        board = TTTBitBoard(self._dim, None, self._cols, self._win_length)
+        board._xmask = self._xmask
+        board._omask = self._omask
+        board._winner = self._winner
+        board._hash = self._hash
+        return board
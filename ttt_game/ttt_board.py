@@ -3,11 +3,13 @@ Virtual Tic-Tac-Toe Board
 """
 from __future__ import annotations
 
+import random
 from dataclasses import dataclass, field
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 
 __all__ = ['TTTBoard', 'EMPTY', 'PLAYERX', 'PLAYERO', 'DRAW', 'STRMAP',
-           'switch_player']
+           'switch_player', 'zobrist_keys', 'canonicalize',
+           'transform_square', 'inverse_transform', 'DIRECTIONS']
 
 # Constants
 EMPTY = 0
@@ -20,69 +22,222 @@ STRMAP = {PLAYERX: 'X',
           PLAYERO: 'O',
           EMPTY: ' '}
 
+# The 8 symmetries of a square board, mapping (row, col) on a board with
+# the given number of rows and cols to its new position: the identity,
+# rotations by 90, 180 and 270 degrees clockwise, then reflections through
+# the vertical axis, the horizontal axis, the main diagonal and the
+# anti-diagonal.
+_TRANSFORMS = (
+    lambda row, col, rows, cols: (row, col),
+    lambda row, col, rows, cols: (col, rows - 1 - row),
+    lambda row, col, rows, cols: (rows - 1 - row, cols - 1 - col),
+    lambda row, col, rows, cols: (cols - 1 - col, row),
+    lambda row, col, rows, cols: (row, cols - 1 - col),
+    lambda row, col, rows, cols: (rows - 1 - row, col),
+    lambda row, col, rows, cols: (col, row),
+    lambda row, col, rows, cols: (cols - 1 - col, rows - 1 - row),
+)
+
+# Index of the transform undoing each transform
+_INVERSES = (0, 3, 2, 1, 4, 5, 6, 7)
+
+# Transforms that keep a non-square board the same shape
+_RECT_TRANSFORMS = (0, 2, 4, 5)
+
+# Directions along which a line can be made, as (row step, col step)
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Number of header bytes of a board encoded by TTTBoard.to_bytes
+_BYTES_HEADER = 4
+
+# Zobrist keys already generated, keyed by (rows, cols, win length)
+_ZOBRIST_KEYS: Dict[Tuple[int, int, int],
+                    Tuple[int, Dict[int, List[int]]]] = {}
+
+
+def zobrist_keys(rows: int,
+                 cols: Optional[int] = None,
+                 win_length: Optional[int] = None
+                 ) -> Tuple[int, Dict[int, List[int]]]:
+    """Return the Zobrist hashing keys for a board with the given number of
+    rows and cols, which defaults to rows for a square board, won with a
+    line of win_length squares, which defaults to the shorter side.
+
+    The first element is the hash of the empty board. The second maps
+    PLAYERX and PLAYERO to a list holding one random 64-bit key for each
+    square, with square (row, col) at index (row * cols + col).
+
+    Keys are drawn from a generator seeded with the board size and win
+    length, so every process computes the same hashes for the same board,
+    and boards played under different rules never share hashes.
+    """
+    if cols is None:
+        cols = rows
+    if win_length is None:
+        win_length = min(rows, cols)
+    shape = (rows, cols, win_length)
+    if shape not in _ZOBRIST_KEYS:
+        rand = random.Random("{}x{}k{}".format(rows, cols, win_length))
+        base = rand.getrandbits(64)
+        keys = {player: [rand.getrandbits(64) for _ in range(rows * cols)]
+                for player in (PLAYERX, PLAYERO)}
+        _ZOBRIST_KEYS[shape] = (base, keys)
+
+    return _ZOBRIST_KEYS[shape]
+
 
 @dataclass
 class TTTBoard:
     """A class representing TTT board.
+
+    By default the board is square and a player wins by filling a whole
+    row, column or main diagonal. A board can also have a different number
+    of columns than rows and a shorter win length, in which case a player
+    wins by making a line of that many squares in any direction.
     """
     # === Private Attributes ===
     # _dim:
-    #     The dimension of the board.
+    #     The dimension of the board, which is its number of rows.
     # _custom_board:
-    #     A 2D list representing a pre-made game board to be loaded.
+    #     A 2D list representing a pre-made game board to be loaded. It is
+    #     copied into _board and the reference dropped.
+    # _cols:
+    #     The number of columns of the board, which defaults to _dim.
+    # _win_length:
+    #     The number of squares in a line needed to win, which defaults to
+    #     the shorter side of the board.
     # _board:
     #     A 2D list representing the current game board.
+    # _line_counts:
+    #     Maps each player to a list with the number of squares that player
+    #     holds on every line. Rows come first, then columns, then the
+    #     main diagonal and the anti-diagonal. Only kept when lines span
+    #     the whole of a square board, and None otherwise.
+    # _history:
+    #     The (row, col, previous winner) of recent moves, used by
+    #     undo_move when lines are not counted.
+    # _empty_count:
+    #     The number of empty squares left on the board.
+    # _winner:
+    #     The player who completed a line, or None if nobody has.
+    # _hash:
+    #     The Zobrist hash of the current game board.
+    # _keys:
+    #     The Zobrist keys of every square for each player, from
+    #     zobrist_keys.
     _dim: int
     _custom_board: Optional[list] = None
+    _cols: Optional[int] = None
+    _win_length: Optional[int] = None
     _board: list = field(init=False)
+    _line_counts: Optional[Dict[int, List[int]]] = field(init=False,
+                                                         compare=False)
+    _history: List[Tuple[int, int, Optional[int]]] = field(init=False,
+                                                           compare=False)
+    _empty_count: int = field(init=False)
+    _winner: Optional[int] = field(init=False, default=None)
+    _hash: int = field(init=False, default=0, compare=False)
+    _keys: Dict[int, List[int]] = field(init=False, compare=False,
+                                        repr=False)
 
     def __post_init__(self) -> None:
         """Initialize any variables that requires other var to be initialized.
         """
+        if self._cols is None:
+            self._cols = self._dim
+        if self._win_length is None:
+            self._win_length = min(self._dim, self._cols)
+        if not 0 < self._win_length <= max(self._dim, self._cols):
+            raise ValueError("Win length does not fit on the board")
+
         if self._custom_board is None:
             # Create empty board
-            self._board = [[EMPTY for _ in range(self._dim)]
+            self._board = [[EMPTY for _ in range(self._cols)]
                            for _ in range(self._dim)]
         else:
             # Copy board grid
             self._board = [
-                [self._custom_board[row][col] for col in range(self._dim)]
+                [self._custom_board[row][col] for col in range(self._cols)]
                 for row in range(self._dim)
             ]
+            self._custom_board = None
+
+        # Count every player's squares on each line and hash the grid
+        if self._dim == self._cols == self._win_length:
+            self._line_counts = {PLAYERX: [0] * (2 * self._dim + 2),
+                                 PLAYERO: [0] * (2 * self._dim + 2)}
+        else:
+            self._line_counts = None
+        self._history = []
+        self._empty_count = 0
+        self._hash, self._keys = zobrist_keys(self._dim, self._cols,
+                                              self._win_length)
+        for row in range(self._dim):
+            for col in range(self._cols):
+                player = self._board[row][col]
+                if player == EMPTY:
+                    self._empty_count += 1
+                else:
+                    if self._line_counts is not None:
+                        for line in self._get_lines(row, col):
+                            self._line_counts[player][line] += 1
+                    self._hash ^= self._keys[player][row * self._cols + col]
+
+        self._winner = self._find_winner()
 
     def __str__(self) -> str:
         """Human readable representation of the board.
         """
         rep = ""
         for row in range(self._dim):
-            for col in range(self._dim):
+            for col in range(self._cols):
                 rep += STRMAP[self._board[row][col]]
-                if col == self._dim - 1:
+                if col == self._cols - 1:
                     rep += "\n"
                 else:
                     rep += " | "
             if row != self._dim - 1:
-                rep += "-" * (4 * self._dim - 3)
+                rep += "-" * (4 * self._cols - 3)
                 rep += "\n"
         return rep
 
     def get_dim(self) -> int:
         """Return the dimension of the board
+
+        For a board that is not square, this is its number of rows.
         """
         return self._dim
 
+    def get_size(self) -> Tuple[int, int]:
+        """Return the number of rows and columns of the board.
+        """
+        return self._dim, self._cols
+
+    def get_win_length(self) -> int:
+        """Return the number of squares in a line needed to win.
+        """
+        return self._win_length
+
     def get_square(self, row: int, col: int) -> int:
         """Returns one of the three constants EMPTY, PLAYERX, or PLAYERO
         that correspond to the contents of the board at position (row, col).
         """
         return self._board[row][col]
 
+    def get_hash(self) -> int:
+        """Return the Zobrist hash of the board.
+
+        Equal boards of the same size and win length always have equal
+        hashes.
+        """
+        return self._hash
+
     def get_empty_squares(self) -> List[Tuple[int, int]]:
         """Return a list of (row, col) tuples for all empty squares
         """
         empty = []
         for row in range(self._dim):
-            for col in range(self._dim):
+            for col in range(self._cols):
                 if self._board[row][col] == EMPTY:
                     empty.append((row, col))
 
@@ -96,6 +251,67 @@ class TTTBoard:
         """
         if self._board[row][col] == EMPTY:
             self._board[row][col] = player
+            self._empty_count -= 1
+            self._hash ^= self._keys[player][row * self._cols + col]
+
+            if self._line_counts is not None:
+                # update line counts and record a completed line
+                counts = self._line_counts[player]
+                for line in self._get_lines(row, col):
+                    counts[line] += 1
+                    if counts[line] == self._dim and self._winner is None:
+                        self._winner = player
+            else:
+                # only lines through the new square can have been completed
+                self._history.append((row, col, self._winner))
+                if self._winner is None and self._makes_line(row, col,
+                                                             player):
+                    self._winner = player
+
+    def is_winning_move(self, row: int, col: int, player: int) -> bool:
+        """Return whether placing player at the empty square (row, col)
+        would complete a line for player.
+
+        The board is left unchanged.
+        """
+        if self._line_counts is not None:
+            counts = self._line_counts[player]
+            for line in self._get_lines(row, col):
+                if counts[line] == self._dim - 1:
+                    return True
+            return False
+
+        self._board[row][col] = player
+        wins = self._makes_line(row, col, player)
+        self._board[row][col] = EMPTY
+        return wins
+
+    def undo_move(self, row: int, col: int) -> None:
+        """Remove the player at position (row, col) from the board.
+
+        Reverts a previous call to move, including the game state reported
+        by check_win. Does nothing if board square is empty.
+        """
+        player = self._board[row][col]
+        if player != EMPTY:
+            self._board[row][col] = EMPTY
+            self._empty_count += 1
+            self._hash ^= self._keys[player][row * self._cols + col]
+
+            if self._line_counts is not None:
+                counts = self._line_counts[player]
+                for line in self._get_lines(row, col):
+                    counts[line] -= 1
+            elif self._history and self._history[-1][:2] == (row, col):
+                # undoing the latest move restores the state before it
+                self._winner = self._history.pop()[2]
+                return
+            else:
+                self._history.clear()
+
+            # the removed square may have been part of the winning line
+            if self._winner is not None:
+                self._winner = self._find_winner()
 
     def check_win(self) -> Optional[int]:
         """Returns a constant associated with the state of the game
@@ -104,42 +320,121 @@ class TTTBoard:
         If PLAYERO wins, returns PLAYERO.
         If game is drawn, returns DRAW.
         If game is in progress, returns None.
+
+        Runs in constant time as the result is kept up to date by move.
         """
-        board = self._board
-        dim = self._dim
-        lines = []
+        if self._winner is not None:
+            return self._winner
 
-        # rows
-        lines.extend(board)
+        # no winner, check for draw
+        if self._empty_count == 0:
+            return DRAW
 
-        # columns
-        cols = [[board[row][col] for row in range(dim)]
-                for col in range(dim)]
-        lines.extend(cols)
+        # game is still in progress
+        return None
 
-        # diagonals
-        diag1 = [board[idx][idx] for idx in range(dim)]
-        diag2 = [board[idx][dim - idx - 1]
-                 for idx in range(dim)]
-        lines.append(diag1)
-        lines.append(diag2)
+    def _get_lines(self, row: int, col: int) -> List[int]:
+        """Return the indices in _line_counts of every line passing
+        through the square at position (row, col).
+        """
+        lines = [row, self._dim + col]
+        if row == col:
+            lines.append(2 * self._dim)
+        if row + col == self._dim - 1:
+            lines.append(2 * self._dim + 1)
+        return lines
 
-        # check all lines
-        for line in lines:
-            if len(set(line)) == 1 and line[0] != EMPTY:
-                return line[0]
+    def _makes_line(self, row: int, col: int, player: int) -> bool:
+        """Return whether the square at position (row, col) is part of a
+        line of at least _win_length squares held by player.
+        """
+        board = self._board
+        for row_step, col_step in DIRECTIONS:
+            length = 1
+            for sign in (1, -1):
+                new_row = row + sign * row_step
+                new_col = col + sign * col_step
+                while (0 <= new_row < self._dim and 0 <= new_col < self._cols
+                       and board[new_row][new_col] == player):
+                    length += 1
+                    new_row += sign * row_step
+                    new_col += sign * col_step
+            if length >= self._win_length:
+                return True
+        return False
 
-        # no winner, check for draw
-        if len(self.get_empty_squares()) == 0:
-            return DRAW
+    def _find_winner(self) -> Optional[int]:
+        """Return the player holding a complete line, or None.
 
-        # game is still in progress
+        When lines are counted, they are scanned in order of rows, columns
+        then diagonals. Otherwise squares are scanned in row-major order.
+        """
+        if self._line_counts is not None:
+            for line in range(2 * self._dim + 2):
+                for player in (PLAYERX, PLAYERO):
+                    if self._line_counts[player][line] == self._dim:
+                        return player
+            return None
+
+        for row in range(self._dim):
+            for col in range(self._cols):
+                player = self._board[row][col]
+                if player != EMPTY and self._makes_line(row, col, player):
+                    return player
         return None
 
     def clone(self) -> TTTBoard:
         """Return a copy of the board
         """
-        return TTTBoard(self._dim, self._board)
+        return TTTBoard(self._dim, self._board, self._cols, self._win_length)
+
+    def to_bytes(self, player: int) -> bytes:
+        """Return a compact binary encoding of the board with player to
+        move, which from_bytes turns back into a board.
+
+        The encoding is one byte each for the number of rows, the number of
+        columns, the win length and player, followed by the squares read in
+        row-major order as the digits of a base-3 number, first square
+        least significant, stored little-endian. A 3x3 board takes 6 bytes.
+
+        Raises ValueError if the board has more than 255 rows or columns.
+        """
+        index = 0
+        for row in reversed(range(self._dim)):
+            for col in reversed(range(self._cols)):
+                index = index * 3 + self._board[row][col]
+        return bytes((self._dim, self._cols, self._win_length,
+                      player)) + index.to_bytes(
+            _packed_size(self._dim * self._cols), 'little')
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple[TTTBoard, int]:
+        """Return the board and player to move encoded in data by to_bytes.
+
+        Raises ValueError if data is not such an encoding.
+        """
+        if len(data) < _BYTES_HEADER:
+            raise ValueError("Board encoding too short")
+        rows, cols, win_length, player = data[:_BYTES_HEADER]
+        squares = rows * cols
+        if (player not in (PLAYERX, PLAYERO)
+                or len(data) != _BYTES_HEADER + _packed_size(squares)):
+            raise ValueError("Not a board encoding")
+        index = int.from_bytes(data[_BYTES_HEADER:], 'little')
+        if index >= 3 ** squares:
+            raise ValueError("Not a board encoding")
+
+        grid = [[EMPTY] * cols for _ in range(rows)]
+        for square in range(squares):
+            index, grid[square // cols][square % cols] = divmod(index, 3)
+        return cls(rows, grid, cols, win_length), player
+
+
+def _packed_size(squares: int) -> int:
+    """Return the number of bytes needed to hold the squares of a board
+    with the given number of squares as a base-3 number.
+    """
+    return ((3 ** squares - 1).bit_length() + 7) // 8
 
 
 def switch_player(player: int) -> int:
@@ -151,3 +446,57 @@ def switch_player(player: int) -> int:
         return PLAYERO
     else:
         return PLAYERX
+
+
+def transform_square(row: int, col: int, dim: int, transform: int,
+                     cols: Optional[int] = None) -> Tuple[int, int]:
+    """Return where the square (row, col) of a board with the given dimension
+    ends up after applying the symmetry with index transform.
+
+    For a board that is not square, dim is its number of rows and cols its
+    number of columns.
+    """
+    if cols is None:
+        cols = dim
+    return _TRANSFORMS[transform](row, col, dim, cols)
+
+
+def inverse_transform(transform: int) -> int:
+    """Return the index of the symmetry that undoes transform.
+    """
+    return _INVERSES[transform]
+
+
+def canonicalize(board: TTTBoard) -> Tuple[Tuple[int, ...], int]:
+    """Map board to the canonical representative of its symmetry class.
+
+    Returns a tuple with two elements. The first element is the canonical
+    grid as a flat row-major tuple of squares, which is the same for all 8
+    rotations and reflections of board. The second element is the index of
+    the transform that maps board onto it, for use with transform_square.
+
+    A board that is not square only has 4 symmetries: the identity, the
+    rotation by 180 degrees and the two reflections through its axes.
+    """
+    rows, cols = board.get_size()
+    squares = [(row, col, board.get_square(row, col))
+               for row in range(rows) for col in range(cols)]
+    if rows == cols:
+        transforms = range(len(_TRANSFORMS))
+    else:
+        transforms = _RECT_TRANSFORMS
+
+    best = None
+    best_transform = 0
+    for transform in transforms:
+        func = _TRANSFORMS[transform]
+        grid = [EMPTY] * (rows * cols)
+        for row, col, player in squares:
+            new_row, new_col = func(row, col, rows, cols)
+            grid[new_row * cols + new_col] = player
+        form = tuple(grid)
+        if best is None or form < best:
+            best = form
+            best_transform = transform
+
+    return best, best_transform
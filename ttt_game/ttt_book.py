@@ -0,0 +1,213 @@
+"""
+Solved Opening Book for 3x3 Tic-Tac-Toe
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, ItemsView, Optional, List, Tuple
+
+from .ttt_board import *
+
+__all__ = ['OpeningBook', 'BOOK_VERSION', 'BOOK_PATH', 'generate_book',
+           'write_book', 'load_book', 'side_to_move']
+
+# Version of the book file format, bumped whenever it changes
+BOOK_VERSION = 1
+
+# Location of the book shipped with the game
+BOOK_PATH = os.path.join(os.path.dirname(__file__), 'data', 'book3.txt')
+
+# Dimension of the boards the book covers
+BOOK_DIM = 3
+
+# Map scores to the characters used in the book file
+_SCORE_CHARS = {1: '+', 0: '=', -1: '-'}
+
+# A book entry: (score for PLAYERX, best moves as canonical square indices)
+Entry = Tuple[int, Tuple[int, ...]]
+
+
+def side_to_move(board: TTTBoard) -> Optional[int]:
+    """Return the player whose turn it is on board, assuming PLAYERX moved
+    first, or None if the squares taken could not arise in a game.
+    """
+    xcount = 0
+    ocount = 0
+    for row in range(board.get_dim()):
+        for col in range(board.get_dim()):
+            square = board.get_square(row, col)
+            if square == PLAYERX:
+                xcount += 1
+            elif square == PLAYERO:
+                ocount += 1
+
+    if xcount == ocount:
+        return PLAYERX
+    elif xcount == ocount + 1:
+        return PLAYERO
+    return None
+
+
+def _in_book(board: TTTBoard) -> bool:
+    """Return whether board is played under the rules the book covers.
+    """
+    return (board.get_size() == (BOOK_DIM, BOOK_DIM)
+            and board.get_win_length() == BOOK_DIM)
+
+
+def generate_book() -> Dict[Tuple[int, ...], Entry]:
+    """Solve every position of a 3x3 game reachable with PLAYERX moving
+    first.
+
+    Returns a dict mapping the canonical grid of every unfinished position
+    to its score for PLAYERX under perfect play and all of the best moves
+    for the player to move.
+    """
+    book = {}
+    scores = {}
+
+    def solve(board: TTTBoard, player: int) -> int:
+        """Return the score of board for PLAYERX and record it in book.
+        """
+        form = canonicalize(board)[0]
+        if form in scores:
+            return scores[form]
+
+        winner = board.check_win()
+        if winner is not None:
+            score = {PLAYERX: 1, DRAW: 0, PLAYERO: -1}[winner]
+        else:
+            # score every move for the player to move
+            sign = 1 if player == PLAYERX else -1
+            children = []
+            for row, col in board.get_empty_squares():
+                board.move(row, col, player)
+                children.append((solve(board, switch_player(player)),
+                                 row, col))
+                board.undo_move(row, col)
+            score = max(child[0] * sign for child in children) * sign
+
+            # store best moves in canonical coordinates
+            transform = canonicalize(board)[1]
+            best = set()
+            for child_score, row, col in children:
+                if child_score == score:
+                    new_row, new_col = transform_square(row, col, BOOK_DIM,
+                                                        transform)
+                    best.add(new_row * BOOK_DIM + new_col)
+            book[form] = (score, tuple(sorted(best)))
+
+        scores[form] = score
+        return score
+
+    solve(TTTBoard(BOOK_DIM), PLAYERX)
+    return book
+
+
+def write_book(path: str, book: Dict[Tuple[int, ...], Entry]) -> None:
+    """Write book to the file at path.
+
+    The first line holds the format version and board dimension. Every
+    other line holds one position: its canonical grid as digits, its score
+    for PLAYERX as one of '+', '=' or '-', and its best moves as the digits
+    of the canonical square indices.
+    """
+    with open(path, 'w') as book_file:
+        book_file.write("ttt-book {} {}\n".format(BOOK_VERSION, BOOK_DIM))
+        for form in sorted(book):
+            score, moves = book[form]
+            book_file.write("{} {} {}\n".format(
+                ''.join(str(square) for square in form), _SCORE_CHARS[score],
+                ''.join(str(move) for move in moves)))
+
+
+def load_book(path: str = BOOK_PATH) -> OpeningBook:
+    """Load the book stored in the file at path.
+
+    Raises ValueError if the file is not a book of the current version.
+    """
+    chars = {char: score for score, char in _SCORE_CHARS.items()}
+    with open(path) as book_file:
+        header = book_file.readline().split()
+        if header != ['ttt-book', str(BOOK_VERSION), str(BOOK_DIM)]:
+            raise ValueError("Not a version {} book: {}".format(BOOK_VERSION,
+                                                                path))
+
+        entries = {}
+        for line in book_file:
+            grid, score, moves = line.split()
+            entries[tuple(int(square) for square in grid)] = (
+                chars[score], tuple(int(move) for move in moves))
+
+    return OpeningBook(entries)
+
+
+@dataclass
+class OpeningBook:
+    """A table of perfect play for every reachable 3x3 position.
+    """
+    # === Private Attributes ===
+    # _entries:
+    #     Maps the canonical grid of each position to its score for PLAYERX
+    #     and its best moves in canonical coordinates.
+    _entries: Dict[Tuple[int, ...], Entry]
+
+    def __len__(self) -> int:
+        """Return the number of positions in the book.
+        """
+        return len(self._entries)
+
+    def get_dim(self) -> int:
+        """Return the dimension of the boards in the book.
+        """
+        return BOOK_DIM
+
+    def items(self) -> ItemsView[Tuple[int, ...], Entry]:
+        """Return the (canonical grid, (score, best moves)) pairs of the
+        book, with moves given as canonical square indices.
+        """
+        return self._entries.items()
+
+    def probe(self, board: TTTBoard,
+              player: int) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """Return the score for PLAYERX and the best move for player on
+        board, or None if board is not in the book.
+
+        Of several best moves, the first in row-major order is returned.
+        """
+        if not _in_book(board) or side_to_move(board) != player:
+            return None
+
+        form, transform = canonicalize(board)
+        entry = self._entries.get(form)
+        if entry is None:
+            return None
+
+        score, moves = entry
+        inverse = inverse_transform(transform)
+        best = min(transform_square(move // BOOK_DIM, move % BOOK_DIM,
+                                    BOOK_DIM, inverse)
+                   for move in moves)
+        return score, best
+
+    def get_moves(self, board: TTTBoard) -> List[Tuple[int, int]]:
+        """Return every best move on board for the player to move, or an
+        empty list if board is not in the book.
+        """
+        if not _in_book(board):
+            return []
+
+        form, transform = canonicalize(board)
+        entry = self._entries.get(form)
+        if entry is None:
+            return []
+
+        inverse = inverse_transform(transform)
+        return sorted(transform_square(move // BOOK_DIM, move % BOOK_DIM,
+                                       BOOK_DIM, inverse)
+                      for move in entry[1])
+
+
+if __name__ == '__main__':
+    write_book(BOOK_PATH, generate_book())
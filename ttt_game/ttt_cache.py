@@ -0,0 +1,146 @@
+"""
+Position Caches for the Tic-Tac-Toe Player
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .ttt_board import (TTTBoard, canonicalize, transform_square,
+                        inverse_transform)
+
+__all__ = ['TranspositionTable', 'SymmetryCache', 'EXACT', 'LOWER', 'UPPER']
+
+# Bound types of a stored score
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Replacement policies
+_POLICIES = ('depth', 'always')
+
+# A stored entry: (key, depth, score, bound, best move)
+Entry = Tuple[int, int, int, int, Optional[Tuple[int, int]]]
+
+
+@dataclass
+class TranspositionTable:
+    """A bounded table of search results keyed by position hash.
+
+    The table holds at most size entries. A new entry goes into slot
+    (key % size); when that slot is taken by another position, the
+    'depth' policy only replaces it with a result searched at least as
+    deep, while the 'always' policy replaces it unconditionally.
+    """
+    # === Private Attributes ===
+    # _slots:
+    #     Maps a slot index to the entry stored in it.
+    size: int = 1 << 20
+    policy: str = 'depth'
+    _slots: Dict[int, Entry] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+        """
+        if self.size <= 0:
+            raise ValueError("Table size must be positive")
+        if self.policy not in _POLICIES:
+            raise ValueError("Unknown replacement policy: " + self.policy)
+
+    def __len__(self) -> int:
+        """Return the number of entries stored in the table.
+        """
+        return len(self._slots)
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """Return the entry stored for key, or None if there is none.
+        """
+        entry = self._slots.get(key % self.size)
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int,
+              move: Optional[Tuple[int, int]]) -> None:
+        """Store the result of searching the position with the given key.
+
+        Bound should be one of EXACT, LOWER or UPPER, telling whether score
+        is the exact value of the position or a lower or upper limit on it.
+        """
+        index = key % self.size
+        if self.policy == 'depth':
+            current = self._slots.get(index)
+            if (current is not None and current[0] != key
+                    and current[1] > depth):
+                return
+        self._slots[index] = (key, depth, score, bound, move)
+
+    def clear(self) -> None:
+        """Remove every entry from the table.
+        """
+        self._slots.clear()
+
+
+@dataclass
+class SymmetryCache:
+    """A bounded cache of best moves shared by all symmetric positions.
+
+    Positions are stored under the canonical form of their board, so the 8
+    rotations and reflections of a board share one entry. Moves are stored
+    in canonical coordinates and mapped back onto the board being looked
+    up. Once size entries are stored, the least recently used is dropped.
+    """
+    # === Private Attributes ===
+    # _entries:
+    #     Maps (canonical grid, board size, win length, player) to the
+    #     stored (score, move).
+    size: int = 1 << 16
+    _entries: OrderedDict = field(init=False, default_factory=OrderedDict)
+
+    def __len__(self) -> int:
+        """Return the number of entries stored in the cache.
+        """
+        return len(self._entries)
+
+    def get(self, board: TTTBoard,
+            player: int) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """Return the stored score and best move for player on board, or None
+        if neither board nor any of its symmetries has been stored.
+        """
+        (form, transform), key = self._get_key(board, player)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+        score, (row, col) = entry
+        rows, cols = board.get_size()
+        return score, transform_square(row, col, rows,
+                                       inverse_transform(transform), cols)
+
+    def put(self, board: TTTBoard, player: int, score: int,
+            move: Tuple[int, int]) -> None:
+        """Store score and best move for player on board.
+        """
+        (form, transform), key = self._get_key(board, player)
+        rows, cols = board.get_size()
+        self._entries[key] = (
+            score, transform_square(move[0], move[1], rows, transform, cols))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def _get_key(self, board: TTTBoard, player: int
+                 ) -> Tuple[Tuple[Tuple[int, ...], int], tuple]:
+        """Return the canonical form of board with its transform, and the
+        key under which player's move on board is stored.
+        """
+        canonical = canonicalize(board)
+        return canonical, (canonical[0], board.get_size(),
+                           board.get_win_length(), player)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache.
+        """
+        self._entries.clear()
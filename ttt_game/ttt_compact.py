@@ -0,0 +1,287 @@
+"""
+Compact Tic-Tac-Toe Board
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from .ttt_board import (EMPTY, PLAYERX, PLAYERO, DRAW, STRMAP, DIRECTIONS,
+                        TTTBoard, zobrist_keys)
+
+__all__ = ['TTTCompactBoard', 'BoardSnapshot']
+
+# Immutable, hashable form of a board: one byte each for the number of
+# rows, the number of columns and the win length, then one byte per square
+# in row-major order
+BoardSnapshot = bytes
+
+# Number of bytes of a snapshot before its squares
+_HEADER = 3
+
+
+class TTTCompactBoard:
+    """A TTT board storing its grid as one byte per square, for holding
+    many positions in memory at once.
+
+    Offers the same interface as TTTBoard and can be used anywhere a
+    TTTBoard is expected. Instances have no __dict__, and clone copies a
+    single buffer.
+    """
+    # === Private Attributes ===
+    # _dim:
+    #     The dimension of the board, which is its number of rows.
+    # _cols:
+    #     The number of columns of the board.
+    # _win_length:
+    #     The number of squares in a line needed to win.
+    # _grid:
+    #     The squares of the board in row-major order, with square
+    #     (row, col) at index (row * _cols + col).
+    # _empty_count:
+    #     The number of empty squares left on the board.
+    # _winner:
+    #     The player who completed a line, or None if nobody has.
+    # _hash:
+    #     The Zobrist hash of the current game board.
+    # _keys:
+    #     The Zobrist keys of every square for each player, from
+    #     zobrist_keys.
+    __slots__ = ('_dim', '_cols', '_win_length', '_grid', '_empty_count',
+                 '_winner', '_hash', '_keys')
+
+    def __init__(self, _dim: int, _custom_board: Optional[list] = None,
+                 _cols: Optional[int] = None,
+                 _win_length: Optional[int] = None) -> None:
+        """Create a board with _dim rows and _cols columns, which defaults
+        to _dim, holding the 2D list _custom_board if given or empty
+        otherwise. The arguments are named as those of TTTBoard.
+
+        Raises ValueError if _win_length does not fit on the board.
+        """
+        dim, custom_board, cols, win_length = (_dim, _custom_board, _cols,
+                                               _win_length)
+        if cols is None:
+            cols = dim
+        if win_length is None:
+            win_length = min(dim, cols)
+        if not 0 < win_length <= max(dim, cols):
+            raise ValueError("Win length does not fit on the board")
+
+        self._dim = dim
+        self._cols = cols
+        self._win_length = win_length
+        self._grid = bytearray(dim * cols)
+        self._empty_count = dim * cols
+        self._winner = None
+        self._hash, self._keys = zobrist_keys(dim, cols, win_length)
+        if custom_board is not None:
+            # Load board grid, then look for a line
+            for row in range(dim):
+                for col in range(cols):
+                    player = custom_board[row][col]
+                    if player != EMPTY:
+                        square = row * cols + col
+                        self._grid[square] = player
+                        self._empty_count -= 1
+                        self._hash ^= self._keys[player][square]
+            self._winner = self._find_winner()
+
+    @classmethod
+    def from_board(cls, board: TTTBoard) -> TTTCompactBoard:
+        """Return a compact board holding the same position as board.
+        """
+        rows, cols = board.get_size()
+        grid = [[board.get_square(row, col) for col in range(cols)]
+                for row in range(rows)]
+        return cls(rows, grid, cols, board.get_win_length())
+
+    @classmethod
+    def from_snapshot(cls, snapshot: BoardSnapshot) -> TTTCompactBoard:
+        """Return a board holding the position of snapshot, as returned by
+        the snapshot method.
+        """
+        rows, cols, win_length = snapshot[:_HEADER]
+        grid = snapshot[_HEADER:]
+        return cls(rows, [grid[row * cols:(row + 1) * cols]
+                          for row in range(rows)], cols, win_length)
+
+    def __str__(self) -> str:
+        """Human readable representation of the board.
+        """
+        rep = ""
+        for row in range(self._dim):
+            for col in range(self._cols):
+                rep += STRMAP[self._grid[row * self._cols + col]]
+                if col == self._cols - 1:
+                    rep += "\n"
+                else:
+                    rep += " | "
+            if row != self._dim - 1:
+                rep += "-" * (4 * self._cols - 3)
+                rep += "\n"
+        return rep
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether other is a compact board holding the same
+        position, under the same rules.
+        """
+        if not isinstance(other, TTTCompactBoard):
+            return NotImplemented
+        return (self._dim == other._dim and self._cols == other._cols
+                and self._win_length == other._win_length
+                and self._grid == other._grid)
+
+    def get_dim(self) -> int:
+        """Return the dimension of the board
+
+        For a board that is not square, this is its number of rows.
+        """
+        return self._dim
+
+    def get_size(self) -> Tuple[int, int]:
+        """Return the number of rows and columns of the board.
+        """
+        return self._dim, self._cols
+
+    def get_win_length(self) -> int:
+        """Return the number of squares in a line needed to win.
+        """
+        return self._win_length
+
+    def get_square(self, row: int, col: int) -> int:
+        """Returns one of the three constants EMPTY, PLAYERX, or PLAYERO
+        that correspond to the contents of the board at position (row, col).
+        """
+        return self._grid[row * self._cols + col]
+
+    def get_hash(self) -> int:
+        """Return the Zobrist hash of the board.
+
+        Matches the hash of a TTTBoard holding the same grid.
+        """
+        return self._hash
+
+    def get_empty_squares(self) -> List[Tuple[int, int]]:
+        """Return a list of (row, col) tuples for all empty squares
+        """
+        cols = self._cols
+        return [divmod(square, cols)
+                for square, player in enumerate(self._grid)
+                if player == EMPTY]
+
+    def snapshot(self) -> BoardSnapshot:
+        """Return an immutable copy of the position, which can be used as a
+        dictionary key and takes a few dozen bytes. Boards holding the same
+        position have equal snapshots.
+
+        Raises ValueError if the board has more than 255 rows or columns.
+        """
+        return bytes((self._dim, self._cols, self._win_length)) + self._grid
+
+    def move(self, row: int, col: int, player: int) -> None:
+        """Place player on the board at position (row, col).
+
+        Player should be either the constant PLAYERX or PLAYERO.
+        Does nothing if board square is not empty.
+        """
+        square = row * self._cols + col
+        if self._grid[square] == EMPTY:
+            self._grid[square] = player
+            self._empty_count -= 1
+            self._hash ^= self._keys[player][square]
+
+            # only lines through the new square can have been completed
+            if self._winner is None and self._makes_line(row, col, player):
+                self._winner = player
+
+    def is_winning_move(self, row: int, col: int, player: int) -> bool:
+        """Return whether placing player at the empty square (row, col)
+        would complete a line for player.
+
+        The board is left unchanged.
+        """
+        square = row * self._cols + col
+        self._grid[square] = player
+        wins = self._makes_line(row, col, player)
+        self._grid[square] = EMPTY
+        return wins
+
+    def undo_move(self, row: int, col: int) -> None:
+        """Remove the player at position (row, col) from the board.
+
+        Reverts a previous call to move, including the game state reported
+        by check_win. Does nothing if board square is empty.
+        """
+        square = row * self._cols + col
+        player = self._grid[square]
+        if player != EMPTY:
+            self._grid[square] = EMPTY
+            self._empty_count += 1
+            self._hash ^= self._keys[player][square]
+
+            # the removed square may have been part of the winning line
+            if self._winner is not None:
+                self._winner = self._find_winner()
+
+    def check_win(self) -> Optional[int]:
+        """Returns a constant associated with the state of the game
+
+        If PLAYERX wins, returns PLAYERX.
+        If PLAYERO wins, returns PLAYERO.
+        If game is drawn, returns DRAW.
+        If game is in progress, returns None.
+        """
+        if self._winner is not None:
+            return self._winner
+
+        # no winner, check for draw
+        if self._empty_count == 0:
+            return DRAW
+
+        # game is still in progress
+        return None
+
+    def _makes_line(self, row: int, col: int, player: int) -> bool:
+        """Return whether the square at position (row, col) is part of a
+        line of at least _win_length squares held by player.
+        """
+        grid = self._grid
+        rows, cols = self._dim, self._cols
+        for row_step, col_step in DIRECTIONS:
+            length = 1
+            for sign in (1, -1):
+                new_row = row + sign * row_step
+                new_col = col + sign * col_step
+                while (0 <= new_row < rows and 0 <= new_col < cols
+                       and grid[new_row * cols + new_col] == player):
+                    length += 1
+                    new_row += sign * row_step
+                    new_col += sign * col_step
+            if length >= self._win_length:
+                return True
+        return False
+
+    def _find_winner(self) -> Optional[int]:
+        """Return the player holding a complete line, or None.
+
+        Squares are scanned in row-major order.
+        """
+        for square, player in enumerate(self._grid):
+            if player != EMPTY and self._makes_line(
+                    square // self._cols, square % self._cols, player):
+                return player
+        return None
+
+    def clone(self) -> TTTCompactBoard:
+        """Return a copy of the board
+        """
+        board = TTTCompactBoard.__new__(TTTCompactBoard)
+        board._dim = self._dim
+        board._cols = self._cols
+        board._win_length = self._win_length
+        board._grid = self._grid[:]
+        board._empty_count = self._empty_count
+        board._winner = self._winner
+        board._hash = self._hash
+        board._keys = self._keys
+        return board
@@ -1,56 +1,871 @@
 """
 Mini-max Tic-Tac-Toe Player
 """
-from typing import Tuple
+import inspect
+import multiprocessing
+import itertools
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
 
 from .ttt_board import *
+from .ttt_bitboard import get_win_masks
+from .ttt_book import OpeningBook, load_book
+from .ttt_cache import (TranspositionTable, SymmetryCache, EXACT, LOWER,
+                        UPPER)
+from .ttt_table import PositionTable
+from .ttt_tablebase import Tablebase, TABLEBASE_DIM, TABLEBASE_PATH
+
+# Sources of solved positions get_move can look moves up in
+PositionSource = Union[OpeningBook, PositionTable, Tablebase]
 
 # Scoring values
 SCORES = {PLAYERX: 1,
           DRAW: 0,
           PLAYERO: -1}
 
+# Score of a won game in the search, larger than any evaluate score
+WIN_SCORE = 1 << 50
+
+# Number of killer moves remembered for each ply of a search
+KILLER_SLOTS = 2
+
+# Number of positions analyze_positions reads from its input at a time
+BATCH_SIZE = 1024
+
+# Hash key mixed in when PLAYERO is the player to move
+SIDE_KEY = 0x9E3779B97F4A7C15
+
+# Transposition table shared by every search in this process
+TRANSPOSITION_TABLE = TranspositionTable()
+
+# Best moves found by get_move in this process, shared between symmetric
+# positions
+POSITION_CACHE = SymmetryCache()
+
+# Opening book shipped with the game, loaded on first use
+_BOOK: Optional[OpeningBook] = None
+_BOOK_LOADED = False
+
+# Tablebase of 4x4 positions, opened on the first use after it is built
+_TABLEBASE: Optional[Tablebase] = None
+
+# Best (score, root move index) found so far by the workers of a parallel
+# search, set in each worker process by _init_worker
+_SHARED_BEST = None
+
+# Transposition table of a worker process, kept for all of its tasks
+_WORKER_TABLE: Optional[TranspositionTable] = None
+
+# Worker pools of parallel_alpha_beta_move, started on first use and kept
+# for later searches, keyed by number of workers. Each holds the pool, the
+# best (score, root move index) its workers share, and a lock held by the
+# search using it.
+_POOLS: Dict[int, Tuple[ProcessPoolExecutor, Any, threading.Lock]] = {}
+
+
+def get_book() -> Optional[OpeningBook]:
+    """Return the opening book shipped with the game, or None if it is
+    missing or was written by another version.
+    """
+    global _BOOK, _BOOK_LOADED
+    if not _BOOK_LOADED:
+        _BOOK_LOADED = True
+        try:
+            _BOOK = load_book()
+        except (OSError, ValueError):
+            _BOOK = None
+    return _BOOK
+
+
+def get_tablebase() -> Optional[Tablebase]:
+    """Return the 4x4 tablebase at TABLEBASE_PATH, or None if it has not
+    been built or was written by another version.
+
+    Once opened, the tablebase is kept; until then, every call tries
+    again, so a tablebase built while the process runs is picked up.
+    """
+    global _TABLEBASE
+    if _TABLEBASE is None:
+        try:
+            _TABLEBASE = Tablebase(TABLEBASE_PATH)
+        except (OSError, ValueError):
+            pass
+    return _TABLEBASE
+
+
+def _default_lookup(board: TTTBoard) -> Optional[PositionSource]:
+    """Return the source of solved positions covering boards of the size of
+    board, if there is one.
+    """
+    if board.get_size() == (TABLEBASE_DIM, TABLEBASE_DIM):
+        return get_tablebase()
+    return get_book()
 
-def get_move(board: TTTBoard, player: int) -> Tuple[int, int]:
+
+def get_move(board: TTTBoard, player: int,
+             table: Optional[TranspositionTable] = None,
+             cache: Optional[SymmetryCache] = None,
+             lookup: Optional[PositionSource] = None,
+             time_limit: Optional[float] = None,
+             workers: Optional[int] = None,
+             stats: Optional['SearchStats'] = None,
+             cancel: Optional[threading.Event] = None) -> Tuple[int, int]:
     """Make a move on the board.
 
     Returns a tuple with two elements.  The first element is the score
     of the given board and the second element is the desired move as a
     tuple, (row, col).
+
+    Positions found in lookup are answered without searching. It can be
+    any source of solved positions with a probe method, such as an
+    OpeningBook, a PositionTable or a Tablebase. It defaults to the
+    tablebase from get_tablebase for 4x4 boards, once built, and to the
+    shipped 3x3 opening book otherwise. Search results are kept in table
+    and the chosen moves in cache, which default to the process-wide
+    TRANSPOSITION_TABLE and POSITION_CACHE so that later calls reuse
+    earlier work.
+
+    If time_limit is given, the search stops after about that many seconds
+    and returns the best move found so far, see iterative_deepening_move.
+    Otherwise, if workers is more than 1, the search is split between that
+    many processes, see parallel_alpha_beta_move.
+
+    If stats is given, it is filled in with where the move came from and
+    what the search did to find it, see SearchStats.
+
+    If cancel is given, the search stops soon after it is set, from
+    another thread, and SearchCancelled is raised.
+    """
+    if stats is None:
+        return _get_move(board, player, table, cache, lookup, time_limit,
+                         workers, None, cancel)
+    start = time.perf_counter()
+    move = _get_move(board, player, table, cache, lookup, time_limit,
+                     workers, stats, cancel)
+    stats.seconds += time.perf_counter() - start
+    return move
+
+
+def _get_move(board: TTTBoard, player: int,
+              table: Optional[TranspositionTable],
+              cache: Optional[SymmetryCache],
+              lookup: Optional[PositionSource],
+              time_limit: Optional[float], workers: Optional[int],
+              stats: Optional['SearchStats'],
+              cancel: Optional[threading.Event]) -> Tuple[int, int]:
+    """Make a move on the board for get_move, filling in stats if given.
     """
-    return alpha_beta_pruning_move(board, player, -2, 2)[1]
+    if table is None:
+        table = TRANSPOSITION_TABLE
+    if cache is None:
+        cache = POSITION_CACHE
+    if lookup is None:
+        lookup = _default_lookup(board)
+
+    if lookup is not None:
+        entry = lookup.probe(board, player)
+        if entry is not None:
+            if stats is not None:
+                stats.source = 'lookup'
+            return entry[1]
+
+    cached = cache.get(board, player)
+    if cached is not None:
+        if stats is not None:
+            stats.source = 'cache'
+        return cached[1]
+
+    if stats is not None:
+        stats.source = 'search'
+    if time_limit is not None:
+        return iterative_deepening_move(board.clone(), player, time_limit,
+                                        table, stats, cancel)[1]
+
+    if workers is not None and workers > 1:
+        score, move = parallel_alpha_beta_move(board.clone(), player, workers,
+                                               table, stats, cancel)
+    else:
+        score, move = alpha_beta_pruning_move(board.clone(), player, -2, 2,
+                                              table, stats=stats,
+                                              cancel=cancel)
+    if move != (-1, -1):
+        cache.put(board, player, score, move)
+    return move
 
 
 def alpha_beta_pruning_move(board: TTTBoard, player: int, alpha: int,
-                            beta: int) -> Tuple[int, Tuple[int, int]]:
+                            beta: int,
+                            table: Optional[TranspositionTable] = None,
+                            ordering: bool = True,
+                            stats: Optional['SearchStats'] = None,
+                            cancel: Optional[threading.Event] = None
+                            ) -> Tuple[int, Tuple[int, int]]:
     """A helper function for mm_move to find the best move.
 
+    Alpha and beta bound the score from the point of view of player.
+    Moves are tried by making and undoing them on the given board, which
+    is left unchanged once the search returns. Positions are looked up in
+    and saved to table, if one is given. If ordering is False, moves are
+    tried in row-major order instead of the order given by order_moves.
+    If stats is given, what the search did is added to it.
+
+    If cancel is given, the search raises SearchCancelled soon after it
+    is set, leaving board with the moves of the interrupted search on it.
+
     Returns the score and best move for the current state of the board.
     """
+    depth = len(board.get_empty_squares())
+    search = _Search(table, ordering=ordering, stats=stats, cancel=cancel)
+    score, move = _negamax(board, player, alpha * WIN_SCORE,
+                           beta * WIN_SCORE, search, depth)
+    search.finish(depth)
+    return score // WIN_SCORE * SCORES[player], move
+
+
+def count_nodes(board: TTTBoard, player: int, ordering: bool = True,
+                table: Optional[TranspositionTable] = None,
+                depth: Optional[int] = None) -> int:
+    """Return the number of positions visited by a search of board for
+    player, with or without move ordering.
+
+    The search looks depth moves ahead, or to the end of the game if depth
+    is None. No transposition table is used unless one is given.
+    """
+    if depth is None:
+        depth = len(board.get_empty_squares())
+    search = _Search(table, ordering=ordering)
+    _negamax(board.clone(), player, -2 * WIN_SCORE, 2 * WIN_SCORE, search,
+             depth)
+    return search.nodes
+
+
+def parallel_alpha_beta_move(board: TTTBoard, player: int, workers: int,
+                             table: Optional[TranspositionTable] = None,
+                             stats: Optional['SearchStats'] = None,
+                             cancel: Optional[threading.Event] = None
+                             ) -> Tuple[int, Tuple[int, int]]:
+    """Find the best move on board for player like alpha_beta_pruning_move,
+    with the moves from board searched in parallel by a pool of worker
+    processes.
+
+    The first move is searched on its own, as the serial search would, to
+    get a bound on the score. The other moves are then handed out to the
+    workers, and each worker starts its search from the best score found
+    so far by any of them, so later moves are pruned almost as much as in
+    the serial search. The score and move returned are always the same as
+    those of the serial search. Table is only used for the first move and
+    the result; each worker keeps a table of its own. The workers are
+    started by the first search with their number and kept, with their
+    tables, for later ones; searches sharing them run one after the
+    other. If stats is given, what the searches of all the processes did
+    is added to it.
+
+    If cancel is given and gets set, SearchCancelled is raised once the
+    first move or the moves the workers are searching are done. Moves not
+    yet handed out are dropped.
+    """
+    depth = len(board.get_empty_squares())
+    winner = board.check_win()
+    if winner is not None:
+        return SCORES[winner], (-1, -1)
+
+    key = board.get_hash()
+    if player == PLAYERO:
+        key ^= SIDE_KEY
+    table_move = None
+    if table is not None:
+        entry = table.probe(key)
+        if entry is not None:
+            _, entry_depth, score, bound, table_move = entry
+            if entry_depth >= depth and bound == EXACT:
+                return score // WIN_SCORE * SCORES[player], table_move
+
+    # the serial search tries the moves in this order, and keeps the first
+    # of several moves with the best score
+    moves = order_moves(board, player, board.get_empty_squares(), table_move)
+    other_player = switch_player(player)
+    search = _Search(table, stats=stats, cancel=cancel)
+    search.nodes += 1
+    board.move(moves[0][0], moves[0][1], player)
+    best_score = -_negamax(board, other_player, -2 * WIN_SCORE,
+                           2 * WIN_SCORE, search, depth - 1, 1)[0]
+    board.undo_move(moves[0][0], moves[0][1])
+    search.finish(depth)
+    best_index = 0
+
+    if best_score < WIN_SCORE and len(moves) > 1:
+        executor, shared, lock = _get_pool(workers)
+        with lock:
+            shared[:] = [best_score, best_index]
+            pending = {executor.submit(_search_root_move, board, player,
+                                       depth, index, moves[index],
+                                       stats is not None)
+                       for index in range(1, len(moves))}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        index, score, alpha, move_stats = future.result()
+                    except BrokenProcessPool:
+                        # a worker died, start a new pool next time
+                        _POOLS.pop(workers, None)
+                        raise
+                    if move_stats is not None:
+                        stats.add(move_stats)
+                    # scores above alpha are exact, lower ones only bounds
+                    if score > alpha and (score, -index) > (best_score,
+                                                            -best_index):
+                        best_score, best_index = score, index
+
+                cancelled = cancel is not None and cancel.is_set()
+                if best_score >= WIN_SCORE or cancelled:
+                    # later moves cannot beat a win, nor are they wanted
+                    # once the search is cancelled
+                    for future in list(pending):
+                        if future.cancel():
+                            pending.remove(future)
+
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled()
+
+    best_move = moves[best_index]
+    if table is not None:
+        table.store(key, depth, best_score, EXACT, best_move)
+    return best_score // WIN_SCORE * SCORES[player], best_move
+
+
+def _get_pool(workers: int) -> Tuple[ProcessPoolExecutor, Any,
+                                     threading.Lock]:
+    """Return the pool of parallel_alpha_beta_move with the given number of
+    workers, with its shared best score and its lock, starting it on first
+    use.
+
+    The worker processes and their transposition tables are kept between
+    searches, so later searches neither start processes nor lose the
+    positions solved by earlier ones.
+    """
+    if workers not in _POOLS:
+        shared = multiprocessing.Array('q', 2)
+        _POOLS[workers] = (ProcessPoolExecutor(workers,
+                                               initializer=_init_worker,
+                                               initargs=(shared,)),
+                           shared, threading.Lock())
+    return _POOLS[workers]
+
+
+def shutdown_pools() -> None:
+    """Shut down the worker pools started by parallel_alpha_beta_move.
+    """
+    while _POOLS:
+        _, (executor, _, _) = _POOLS.popitem()
+        executor.shutdown()
+
+
+def _init_worker(shared=None) -> None:
+    """Set up a worker process of parallel_alpha_beta_move, where shared
+    holds the best score and root move index found so far, or of
+    analyze_positions.
+    """
+    global _SHARED_BEST, _WORKER_TABLE
+    _SHARED_BEST = shared
+    _WORKER_TABLE = TranspositionTable()
+
+
+def _search_root_move(board: TTTBoard, player: int, depth: int, index: int,
+                      move: Tuple[int, int], collect: bool = False
+                      ) -> Tuple[int, int, int, Optional['SearchStats']]:
+    """Search move, the index-th root move of a parallel search of board.
+
+    Returns index, the score of move for player, the alpha it was
+    searched with, and the statistics of the search if collect is True.
+    Scores above alpha are exact; the others are only upper bounds on the
+    score, too low for move to be chosen.
+    """
+    stats = SearchStats() if collect else None
+    with _SHARED_BEST.get_lock():
+        best_score, best_index = _SHARED_BEST[:]
+    if best_score >= WIN_SCORE and best_index < index:
+        return index, -2 * WIN_SCORE, -2 * WIN_SCORE, stats
+
+    # a move tying with an earlier one is not chosen, so it need not be
+    # scored exactly
+    alpha = best_score if best_index < index else best_score - 1
+    board.move(move[0], move[1], player)
+    search = _Search(_WORKER_TABLE, stats=stats)
+    score = -_negamax(board, switch_player(player), -2 * WIN_SCORE, -alpha,
+                      search, depth - 1, 1)[0]
+    search.finish(0)
+
+    if score > alpha:
+        with _SHARED_BEST.get_lock():
+            if (score, -index) > (_SHARED_BEST[0], -_SHARED_BEST[1]):
+                _SHARED_BEST[:] = [score, index]
+    return index, score, alpha, stats
+
+
+def analyze_positions(positions: Iterable[Tuple[TTTBoard, int]],
+                      workers: Optional[int] = None,
+                      table: Optional[TranspositionTable] = None,
+                      cache: Optional[SymmetryCache] = None,
+                      batch_size: int = BATCH_SIZE
+                      ) -> Iterator[Tuple[int, Tuple[int, int]]]:
+    """Solve every (board, player) pair of positions.
+
+    Yields the score for PLAYERX and the best move for player of each
+    position, in the order of positions, or (-1, -1) as the move of a
+    finished game. Positions are read batch_size at a time, so that only
+    one batch is held in memory however many there are. Each batch is
+    solved once per distinct position, counting the rotations and
+    reflections of a board as the same, and positions already in cache
+    are not solved again. Results are added to cache, which defaults to a
+    new one shared by the whole call.
+
+    If workers is more than 1, the positions are solved by that many
+    processes, each keeping a transposition table for all the positions
+    it is given. Otherwise they are solved in this process using table,
+    which defaults to a new table shared by the whole call.
+    """
+    if table is None:
+        table = TranspositionTable()
+    if cache is None:
+        cache = SymmetryCache()
+
+    executor = None
+    if workers is not None and workers > 1:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker)
+
+    try:
+        positions = iter(positions)
+        batch = list(itertools.islice(positions, batch_size))
+        while batch:
+            # find the distinct positions not solved before
+            unsolved = {}
+            for board, player in batch:
+                if (board.check_win() is None
+                        and cache.get(board, player) is None):
+                    key = (canonicalize(board)[0], board.get_size(),
+                           board.get_win_length(), player)
+                    unsolved.setdefault(key, (board, player))
+
+            if executor is not None:
+                boards = [board for board, _ in unsolved.values()]
+                players = [player for _, player in unsolved.values()]
+                results = executor.map(_analyze_position, boards, players,
+                                       chunksize=max(1, len(boards) //
+                                                     (4 * workers)))
+            else:
+                results = (_solve_position(board, player, table)
+                           for board, player in unsolved.values())
+            for (board, player), (score, move) in zip(unsolved.values(),
+                                                      results):
+                cache.put(board, player, score, move)
+
+            # the cache maps the move onto each symmetry of the board
+            for board, player in batch:
+                winner = board.check_win()
+                if winner is not None:
+                    yield SCORES[winner], (-1, -1)
+                    continue
+                entry = cache.get(board, player)
+                if entry is None:
+                    # dropped from a cache smaller than the batch
+                    entry = _solve_position(board, player, table)
+                    cache.put(board, player, *entry)
+                yield entry
+
+            batch = list(itertools.islice(positions, batch_size))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _solve_position(board: TTTBoard, player: int,
+                    table: Optional[TranspositionTable]
+                    ) -> Tuple[int, Tuple[int, int]]:
+    """Return the score for PLAYERX and the best move for player on board,
+    looked up in the shipped opening book or 4x4 tablebase, or searched
+    using table.
+    """
+    lookup = _default_lookup(board)
+    if lookup is not None:
+        entry = lookup.probe(board, player)
+        if entry is not None:
+            return entry
+
+    return alpha_beta_pruning_move(board.clone(), player, -2, 2, table)
+
+
+def _analyze_position(board: TTTBoard,
+                      player: int) -> Tuple[int, Tuple[int, int]]:
+    """Solve board for player in a worker process of analyze_positions.
+    """
+    return _solve_position(board, player, _WORKER_TABLE)
+
+
+def iterative_deepening_move(board: TTTBoard, player: int, time_limit: float,
+                             table: Optional[TranspositionTable] = None,
+                             stats: Optional['SearchStats'] = None,
+                             cancel: Optional[threading.Event] = None
+                             ) -> Tuple[int, Tuple[int, int]]:
+    """Find the best move on board for player within time_limit seconds.
+
+    Searches one move ahead, then two, and so on until the game is solved
+    or time runs out, scoring unfinished positions at the search horizon
+    with evaluate. The best moves of each search are kept in table, which
+    defaults to a new table, and tried first by the next one.
+
+    Time is checked at every position, so the search stops about
+    time_limit seconds after it started, even on large boards.
+
+    Returns the score for PLAYERX, in units of WIN_SCORE for a won game,
+    and the best move of the deepest search. A search cut off in the
+    middle counts once it has searched the first move, the best move of
+    the search before it; if not even that is done within the time
+    limit, the first empty square is returned. If stats is given, what
+    all the searches did is added to it, with the depth of the deepest
+    completed one. Board is left unchanged, even by a search cut off in
+    the middle.
+
+    If cancel is given, SearchCancelled is raised soon after it is set.
+    """
+    deadline = time.perf_counter() + time_limit
+    if table is None:
+        table = TranspositionTable()
+    search = _Search(table, deadline, stats=stats, cancel=cancel)
+
+    # an interrupted search leaves its moves on the board it searches
+    board = board.clone()
+
+    winner = board.check_win()
+    if winner is not None:
+        return SCORES[winner] * WIN_SCORE, (-1, -1)
+    moves = board.get_empty_squares()
+    best_score, best_move = 0, moves[0]
+
+    completed = 0
+    for depth in range(1, len(moves) + 1):
+        search.root_best = None
+        try:
+            score, move = _negamax(board, player, -2 * WIN_SCORE,
+                                   2 * WIN_SCORE, search, depth)
+        except _SearchTimeout:
+            # the moves searched are tried best first, so the best of
+            # them is at least as good as the last search's move
+            if search.root_best is not None:
+                score, move = search.root_best
+                best_score, best_move = score * SCORES[player], move
+            break
+
+        completed = depth
+        best_score, best_move = score * SCORES[player], move
+        if abs(score) >= WIN_SCORE:
+            # the game is decided, searching deeper cannot change the move
+            break
+
+    search.finish(completed)
+    return best_score, best_move
+
+
+def evaluate(board: TTTBoard, player: int) -> int:
+    """Estimate how good board is for player without searching it.
+
+    Every line a player could still complete counts for that player, more
+    so the more of it the player already holds. On boards of up to 20
+    rows and columns the score is always less than WIN_SCORE in size.
+    """
+    rows, cols = board.get_size()
+    xmask = 0
+    omask = 0
+    for row in range(rows):
+        for col in range(cols):
+            square = board.get_square(row, col)
+            if square == PLAYERX:
+                xmask |= 1 << (row * cols + col)
+            elif square == PLAYERO:
+                omask |= 1 << (row * cols + col)
+
+    score = 0
+    for mask in get_win_masks(rows, cols, board.get_win_length()):
+        xline = xmask & mask
+        oline = omask & mask
+        if xline and not oline:
+            score += 1 << (2 * bin(xline).count('1'))
+        elif oline and not xline:
+            score -= 1 << (2 * bin(oline).count('1'))
+
+    return score * SCORES[player]
+
+
+def order_moves(board: TTTBoard, player: int, moves: List[Tuple[int, int]],
+                first: Optional[Tuple[int, int]] = None,
+                killers: Tuple[Tuple[int, int], ...] = (),
+                history: Optional[Dict[Tuple[int, int], int]] = None
+                ) -> List[Tuple[int, int]]:
+    """Return moves sorted so that the best are likely to be tried first.
+
+    Moves come in this order: moves that win at once, which nothing can
+    beat, kept in row-major order; first, usually the best move found by
+    an earlier search; moves that block the other player from winning at
+    once; killers, moves that refuted other lines of the same search; then
+    by history score, and finally by distance from the centre of the
+    board.
+    """
+    other_player = switch_player(player)
+    rows, cols = board.get_size()
+    if history is None:
+        history = {}
+
+    def priority(move: Tuple[int, int]) -> tuple:
+        """Return the sort key of move, lowest first.
+        """
+        row, col = move
+        if board.is_winning_move(row, col, player):
+            return (0,)
+
+        blocks = board.is_winning_move(row, col, other_player)
+        centre = (2 * row - rows + 1) ** 2 + (2 * col - cols + 1) ** 2
+        return (1, move != first, not blocks, move not in killers,
+                -history.get(move, 0), centre)
+
+    # sorting is stable, so winning moves keep their order
+    return sorted(moves, key=priority)
+
+
+@dataclass
+class SearchStats:
+    """Statistics of a move search, filled in when passed to get_move or a
+    search function.
+
+    Counts add up when the same instance is passed to several searches.
+    Searches given no statistics only pay for a check that they are None.
+    """
+    # source:
+    #     Where get_move found the move: 'lookup', 'cache' or 'search'.
+    # nodes:
+    #     The number of positions visited.
+    # terminals:
+    #     The number of finished games and positions at the search horizon
+    #     scored without searching further.
+    # cutoffs:
+    #     Maps each ply, the number of moves from the searched position, to
+    #     the number of positions there whose remaining moves were pruned.
+    # probes:
+    #     The number of transposition table lookups.
+    # hits:
+    #     The number of lookups whose stored result was used as it was.
+    # depth:
+    #     The number of moves the search looked ahead.
+    # seconds:
+    #     The wall time spent in get_move.
+    source: str = ''
+    nodes: int = 0
+    terminals: int = 0
+    cutoffs: Dict[int, int] = field(default_factory=dict)
+    probes: int = 0
+    hits: int = 0
+    depth: int = 0
+    seconds: float = 0.0
+
+    def hit_rate(self) -> float:
+        """Return the fraction of transposition table lookups that were
+        hits, or 0.0 if there were none.
+        """
+        return self.hits / self.probes if self.probes else 0.0
+
+    def branching_factor(self) -> float:
+        """Return the effective branching factor, the number of moves
+        searched per position that would visit as many positions in a
+        search as deep as this one, or 0.0 if nothing was searched.
+        """
+        if not self.depth or not self.nodes:
+            return 0.0
+        return self.nodes ** (1 / self.depth)
+
+    def add(self, other: 'SearchStats') -> None:
+        """Add the counts of other, a search run alongside this one.
+        """
+        self.nodes += other.nodes
+        self.terminals += other.terminals
+        for ply, count in other.cutoffs.items():
+            self.cutoffs[ply] = self.cutoffs.get(ply, 0) + count
+        self.probes += other.probes
+        self.hits += other.hits
+        self.depth = max(self.depth, other.depth)
+
+    def __str__(self) -> str:
+        """Human readable summary of the statistics.
+        """
+        return ("{}: {} nodes, {} terminals, {} cutoffs, {:.1%} table hits, "
+                "depth {}, branching {:.2f}, {:.3f} s".format(
+                    self.source or 'search', self.nodes, self.terminals,
+                    sum(self.cutoffs.values()), self.hit_rate(), self.depth,
+                    self.branching_factor(), self.seconds))
+
+
+def takes_keyword(function: Callable, name: str) -> bool:
+    """Return whether function takes a keyword argument called name, such
+    as the stats argument of get_move.
+    """
+    try:
+        return name in inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+@dataclass
+class _Search:
+    """State shared by all positions visited by one search.
+    """
+    # table:
+    #     Transposition table to use, if any.
+    # deadline:
+    #     The time.perf_counter() value when the search must stop, if any.
+    # cancel:
+    #     Event set from another thread to stop the search, if any.
+    # ordering:
+    #     Whether to sort moves with order_moves.
+    # nodes:
+    #     The number of positions visited so far.
+    # killers:
+    #     Maps each ply to the latest moves that caused a cutoff there.
+    # history:
+    #     Maps each move to a score growing with the cutoffs it caused.
+    # stats:
+    #     Statistics to add what the search does to, if any.
+    # root_best:
+    #     The best score and move among the moves from the root searched
+    #     so far, if any.
+    table: Optional[TranspositionTable] = None
+    deadline: Optional[float] = None
+    ordering: bool = True
+    nodes: int = 0
+    killers: Dict[int, Tuple[Tuple[int, int], ...]] = field(
+        default_factory=dict)
+    history: Dict[Tuple[int, int], int] = field(default_factory=dict)
+    stats: Optional['SearchStats'] = None
+    cancel: Optional[threading.Event] = None
+    root_best: Optional[Tuple[int, Tuple[int, int]]] = None
+
+    def finish(self, depth: int) -> None:
+        """Add the number of positions visited to stats, if any, and raise
+        its depth to depth, the number of moves the search looked ahead.
+        """
+        if self.stats is not None:
+            self.stats.nodes += self.nodes
+            self.stats.depth = max(self.stats.depth, depth)
+
+
+class _SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out.
+    """
+
+
+class SearchCancelled(Exception):
+    """Raised by a search when its cancel event is set.
+    """
+
+
+def _negamax(board: TTTBoard, player: int, alpha: int, beta: int,
+             search: _Search, depth: int, ply: int = 0
+             ) -> Tuple[int, Tuple[int, int]]:
+    """Search the board with alpha-beta pruning, looking depth moves ahead.
+    Ply is the number of moves made since the start of the search.
+
+    Raises _SearchTimeout if the deadline of search has passed, or
+    SearchCancelled if its cancel event is set, which leaves board with
+    the moves of the interrupted search on it.
+
+    Returns the score from the point of view of player and the best move.
+    """
     # initialize local variables
     other_player = switch_player(player)
     best_move = (-1, -1)
-    best_score = -2
+    best_score = -2 * WIN_SCORE
+    search.nodes += 1
+    stats = search.stats
 
     # base case
-    if board.check_win() is not None:
-        return SCORES[board.check_win()], best_move
+    winner = board.check_win()
+    if winner is not None:
+        if stats is not None:
+            stats.terminals += 1
+        return SCORES[winner] * SCORES[player] * WIN_SCORE, best_move
+    if search.deadline is not None and time.perf_counter() > search.deadline:
+        raise _SearchTimeout()
+    if search.cancel is not None and search.cancel.is_set():
+        raise SearchCancelled()
+    if depth == 0:
+        if stats is not None:
+            stats.terminals += 1
+        return evaluate(board, player), best_move
+
+    # look for a stored result of this position
+    moves = board.get_empty_squares()
+    depth = min(depth, len(moves))
+    key = board.get_hash()
+    if player == PLAYERO:
+        key ^= SIDE_KEY
+    table_move = None
+    if search.table is not None:
+        entry = search.table.probe(key)
+        if stats is not None:
+            stats.probes += 1
+        if entry is not None:
+            _, entry_depth, score, bound, table_move = entry
+            if entry_depth >= depth and (
+                    bound == EXACT or (bound == LOWER and score >= beta)
+                    or (bound == UPPER and score <= alpha)):
+                if stats is not None:
+                    stats.hits += 1
+                return score, table_move
+
+    # try the moves most likely to be best first
+    if search.ordering:
+        moves = order_moves(board, player, moves, table_move,
+                            search.killers.get(ply, ()), search.history)
+    elif table_move in moves:
+        moves.remove(table_move)
+        moves.insert(0, table_move)
 
     # recursive case
-    for move in board.get_empty_squares():
-        trial = board.clone()
-        trial.move(move[0], move[1], player)
-        score = alpha_beta_pruning_move(trial, other_player, -beta,
-                                        -max(alpha, best_score))[0]
-        alpha = score * SCORES[player]
-
-        if alpha == 1:
-            return score, move
-        elif alpha > best_score:
-            best_score = alpha
+    for move in moves:
+        board.move(move[0], move[1], player)
+        score = -_negamax(board, other_player, -beta,
+                          -max(alpha, best_score), search, depth - 1,
+                          ply + 1)[0]
+        board.undo_move(move[0], move[1])
+
+        if score > best_score:
+            best_score = score
             best_move = move
+            if ply == 0:
+                search.root_best = (best_score, best_move)
 
-        if best_score >= beta:
+        if best_score >= WIN_SCORE or best_score >= beta:
+            if stats is not None:
+                stats.cutoffs[ply] = stats.cutoffs.get(ply, 0) + 1
+            if search.ordering:
+                # remember the refutation for sibling positions
+                killers = search.killers.get(ply, ())
+                if move not in killers:
+                    search.killers[ply] = ((move,) + killers)[:KILLER_SLOTS]
+                search.history[move] = search.history.get(move, 0) + (
+                    depth * depth)
             break
 
-    return best_score * SCORES[player], best_move
+    # save result
+    if search.table is not None:
+        if best_score <= alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        search.table.store(key, depth, best_score, bound, best_move)
+
+    return best_score, best_move
@@ -2,23 +2,59 @@
 GUI module for Tic Tac Toe game
 """
 import pygame
+import itertools
+import logging
 import math
+import threading
+import time
 
-from typing import Callable, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 
 from pygame.font import Font
 
 from .ttt_board import *
-
-# Init pygame
-pygame.init()
+from .ttt_computer import SearchCancelled, SearchStats, takes_keyword
 
 # GUI constants
 GUI_WIDTH = 400
 GUI_HEIGHT = 500
 BAR_WIDTH = 5
 
+# Event posted by the background thread computing an AI move
+AI_MOVE_EVENT = pygame.USEREVENT + 1
+
+# Indicator shown while the AI is computing its move
+THINKING = "thinking\u2026"
+
+# Milliseconds between updates of the indicator while the AI is thinking
+THINKING_REFRESH = 1000
+
+# Event posted every THINKING_REFRESH milliseconds while the AI is thinking
+THINKING_EVENT = pygame.USEREVENT + 2
+
+# Area of the screen holding the status message
+MESSAGE_RECT = pygame.Rect(0, 0, 250, 95)
+
+# Area of the screen holding the new game button
+BUTTON_RECT = pygame.Rect(250, 20, 120, 50)
+
+# Logger the statistics of every AI move are written to
+logger = logging.getLogger(__name__)
+
+# Identifiers of AI searches, so results of cancelled ones are ignored
+_search_ids = itertools.count(1)
+
+# The empty grid and the glyph of each player, rendered once per board size
+BoardSurfaces = Tuple[pygame.Surface, Dict[int, pygame.Surface]]
+_board_surfaces: Dict[Tuple[int, int, int], BoardSurfaces] = {}
+
+# Fonts loaded so far, keyed by size
+_fonts: Dict[int, Font] = {}
+
+# Texts rendered so far, keyed by (text, font)
+_texts: Dict[Tuple[str, Font], pygame.Surface] = {}
+
 # Colour constants
 white = (255, 255, 255)
 black = (0, 0, 0)
@@ -43,27 +79,63 @@ class TTTGUI:
     # start new game
     board: TTTBoard = field(init=False)
     in_progress: bool = True
-    wait: bool = False
     turn: int = PLAYERX
     message: str = "X Turn!"
 
+    # board shape, defaulting to a square board won with a full line
+    cols: Optional[int] = None
+    win_length: Optional[int] = None
+
+    # identifier, start time and cancel event of the AI search running in
+    # the background, if any
+    search_id: Optional[int] = field(init=False, default=None)
+    search_start: float = field(init=False, default=0.0)
+    search_cancel: Optional[threading.Event] = field(init=False,
+                                                     default=None)
+
+    # pre-rendered grid and glyphs for this board size
+    grid_surface: pygame.Surface = field(init=False)
+    glyphs: Dict[int, pygame.Surface] = field(init=False)
+
+    # what is currently on the screen, so only changes are drawn
+    redraw: bool = field(init=False, default=True)
+    shown_squares: Dict[Tuple[int, int], int] = field(init=False,
+                                                      default_factory=dict)
+    shown_message: Optional[Tuple[str, str]] = field(init=False,
+                                                     default=None)
+    shown_hover: Optional[bool] = field(init=False, default=None)
+
     def __post_init__(self) -> None:
         """Initialize any variables that requires other var to be initialized.
         """
-        self.bar_spacing = GUI_WIDTH // self.size
-        self.board = TTTBoard(self.size)
+        if self.cols is None:
+            self.cols = self.size
+        self.bar_spacing = min(GUI_WIDTH // self.cols,
+                               (GUI_HEIGHT - 100) // self.size)
+        self.board = TTTBoard(self.size, None, self.cols, self.win_length)
+
+        shape = (self.size, self.cols, self.bar_spacing)
+        if shape not in _board_surfaces:
+            _board_surfaces[shape] = self.render_board()
+        self.grid_surface, self.glyphs = _board_surfaces[shape]
 
     def new_game(self) -> None:
-        """Run game loop and start new game.
+        """Start new game.
         """
-        self.screen.fill(black)
-        game_loop(self.size, self.ai_player, self.ai_function)
-
-    def click(self) -> None:
-        """Make human move.
+        self.cancel_ai()
+        self.board = TTTBoard(self.size, None, self.cols, self.win_length)
+        self.in_progress = True
+        self.turn = PLAYERX
+        self.message = "X Turn!"
+        self.redraw = True
+
+    def click(self, mouse_pos: Tuple[int, int]) -> None:
+        """Handle a click at mouse_pos: start a new game if the new game
+        button was clicked, otherwise make human move.
         """
-        # get mouse position
-        mouse_pos = pygame.mouse.get_pos()
+        if BUTTON_RECT.collidepoint(mouse_pos):
+            self.new_game()
+            return
 
         # change status message
         if self.message == "X Turn!":
@@ -74,8 +146,9 @@ class TTTGUI:
             row, col = self.get_grid_from_coords(
                 (mouse_pos[0], mouse_pos[1] - 100))
 
-            # only move if the square is empty
-            if self.board.get_square(row, col) == EMPTY:
+            # only move if the square is on the board and empty
+            if (0 <= row < self.size and 0 <= col < self.cols
+                    and self.board.get_square(row, col) == EMPTY):
                 self.board.move(row, col, self.human_player)
                 self.turn = self.ai_player
 
@@ -83,7 +156,6 @@ class TTTGUI:
                 winner = self.board.check_win()
                 if winner is not None:
                     self.game_over(winner)
-                self.wait = True
 
     def aimove(self) -> None:
         """Make AI move.
@@ -92,19 +164,87 @@ class TTTGUI:
         if self.message == "O Turn!":
             self.message = "X Turn!"
 
+        # compute the move in the background, the GUI is updated when
+        # ai_done receives it
+        if (self.in_progress and self.turn == self.ai_player
+                and self.search_id is None):
+            self.search_id = next(_search_ids)
+            self.search_start = time.perf_counter()
+            self.search_cancel = threading.Event()
+            threading.Thread(target=self.run_ai,
+                             args=(self.board.clone(), self.search_id,
+                                   self.search_cancel),
+                             daemon=True).start()
+
+    def run_ai(self, board: TTTBoard, search_id: int,
+               cancel: threading.Event) -> None:
+        """Compute the AI move on board and post it as an AI_MOVE_EVENT.
+
+        Runs in a background thread, so that the GUI keeps responding
+        while the AI function searches.
+
+        If the AI function takes a stats argument, as get_move does, the
+        SearchStats it fills in are posted with the move. If it takes a
+        cancel argument, it is given cancel, which cancel_ai sets to stop
+        the search; nothing is posted for a cancelled search.
+        """
+        kwargs = {}
+        stats = None
+        if takes_keyword(self.ai_function, 'stats'):
+            stats = kwargs['stats'] = SearchStats()
+        if takes_keyword(self.ai_function, 'cancel'):
+            kwargs['cancel'] = cancel
+        try:
+            move = self.ai_function(board, self.ai_player, **kwargs)
+        except SearchCancelled:
+            return
+        except Exception as error:
+            pygame.event.post(pygame.event.Event(
+                AI_MOVE_EVENT, search_id=search_id, move=None, error=error,
+                stats=stats))
+        else:
+            pygame.event.post(pygame.event.Event(
+                AI_MOVE_EVENT, search_id=search_id, move=move, error=None,
+                stats=stats))
+
+    def ai_done(self, event: pygame.event.Event) -> None:
+        """Make the AI move computed in the background.
+
+        Moves of cancelled searches are ignored. The statistics of the
+        search, if any, are logged at INFO level.
+        """
+        if event.search_id != self.search_id:
+            return
+        self.search_id = None
+        self.search_cancel = None
+        if event.error is not None:
+            raise event.error
+
         # draw computer icon and check win
-        if self.in_progress and (self.turn == self.ai_player):
-            row, col = self.ai_function(self.board, self.ai_player)
+        row, col = event.move
+        if event.stats is not None:
+            logger.info("AI move %s: %s", event.move, event.stats)
+
+        # only move if the square is empty
+        if self.board.get_square(row, col) == EMPTY:
+            self.board.move(row, col, self.ai_player)
+        self.turn = self.human_player
+
+        # check winner
+        winner = self.board.check_win()
+        if winner is not None:
+            self.game_over(winner)
 
-            # only move if the square is empty
-            if self.board.get_square(row, col) == EMPTY:
-                self.board.move(row, col, self.ai_player)
-            self.turn = self.human_player
+    def cancel_ai(self) -> None:
+        """Cancel the AI search running in the background, if any.
 
-            # check winner
-            winner = self.board.check_win()
-            if winner is not None:
-                self.game_over(winner)
+        AI functions taking a cancel argument stop searching; others run
+        to their end, but their move is ignored.
+        """
+        if self.search_cancel is not None:
+            self.search_cancel.set()
+        self.search_id = None
+        self.search_cancel = None
 
     def game_over(self, winner: Optional[int]) -> None:
         """Game over.
@@ -142,66 +282,131 @@ class TTTGUI:
         return (pos_y // self.bar_spacing,  # row
                 pos_x // self.bar_spacing)  # col
 
-    def drawx(self, pos: Tuple[float, float]) -> None:
+    def drawx(self, surface: pygame.Surface,
+              pos: Tuple[float, float]) -> None:
         """Draw an X on the given canvas at the given position.
         """
         half_size = .4 * self.bar_spacing
-        pygame.draw.line(self.screen, black,
+        pygame.draw.line(surface, black,
                          (pos[0] - half_size, pos[1] - half_size),
                          (pos[0] + half_size, pos[1] + half_size), BAR_WIDTH)
-        pygame.draw.line(self.screen, black,
+        pygame.draw.line(surface, black,
                          (pos[0] + half_size, pos[1] - half_size),
                          (pos[0] - half_size, pos[1] + half_size), BAR_WIDTH)
 
-    def drawo(self, pos: Tuple[float, float]) -> None:
+    def drawo(self, surface: pygame.Surface,
+              pos: Tuple[float, float]) -> None:
         """Draw an O on the given canvas at the given position.
         """
         half_size = .4 * self.bar_spacing
-        pygame.draw.circle(self.screen, black,
+        pygame.draw.circle(surface, black,
                            (math.ceil(pos[0]), math.ceil(pos[1])),
                            math.ceil(half_size), BAR_WIDTH)
 
-    def draw(self) -> None:
+    def render_board(self) -> BoardSurfaces:
+        """Render the empty grid and the X and O glyphs for this board size.
+        """
+        # Draw in bar lines
+        grid = pygame.Surface((GUI_WIDTH, GUI_HEIGHT - 100))
+        grid.fill(white)
+        grid_width = self.cols * self.bar_spacing
+        grid_height = self.size * self.bar_spacing
+        for col in range(self.cols):
+            bar_start = col * self.bar_spacing
+            pygame.draw.line(grid, black, (bar_start, 0),
+                             (bar_start, grid_height), BAR_WIDTH)
+        for row in range(self.size):
+            bar_start = row * self.bar_spacing
+            pygame.draw.line(grid, black, (0, bar_start),
+                             (grid_width, bar_start), BAR_WIDTH)
+
+        # Draw the glyphs centred on transparent squares
+        glyphs = {}
+        centre = self.get_coords_from_grid(0, 0)
+        for player, draw_glyph in ((PLAYERX, self.drawx),
+                                   (PLAYERO, self.drawo)):
+            glyph = pygame.Surface((self.bar_spacing, self.bar_spacing),
+                                   pygame.SRCALPHA)
+            draw_glyph(glyph, centre)
+            glyphs[player] = glyph.convert_alpha()
+
+        return grid.convert(), glyphs
+
+    def draw(self) -> List[pygame.Rect]:
         """Updates the tic-tac-toe GUI.
+
+        Only the parts of the screen that changed since the last call are
+        drawn again. Returns the areas of the screen drawn on.
         """
-        # Draw in new game button
-        self.button_object("New Game", 250, 20, 120, 50, green, bright_green,
-                           self.new_game)
+        rects = []
+        if self.redraw:
+            self.screen.fill(white)
+            self.screen.blit(self.grid_surface, (0, 100))
+            self.shown_squares = {}
+            self.shown_message = None
+            self.shown_hover = None
+            self.redraw = False
+            rects.append(self.screen.get_rect())
 
-        # Draw in bar lines
-        for bar_start in range(0, GUI_WIDTH - 1, self.bar_spacing):
-            pygame.draw.line(self.screen, black, (bar_start, 100),
-                             (bar_start, GUI_HEIGHT), BAR_WIDTH)
-            pygame.draw.line(self.screen, black, (0, bar_start + 100),
-                             (GUI_WIDTH, bar_start + 100), BAR_WIDTH)
+        # Draw in new game button
+        button = self.button_object("New Game", *BUTTON_RECT, green,
+                                    bright_green)
+        if button is not None:
+            rects.append(button)
 
-        # Draw the current players' moves
+        # Draw the squares changed since they were last drawn
         for row in range(self.size):
-            for col in range(self.size):
+            for col in range(self.cols):
                 symbol = self.board.get_square(row, col)
-                coords = self.get_coords_from_grid(row, col)
-                if symbol == PLAYERX:
-                    self.drawx((coords[0], coords[1] + 100))
-                elif symbol == PLAYERO:
-                    self.drawo((coords[0], coords[1] + 100))
+                if self.shown_squares.get((row, col), EMPTY) == symbol:
+                    continue
+                self.shown_squares[(row, col)] = symbol
+                rect = pygame.Rect(col * self.bar_spacing,
+                                   row * self.bar_spacing + 100,
+                                   self.bar_spacing, self.bar_spacing)
+                self.screen.blit(self.grid_surface, rect,
+                                 rect.move(0, -100))
+                if symbol != EMPTY:
+                    self.screen.blit(self.glyphs[symbol], rect)
+                rects.append(rect)
 
         # Run AI, if necessary
-        if not self.wait:
-            self.aimove()
-        else:
-            self.wait = False
+        self.aimove()
+
+        return rects
 
-    def message_display(self) -> None:
+    def message_display(self) -> List[pygame.Rect]:
         """Displays message onto the screen.
+
+        Returns the area of the screen drawn on, if the message changed.
         """
+        # show that the AI is computing its move, and for how long
+        thinking = ""
+        if self.search_id is not None:
+            thinking = THINKING
+            seconds = int(time.perf_counter() - self.search_start)
+            if seconds > 0:
+                thinking += " {}s".format(seconds)
+
+        shown = (self.message, thinking)
+        if shown == self.shown_message:
+            return []
+        self.shown_message = shown
+
         # set font and draw message onto screen
-        font = pygame.font.Font('freesansbold.ttf', 30)
-        text_surf, text_rect = text_objects(self.message, font)
+        self.screen.fill(white, MESSAGE_RECT)
+        text_surf, text_rect = text_objects(self.message, get_font(30))
         text_rect.center = (100, 50)
         self.screen.blit(text_surf, text_rect)
 
-        # update display
-        pygame.display.update()
+        if thinking:
+            # the seconds change every time, so the text is not kept
+            text_surf, text_rect = text_objects(thinking, get_font(18),
+                                                cache=False)
+            text_rect.center = (100, 82)
+            self.screen.blit(text_surf, text_rect)
+
+        return [MESSAGE_RECT]
 
     def button_object(self,
                       text: str,
@@ -210,73 +415,102 @@ class TTTGUI:
                       width: float,
                       height: float,
                       init_color: Tuple[int, int, int],
-                      active_color: Tuple[int, int, int],
-                      action: Optional[Callable] = None) -> None:
-        """New game button handler.
+                      active_color: Tuple[int, int, int]
+                      ) -> Optional[pygame.Rect]:
+        """Draw the new game button, highlighted when hovered.
+
+        Returns the area of the button, if it was drawn again.
         """
         # get mouse state
         mouse = pygame.mouse.get_pos()
-        click = pygame.mouse.get_pressed()
-
-        # change button color when hovered
-        if x + width > mouse[0] > x and y + height > mouse[1] > y:
-            pygame.draw.rect(self.screen, active_color, (x, y, width, height))
+        hover = x + width > mouse[0] > x and y + height > mouse[1] > y
 
-            # check whether the button is clicked or not
-            if click[0] == 1 and action is not None:
-                action()
+        # only draw when the hover state changes
+        if hover == self.shown_hover:
+            return None
+        self.shown_hover = hover
 
-        # switch button color to original
-        else:
-            pygame.draw.rect(self.screen, init_color, (x, y, width, height))
+        # change button color when hovered
+        rect = pygame.Rect(x, y, width, height)
+        pygame.draw.rect(self.screen, active_color if hover else init_color,
+                         rect)
 
         # set font for button
-        font = pygame.font.Font('freesansbold.ttf', 18)
-        text_surf, text_rect = text_objects(text, font)
+        text_surf, text_rect = text_objects(text, get_font(18))
         text_rect.center = (310, 45)
         self.screen.blit(text_surf, text_rect)
+        return rect
 
 
-def text_objects(text: str, font: Font) -> Tuple:
+def get_font(size: int) -> Font:
+    """Return the game font in the given size, loading it on first use.
+    """
+    if size not in _fonts:
+        _fonts[size] = pygame.font.Font('freesansbold.ttf', size)
+    return _fonts[size]
+
+
+def text_objects(text: str, font: Font, cache: bool = True) -> Tuple:
     """Create a text object given a message and a font.
+
+    Rendered texts are cached, so each is only rendered once, unless cache
+    is False, for texts that keep changing.
     """
-    text_surface = font.render(text, True, black)
+    key = (text, font)
+    if key in _texts:
+        text_surface = _texts[key]
+    else:
+        text_surface = font.render(text, True, black)
+        if cache:
+            _texts[key] = text_surface
     return text_surface, text_surface.get_rect()
 
 
 def game_loop(size: int, ai_player: int,
-              ai_function: Callable[[TTTBoard, int], Tuple[int, int]]) -> None:
+              ai_function: Callable[[TTTBoard, int], Tuple[int, int]],
+              cols: Optional[int] = None,
+              win_length: Optional[int] = None) -> None:
     """Main game loop.
+
+    The board has size rows and cols columns, which defaults to size, and
+    is won with a line of win_length squares, which defaults to the shorter
+    side of the board. The loop sleeps until an event arrives, and returns
+    when the window is closed.
     """
+    # init only the pygame modules the GUI uses, once a window is opened
+    pygame.display.init()
+    pygame.font.init()
+
     # init pygame variables
     screen = pygame.display.set_mode((GUI_WIDTH, GUI_HEIGHT))
-    clock = pygame.time.Clock()
 
     pygame.display.set_caption("Tic Tac Toe")
     gui_inst = TTTGUI(size, ai_player, switch_player(ai_player), ai_function,
-                      screen)
-
-    # main game loop
-    playing = True
-    while playing:
-        for event in pygame.event.get():
+                      screen, cols=cols, win_length=win_length)
+
+    # main game loop, sleeping until something happens
+    ticking = False
+    while True:
+        # draw what changed, and update only those parts of the screen
+        rects = gui_inst.draw() + gui_inst.message_display()
+        if rects:
+            pygame.display.update(rects)
+
+        # wake up now and then to update the thinking indicator
+        thinking = gui_inst.search_id is not None
+        if thinking != ticking:
+            pygame.time.set_timer(THINKING_EVENT,
+                                  THINKING_REFRESH if thinking else 0)
+            ticking = thinking
+        events = [pygame.event.wait()] + pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
-                playing = False
                 pygame.quit()
-                quit()
-
-        # set screen background
-        screen.fill(white)
-        gui_inst.draw()
-
-        # set mouse handler
-        mouse_press = pygame.mouse.get_pressed()
-        if mouse_press[0] == 1:
-            gui_inst.click()
-
-        # display message
-        gui_inst.message_display()
-
-        # update screen and clock
-        pygame.display.update()
-        clock.tick(60)
+                return
+            elif event.type == AI_MOVE_EVENT:
+                gui_inst.ai_done(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                gui_inst.click(event.pos)
+            elif event.type == pygame.VIDEOEXPOSE:
+                gui_inst.redraw = True
@@ -0,0 +1,149 @@
+"""
+Load-Test Client for the Tic-Tac-Toe Move Server
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_server import DEFAULT_PORT
+
+__all__ = ['LoadTestResult', 'make_requests', 'request_move', 'run_load_test',
+           'percentile']
+
+
+@dataclass
+class LoadTestResult:
+    """Latencies of the requests of a load test, in seconds.
+    """
+    latencies: List[float]
+    seconds: float
+    errors: int = 0
+
+    def __str__(self) -> str:
+        """Human readable summary of the results.
+        """
+        return ("{} requests, {} errors, {:.1f} requests/s, p50 {:.2f} ms, "
+                "p99 {:.2f} ms".format(
+                    len(self.latencies), self.errors,
+                    len(self.latencies) / self.seconds if self.seconds
+                    else 0.0, percentile(self.latencies, 50) * 1000,
+                    percentile(self.latencies, 99) * 1000))
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Return the nearest-rank percentile of values, or 0.0 if there are
+    none.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def make_requests(count: int, dim: int = 3, cols: Optional[int] = None,
+                  win_length: Optional[int] = None,
+                  seed: Optional[int] = None) -> List[dict]:
+    """Return count move requests for unfinished positions reached by
+    random play, in the JSON form taken by the server.
+    """
+    rng = random.Random(seed)
+    requests = []
+    while len(requests) < count:
+        board = TTTBoard(dim, None, cols, win_length)
+        rows, cols = board.get_size()
+        player = PLAYERX
+        for _ in range(rng.randrange(rows * cols)):
+            row, col = rng.choice(board.get_empty_squares())
+            board.move(row, col, player)
+            player = switch_player(player)
+            if board.check_win() is not None:
+                break
+        if board.check_win() is None:
+            requests.append({
+                'board': [''.join(STRMAP[board.get_square(row, col)]
+                                  for col in range(cols)).replace(' ', '.')
+                          for row in range(rows)],
+                'player': STRMAP[player],
+                'win_length': board.get_win_length()})
+    return requests
+
+
+async def request_move(reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter,
+                       request: dict) -> Tuple[int, dict]:
+    """Send request to /move over an open connection and return the HTTP
+    status and decoded JSON response.
+    """
+    body = json.dumps(request).encode()
+    writer.write("POST /move HTTP/1.1\r\nHost: localhost\r\n"
+                 "Content-Type: application/json\r\n"
+                 "Content-Length: {}\r\n\r\n".format(len(body)).encode()
+                 + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_load_test(requests: List[dict], host: str = '127.0.0.1',
+                        port: int = DEFAULT_PORT,
+                        concurrency: int = 8) -> LoadTestResult:
+    """Send every request to the server over concurrency connections at
+    once, each sending its next request as soon as it has an answer.
+    """
+    queue = list(reversed(requests))
+    latencies = []
+    errors = 0
+
+    async def client() -> None:
+        """Send requests from the queue over one connection until it is
+        empty.
+        """
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while queue:
+                request = queue.pop()
+                start = time.perf_counter()
+                status, _ = await request_move(reader, writer, request)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return LoadTestResult(latencies, time.perf_counter() - start, errors)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--dim', type=int, default=3)
+    parser.add_argument('--cols', type=int)
+    parser.add_argument('--win-length', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(asyncio.run(run_load_test(
+        make_requests(args.requests, args.dim, args.cols, args.win_length,
+                      args.seed), args.host, args.port, args.concurrency)))
@@ -0,0 +1,286 @@
+"""
+Monte Carlo Tree Search Tic-Tac-Toe Player
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_bitboard import TTTBitBoard
+
+__all__ = ['MCTSPlayer', 'get_move', 'PLAYOUTS', 'EXPLORATION']
+
+# Default number of playouts for each move
+PLAYOUTS = 2000
+
+# Default weight of the exploration term of UCT
+EXPLORATION = math.sqrt(2)
+
+# Visit count and total score of a move at the root of a search
+MoveStats = Dict[Tuple[int, int], Tuple[int, float]]
+
+
+@dataclass(eq=False)
+class _Node:
+    """A position in the search tree, reached by player making move.
+    """
+    # move:
+    #     The move leading to this position, or None for the root.
+    # player:
+    #     The player who made move.
+    # parent:
+    #     The position move was made from, or None for the root.
+    # untried:
+    #     The moves from this position without a child yet.
+    # children:
+    #     The positions reached by the moves tried so far.
+    # visits:
+    #     The number of playouts through this position.
+    # score:
+    #     The total result of those playouts for player: 1 for a win, 0.5
+    #     for a draw and 0 for a loss.
+    move: Optional[Tuple[int, int]]
+    player: int
+    parent: Optional[_Node] = field(default=None, repr=False)
+    untried: List[Tuple[int, int]] = field(default_factory=list)
+    children: List[_Node] = field(default_factory=list)
+    visits: int = 0
+    score: float = 0.0
+
+
+def _to_bitboard(board: TTTBoard) -> TTTBitBoard:
+    """Return a TTTBitBoard holding the same position as board.
+    """
+    rows, cols = board.get_size()
+    grid = [[board.get_square(row, col) for col in range(cols)]
+            for row in range(rows)]
+    return TTTBitBoard(rows, grid, cols, board.get_win_length())
+
+
+def _new_root(board: TTTBitBoard, player: int) -> _Node:
+    """Return the root of a new tree for player to move on board.
+    """
+    untried = board.get_empty_squares() if board.check_win() is None else []
+    return _Node(None, switch_player(player), untried=untried)
+
+
+def _search(board: TTTBitBoard, root: _Node, playouts: Optional[int],
+            deadline: Optional[float], exploration: float,
+            rng: random.Random) -> None:
+    """Grow the tree below root, the position of board, by playouts
+    playouts, or until the time.perf_counter() deadline passes if playouts
+    is None.
+    """
+    count = itertools.count() if playouts is None else range(playouts)
+    for _ in count:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+        # select a path through the fully expanded part of the tree
+        node = root
+        position = board.clone()
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children,
+                       key=lambda child: child.score / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            position.move(node.move[0], node.move[1], node.player)
+
+        # expand one new move
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            player = switch_player(node.player)
+            position.move(move[0], move[1], player)
+            untried = (position.get_empty_squares()
+                       if position.check_win() is None else [])
+            child = _Node(move, player, node, untried)
+            node.children.append(child)
+            node = child
+
+        # play the rest of the game at random
+        winner = position.check_win()
+        if winner is None:
+            moves = position.get_empty_squares()
+            rng.shuffle(moves)
+            player = switch_player(node.player)
+            for row, col in moves:
+                position.move(row, col, player)
+                winner = position.check_win()
+                if winner is not None:
+                    break
+                player = switch_player(player)
+
+        # record the result along the path
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.score += 1
+            elif winner == DRAW:
+                node.score += 0.5
+            node = node.parent
+
+
+def _root_stats(root: _Node) -> MoveStats:
+    """Return the visit count and total score of every move from root.
+    """
+    return {child.move: (child.visits, child.score)
+            for child in root.children}
+
+
+def _search_worker(board: TTTBitBoard, player: int, playouts: Optional[int],
+                   time_limit: Optional[float], exploration: float,
+                   seed: Optional[int]) -> MoveStats:
+    """Search a new tree in a worker process and return its root moves.
+    """
+    deadline = None
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+        playouts = None
+    root = _new_root(board, player)
+    _search(board, root, playouts, deadline, exploration,
+            random.Random(seed))
+    return _root_stats(root)
+
+
+def _best_move(stats: MoveStats) -> Tuple[int, int]:
+    """Return the most visited move, the best scoring of those tied.
+    """
+    return max(sorted(stats), key=lambda move: stats[move])
+
+
+@dataclass
+class MCTSPlayer:
+    """A player choosing moves by Monte Carlo Tree Search with UCT.
+
+    An instance can be called like get_move and passed to game_loop. Each
+    move is chosen after playouts random games, or as many as fit in
+    time_limit seconds if it is given, and the most visited move is
+    played. If reuse_tree is True, the part of the tree below the moves
+    played since the last call is kept and grown further. If workers is
+    more than 1, each move is searched by that many processes growing
+    separate trees whose root statistics are added up, in which case the
+    tree is not reused. Call close to stop the worker processes.
+    """
+    # === Private Attributes ===
+    # _rng:
+    #     Random number generator of the playouts in this process.
+    # _root:
+    #     The tree of the previous search, if kept for reuse.
+    # _grid:
+    #     The squares of the board at _root in row-major order.
+    # _executor:
+    #     The pool of worker processes, started on first use.
+    playouts: int = PLAYOUTS
+    time_limit: Optional[float] = None
+    reuse_tree: bool = True
+    workers: Optional[int] = None
+    exploration: float = EXPLORATION
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False)
+    _root: Optional[_Node] = field(init=False, default=None)
+    _grid: Optional[tuple] = field(init=False, default=None)
+    _executor: Optional[ProcessPoolExecutor] = field(init=False,
+                                                     default=None)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+        """
+        self._rng = random.Random(self.seed)
+
+    def __call__(self, board: TTTBoard, player: int) -> Tuple[int, int]:
+        """Return the move for player on board, or (-1, -1) if the game is
+        over.
+        """
+        if board.check_win() is not None:
+            return -1, -1
+        bitboard = _to_bitboard(board)
+
+        if self.workers is not None and self.workers > 1:
+            return _best_move(self._search_parallel(bitboard, player))
+
+        root = self._find_root(board, player)
+        playouts = self.playouts
+        deadline = None
+        if self.time_limit is not None:
+            playouts = None
+            deadline = time.perf_counter() + self.time_limit
+        _search(bitboard, root, playouts, deadline, self.exploration,
+                self._rng)
+        return _best_move(_root_stats(root))
+
+    def _find_root(self, board: TTTBoard, player: int) -> _Node:
+        """Return the node of the kept tree for player to move on board, or
+        a new root if the tree does not reach board.
+        """
+        rows, cols = board.get_size()
+        grid = tuple(board.get_square(row, col) for row in range(rows)
+                     for col in range(cols))
+        node = None
+        if self.reuse_tree and self._root is not None and (
+                len(grid) == len(self._grid)):
+            # follow the moves played since the last search down the tree
+            played = {(divmod(square, cols), grid[square])
+                      for square in range(len(grid))
+                      if grid[square] != self._grid[square]}
+            if all(self._grid[square] in (EMPTY, grid[square])
+                   for square in range(len(grid))):
+                node = self._root
+                while node is not None and played:
+                    node = next((child for child in node.children
+                                 if (child.move, child.player) in played),
+                                None)
+                    if node is not None:
+                        played.remove((node.move, node.player))
+
+        if node is None or node.player != switch_player(player):
+            node = _new_root(_to_bitboard(board), player)
+        node.parent = None
+        if self.reuse_tree:
+            self._root = node
+            self._grid = grid
+        return node
+
+    def _search_parallel(self, board: TTTBitBoard,
+                         player: int) -> MoveStats:
+        """Search board with a separate tree in every worker process and
+        return the root statistics of all of them added up.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        playouts = -(-self.playouts // self.workers)
+        futures = [self._executor.submit(
+            _search_worker, board, player, playouts, self.time_limit,
+            self.exploration, self._rng.getrandbits(32))
+            for _ in range(self.workers)]
+
+        stats = {}
+        for future in futures:
+            for move, (visits, score) in future.result().items():
+                total_visits, total_score = stats.get(move, (0, 0.0))
+                stats[move] = (total_visits + visits, total_score + score)
+        return stats
+
+    def close(self) -> None:
+        """Shut down the worker processes, if any were started.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def get_move(board: TTTBoard, player: int, playouts: int = PLAYOUTS,
+             time_limit: Optional[float] = None) -> Tuple[int, int]:
+    """Return the move for player on board chosen by a new MCTSPlayer
+    with the given playouts and time limit.
+
+    The player is seeded from the random module, so seeding it with
+    random.seed makes the moves repeatable, as in simulate.
+    """
+    return MCTSPlayer(playouts, time_limit, reuse_tree=False,
+                      seed=random.getrandbits(64))(board, player)
@@ -0,0 +1,158 @@
+"""
+Binary Files of Recorded Tic-Tac-Toe Games
+"""
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from .ttt_board import *
+
+__all__ = ['GameRecord', 'GameWriter', 'RECORDS_VERSION', 'read_games']
+
+# Version of the record file format, bumped whenever it changes
+RECORDS_VERSION = 1
+
+# File header: magic, version
+_HEADER = struct.Struct('<4sH')
+_MAGIC = b'TTTG'
+
+# Record header: rows, cols, win length, result, number of moves
+_RECORD = struct.Struct('<BBBBH')
+
+# Results as stored in a record, with 0 for an unfinished game
+_RESULTS = (PLAYERX, PLAYERO, DRAW)
+
+
+@dataclass
+class GameRecord:
+    """A game played from the empty board, with PLAYERX moving first.
+
+    Result is PLAYERX, PLAYERO or DRAW, or None if the game was not
+    finished.
+    """
+    moves: List[Tuple[int, int]]
+    result: Optional[int] = None
+    rows: int = 3
+    cols: int = 3
+    win_length: int = 3
+
+    def to_board(self) -> TTTBoard:
+        """Return the board reached by playing the moves of the game.
+        """
+        board = TTTBoard(self.rows, None, self.cols, self.win_length)
+        player = PLAYERX
+        for row, col in self.moves:
+            board.move(row, col, player)
+            player = switch_player(player)
+        return board
+
+
+def _move_format(rows: int, cols: int) -> str:
+    """Return the struct format of one move, the index of its square, on a
+    board with the given number of rows and cols.
+    """
+    return 'B' if rows * cols <= 256 else 'H'
+
+
+@dataclass
+class GameWriter:
+    """Appends games to a record file, creating it if needed.
+
+    A record file starts with a short header, followed by one record per
+    game: the number of rows, the number of columns, the win length, the
+    result and the number of moves, then every move as the index of its
+    square in row-major order, in one byte, or two on boards of more than
+    256 squares. A 3x3 game of 9 moves takes 15 bytes.
+
+    Raises ValueError if the file exists and is not a record file of the
+    current version.
+    """
+    # === Private Attributes ===
+    # _file:
+    #     The record file, open for appending.
+    path: str
+    _file: BinaryIO = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+        """
+        self._file = open(self.path, 'ab+')
+        try:
+            if self._file.tell() == 0:
+                self._file.write(_HEADER.pack(_MAGIC, RECORDS_VERSION))
+            else:
+                self._file.seek(0)
+                _check_header(self._file, self.path)
+                self._file.seek(0, os.SEEK_END)
+        except ValueError:
+            self._file.close()
+            raise
+
+    def __enter__(self) -> GameWriter:
+        """Use the writer as a context manager that closes it on exit.
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the writer.
+        """
+        self.close()
+
+    def write(self, game: GameRecord) -> None:
+        """Append game to the file.
+        """
+        result = 0 if game.result is None else _RESULTS.index(
+            game.result) + 1
+        self._file.write(_RECORD.pack(game.rows, game.cols, game.win_length,
+                                      result, len(game.moves)))
+        self._file.write(struct.pack(
+            '<{}{}'.format(len(game.moves), _move_format(game.rows,
+                                                         game.cols)),
+            *(row * game.cols + col for row, col in game.moves)))
+
+    def close(self) -> None:
+        """Flush and close the file.
+        """
+        self._file.close()
+
+
+def _check_header(record_file: BinaryIO, path: str) -> None:
+    """Read the header of record_file.
+
+    Raises ValueError if it is not a record file of the current version.
+    """
+    header = record_file.read(_HEADER.size)
+    if (len(header) != _HEADER.size
+            or _HEADER.unpack(header) != (_MAGIC, RECORDS_VERSION)):
+        raise ValueError("Not a version {} record file: {}".format(
+            RECORDS_VERSION, path))
+
+
+def read_games(path: str) -> Iterator[GameRecord]:
+    """Yield the games of the record file at path, in the order they were
+    written, reading one record at a time.
+
+    Raises ValueError if the file is not a record file of the current
+    version, or ends in the middle of a record.
+    """
+    with open(path, 'rb') as record_file:
+        _check_header(record_file, path)
+        while True:
+            header = record_file.read(_RECORD.size)
+            if not header:
+                return
+            if len(header) != _RECORD.size:
+                raise ValueError("Truncated record file: " + path)
+            rows, cols, win_length, result, count = _RECORD.unpack(header)
+
+            move_format = '<{}{}'.format(count, _move_format(rows, cols))
+            data = record_file.read(struct.calcsize(move_format))
+            if len(data) != struct.calcsize(move_format):
+                raise ValueError("Truncated record file: " + path)
+            yield GameRecord([divmod(square, cols) for square in
+                              struct.unpack(move_format, data)],
+                             _RESULTS[result - 1] if result else None,
+                             rows, cols, win_length)
@@ -0,0 +1,310 @@
+"""
+Local HTTP Server Answering Tic-Tac-Toe Moves
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_computer import get_book, get_move
+
+__all__ = ['MoveServer', 'RequestError', 'parse_board', 'DEFAULT_PORT',
+           'DEFAULT_TIME_LIMIT', 'MAX_SQUARES']
+
+# Port the server listens on by default
+DEFAULT_PORT = 8765
+
+# Seconds a search may take by default, so no request ties up a worker
+DEFAULT_TIME_LIMIT = 1.0
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 16
+
+# Most squares a requested board may have, 20 x 20
+MAX_SQUARES = 400
+
+# Characters of the squares in a JSON board
+_SQUARES = {'X': PLAYERX, 'O': PLAYERO, '.': EMPTY, ' ': EMPTY}
+
+# Reason phrases of the status codes the server sends
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large',
+            500: 'Internal Server Error'}
+
+# Key of a position: (grid in row-major order, rows, cols, win length,
+# player to move)
+PositionKey = Tuple[Tuple[int, ...], int, int, int, int]
+
+
+class RequestError(Exception):
+    """Raised for a request the server cannot answer, with the HTTP status
+    to send back.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def parse_board(request: dict) -> Tuple[TTTBoard, int]:
+    """Return the board and player to move given by a decoded JSON request.
+
+    The request holds "board", a list of equally long strings, one per
+    row, with 'X', 'O' and '.' or ' ' for empty squares, and "player",
+    'X' or 'O'. It may also hold "win_length", which defaults to the
+    shorter side of the board.
+
+    Raises RequestError if the request is not of this form, or the board
+    has more than MAX_SQUARES squares.
+    """
+    if not isinstance(request, dict):
+        raise RequestError(400, "Request must be a JSON object")
+    rows = request.get('board')
+    if (not isinstance(rows, list) or not rows
+            or not all(isinstance(row, str) for row in rows)
+            or len({len(row) for row in rows}) != 1 or not rows[0]):
+        raise RequestError(400, "Board must be a list of equally long rows")
+    if len(rows) * len(rows[0]) > MAX_SQUARES:
+        raise RequestError(400, "Board must have at most {} squares".format(
+            MAX_SQUARES))
+    if any(square not in _SQUARES for row in rows for square in row):
+        raise RequestError(400, "Squares must be 'X', 'O' or '.'")
+    player = {'X': PLAYERX, 'O': PLAYERO}.get(request.get('player'))
+    if player is None:
+        raise RequestError(400, "Player must be 'X' or 'O'")
+
+    win_length = request.get('win_length')
+    if win_length is not None and not isinstance(win_length, int):
+        raise RequestError(400, "Win length must be an integer")
+    grid = [[_SQUARES[square] for square in row] for row in rows]
+    try:
+        board = TTTBoard(len(rows), grid, len(rows[0]), win_length)
+    except ValueError as error:
+        raise RequestError(400, str(error))
+    return board, player
+
+
+def _warm_worker() -> None:
+    """Load the opening book when a worker process starts.
+    """
+    get_book()
+
+
+def _serve_move(grid: Tuple[int, ...], rows: int, cols: int, win_length: int,
+                player: int, time_limit: Optional[float]) -> Tuple[int, int]:
+    """Return get_move for the position in a worker process, whose
+    transposition table and position cache are kept between requests.
+    """
+    board = TTTBoard(rows, [list(grid[row * cols:(row + 1) * cols])
+                            for row in range(rows)], cols, win_length)
+    return get_move(board, player, time_limit=time_limit)
+
+
+@dataclass
+class MoveServer:
+    """An asyncio HTTP server answering moves on the local machine.
+
+    POST /move with a JSON board, see parse_board, returns {"move": [row,
+    col]}, or {"move": null} if the game is over. GET /stats returns the
+    number of requests, searches and requests answered by joining a
+    search already running.
+
+    Searches run in a pool of worker processes, which defaults to one per
+    CPU, so the event loop never waits on one. Each worker keeps its
+    caches warm between requests. Requests for a position that is already
+    being searched wait for that search instead of starting another.
+    Every search stops after about time_limit seconds, or runs until the
+    position is solved if time_limit is None.
+
+    Only loopback addresses are served; any other host raises ValueError.
+    """
+    # === Private Attributes ===
+    # _executor:
+    #     The pool of worker processes running searches.
+    # _server:
+    #     The listening asyncio server, once started.
+    # _pending:
+    #     Maps each position being searched to the task searching it.
+    host: str = '127.0.0.1'
+    port: int = DEFAULT_PORT
+    workers: Optional[int] = None
+    time_limit: Optional[float] = DEFAULT_TIME_LIMIT
+    stats: Dict[str, int] = field(init=False, default_factory=lambda: {
+        'requests': 0, 'searches': 0, 'coalesced': 0})
+    _executor: Optional[ProcessPoolExecutor] = field(init=False, default=None)
+    _server: Optional[asyncio.AbstractServer] = field(init=False,
+                                                      default=None)
+    _pending: Dict[PositionKey, asyncio.Task] = field(init=False,
+                                                      default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+        """
+        if self.host != 'localhost' and not ipaddress.ip_address(
+                self.host).is_loopback:
+            raise ValueError("Only loopback addresses can be served: "
+                             + self.host)
+
+    async def start(self) -> None:
+        """Start the worker processes and listen for connections.
+
+        If port is 0, a free port is picked and stored in port.
+        """
+        self._executor = ProcessPoolExecutor(self.workers,
+                                             initializer=_warm_worker)
+        self._server = await asyncio.start_server(self._handle, self.host,
+                                                  self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Start the server and answer requests until cancelled.
+        """
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening and shut down the worker processes.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def get_move(self, board: TTTBoard,
+                       player: int) -> Tuple[int, int]:
+        """Return the move for player on board, searched by a worker
+        process or by a search of the same position already running.
+        """
+        rows, cols = board.get_size()
+        grid = tuple(board.get_square(row, col) for row in range(rows)
+                     for col in range(cols))
+        key = (grid, rows, cols, board.get_win_length(), player)
+
+        task = self._pending.get(key)
+        if task is None:
+            self.stats['searches'] += 1
+            task = asyncio.ensure_future(self._search(key))
+            self._pending[key] = task
+        else:
+            self.stats['coalesced'] += 1
+        # a client going away must not cancel the search others wait for
+        return await asyncio.shield(task)
+
+    async def _search(self, key: PositionKey) -> Tuple[int, int]:
+        """Search the position with the given key in a worker process.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _serve_move,
+                                              *key, self.time_limit)
+        finally:
+            del self._pending[key]
+
+    async def _respond(self, method: str, path: str, body: bytes) -> dict:
+        """Return the JSON response to a request.
+
+        Raises RequestError if the request cannot be answered.
+        """
+        if path == '/stats':
+            if method != 'GET':
+                raise RequestError(405, "Use GET for /stats")
+            return dict(self.stats)
+        if path != '/move':
+            raise RequestError(404, "Unknown path: " + path)
+        if method != 'POST':
+            raise RequestError(405, "Use POST for /move")
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise RequestError(400, "Body must be JSON")
+        board, player = parse_board(request)
+        if board.check_win() is not None:
+            return {'move': None}
+        return {'move': list(await self.get_move(board, player))}
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        """Answer the HTTP/1.1 requests of one connection, keeping it open
+        between requests unless the client asks to close it.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode(
+                        'latin-1').split()
+                except ValueError:
+                    break
+
+                # read headers and body
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (version == 'HTTP/1.1' and headers.get(
+                    'connection', '').lower() != 'close')
+
+                self.stats['requests'] += 1
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                try:
+                    if not 0 <= length <= MAX_BODY:
+                        keep_alive = False
+                        raise RequestError(413 if length > 0 else 400,
+                                           "Bad Content-Length")
+                    body = await reader.readexactly(length)
+                    status, response = 200, await self._respond(method, path,
+                                                                body)
+                except RequestError as error:
+                    status, response = error.status, {'error': str(error)}
+                except Exception as error:
+                    status, response = 500, {'error': repr(error)}
+
+                payload = json.dumps(response).encode()
+                writer.write(
+                    "HTTP/1.1 {} {}\r\nContent-Type: application/json\r\n"
+                    "Content-Length: {}\r\nConnection: {}\r\n\r\n".format(
+                        status, _REASONS[status], len(payload),
+                        'keep-alive' if keep_alive else 'close'
+                    ).encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--time-limit', type=float,
+                        default=DEFAULT_TIME_LIMIT)
+    args = parser.parse_args()
+
+    server = MoveServer(args.host, args.port, args.workers, args.time_limit)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
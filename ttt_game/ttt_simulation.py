@@ -0,0 +1,223 @@
+"""
+Headless Self-Play Between Tic-Tac-Toe Strategies
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, IO, List, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_computer import get_move
+from .ttt_mcts import get_move as mcts_move
+from .ttt_records import GameRecord, GameWriter
+
+__all__ = ['Strategy', 'SimulationResult', 'STRATEGIES', 'random_move',
+           'play_game', 'simulate']
+
+# A player: given the board and the player to move, returns its move
+Strategy = Callable[[TTTBoard, int], Tuple[int, int]]
+
+# Names of the results written to game records
+RESULTS = {PLAYERX: 'X',
+           PLAYERO: 'O',
+           DRAW: 'draw'}
+
+# Number of games handed to a worker process at a time
+GAMES_PER_TASK = 16
+
+
+def random_move(board: TTTBoard, player: int) -> Tuple[int, int]:
+    """Return a random empty square of board.
+    """
+    return random.choice(board.get_empty_squares())
+
+
+# Strategies that can be chosen by name on the command line
+STRATEGIES: Dict[str, Strategy] = {'minimax': get_move,
+                                   'mcts': mcts_move,
+                                   'random': random_move}
+
+
+@dataclass
+class SimulationResult:
+    """Totals of a run of games, counted for the first strategy.
+    """
+    games: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    seconds: float = 0.0
+
+    def add(self, won: Optional[bool]) -> None:
+        """Count one game, won, lost, or drawn if won is None.
+        """
+        self.games += 1
+        if won is None:
+            self.draws += 1
+        elif won:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def games_per_second(self) -> float:
+        """Return the number of games played per second.
+        """
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        """Human readable summary of the results.
+        """
+        games = max(self.games, 1)
+        return ("{} games: {:.1%} won, {:.1%} drawn, {:.1%} lost, "
+                "{:.1f} games/s".format(self.games, self.wins / games,
+                                        self.draws / games,
+                                        self.losses / games,
+                                        self.games_per_second()))
+
+
+def play_game(x_strategy: Strategy, o_strategy: Strategy, dim: int = 3,
+              cols: Optional[int] = None, win_length: Optional[int] = None
+              ) -> Tuple[List[Tuple[int, int]], int]:
+    """Play one game on an empty board, with x_strategy moving first as
+    PLAYERX against o_strategy as PLAYERO.
+
+    Returns the moves played and the result, one of PLAYERX, PLAYERO or
+    DRAW. Raises ValueError if a strategy picks a square that is taken or
+    off the board.
+    """
+    board = TTTBoard(dim, None, cols, win_length)
+    rows, cols = board.get_size()
+    strategies = {PLAYERX: x_strategy, PLAYERO: o_strategy}
+    player = PLAYERX
+    moves = []
+    while board.check_win() is None:
+        row, col = strategies[player](board, player)
+        if not (0 <= row < rows and 0 <= col < cols
+                and board.get_square(row, col) == EMPTY):
+            raise ValueError("Illegal move by {}: {}".format(
+                STRMAP[player], (row, col)))
+        board.move(row, col, player)
+        moves.append((row, col))
+        player = switch_player(player)
+
+    return moves, board.check_win()
+
+
+def _play_games(first: Strategy, second: Strategy, start: int, count: int,
+                alternate: bool, seed: Optional[int], dim: int,
+                cols: Optional[int], win_length: Optional[int]
+                ) -> List[dict]:
+    """Play games start to start + count - 1 of a simulation and return
+    their records.
+    """
+    records = []
+    for game in range(start, start + count):
+        if seed is not None:
+            random.seed(seed + game)
+        swapped = alternate and game % 2 == 1
+        if swapped:
+            moves, result = play_game(second, first, dim, cols, win_length)
+        else:
+            moves, result = play_game(first, second, dim, cols, win_length)
+        records.append({'game': game,
+                        'first': STRMAP[PLAYERO if swapped else PLAYERX],
+                        'moves': moves,
+                        'result': RESULTS[result]})
+    return records
+
+
+def simulate(first: Strategy, second: Strategy, games: int,
+             workers: Optional[int] = None, output: Optional[IO] = None,
+             alternate: bool = False, seed: Optional[int] = None,
+             dim: int = 3, cols: Optional[int] = None,
+             win_length: Optional[int] = None,
+             writer: Optional[GameWriter] = None) -> SimulationResult:
+    """Play games between first and second and return the results for
+    first.
+
+    First plays PLAYERX, unless alternate is True, in which case the
+    strategies swap sides every other game. If workers is more than 1,
+    the games are shared between that many processes, and the strategies
+    must be functions defined at module level. If seed is given, the
+    random module is seeded before each game, so a run can be repeated.
+
+    Every game is written to output as it finishes, in game order, as one
+    JSON object per line with the game number, the side first played,
+    the moves as [row, col] pairs and the result, 'X', 'O' or 'draw'.
+    Every game is also appended to the binary record file of writer, if
+    given.
+    """
+    result = SimulationResult()
+    start_time = time.perf_counter()
+    tasks = [(start, min(GAMES_PER_TASK, games - start))
+             for start in range(0, games, GAMES_PER_TASK)]
+    settings = (alternate, seed, dim, cols, win_length)
+    results = {name: player for player, name in RESULTS.items()}
+    if cols is None:
+        cols = dim
+    if win_length is None:
+        win_length = min(dim, cols)
+
+    executor = None
+    if workers is not None and workers > 1:
+        executor = ProcessPoolExecutor(workers)
+        batches = executor.map(_play_games, *zip(*[
+            (first, second, start, count) + settings
+            for start, count in tasks]))
+    else:
+        batches = (_play_games(first, second, start, count, *settings)
+                   for start, count in tasks)
+
+    try:
+        for records in batches:
+            for record in records:
+                if output is not None:
+                    output.write(json.dumps(record) + "\n")
+                if writer is not None:
+                    writer.write(GameRecord(
+                        record['moves'], results[record['result']], dim,
+                        cols, win_length))
+                if record['result'] == RESULTS[DRAW]:
+                    result.add(None)
+                else:
+                    result.add(record['result'] == record['first'])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    result.seconds = time.perf_counter() - start_time
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('first', choices=sorted(STRATEGIES))
+    parser.add_argument('second', choices=sorted(STRATEGIES))
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help="JSONL file to write games to")
+    parser.add_argument('--records',
+                        help="binary game record file to append games to")
+    parser.add_argument('--alternate', action='store_true',
+                        help="swap sides every other game")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--dim', type=int, default=3)
+    parser.add_argument('--cols', type=int)
+    parser.add_argument('--win-length', type=int)
+    args = parser.parse_args()
+
+    output_file = open(args.output, 'w') if args.output else None
+    record_writer = GameWriter(args.records) if args.records else None
+    try:
+        print(simulate(STRATEGIES[args.first], STRATEGIES[args.second],
+                       args.games, args.workers, output_file, args.alternate,
+                       args.seed, args.dim, args.cols, args.win_length,
+                       record_writer))
+    finally:
+        if output_file is not None:
+            output_file.close()
+        if record_writer is not None:
+            record_writer.close()
@@ -0,0 +1,217 @@
+"""
+Memory-Mapped Tables of Solved Tic-Tac-Toe Positions
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_book import OpeningBook, load_book
+
+__all__ = ['PositionTable', 'TABLE_VERSION', 'TABLE_PATH', 'position_index',
+           'write_table', 'write_book_table']
+
+# Version of the table file format, bumped whenever it changes
+TABLE_VERSION = 1
+
+# Default location of the table built from the shipped opening book
+TABLE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'table3.bin')
+
+# File header: magic, version, board dimension, record size
+_HEADER = struct.Struct('<4sHHH6x')
+_MAGIC = b'TTTP'
+
+# A table position: (grid in row-major order, score for PLAYERX,
+# best moves for the player to move)
+Position = Tuple[Tuple[int, ...], int, Iterable[Tuple[int, int]]]
+
+
+def position_index(board: TTTBoard) -> Tuple[int, int, int]:
+    """Return the index of board in a position table, which reads the
+    squares in row-major order as the digits of a base-3 number with the
+    first square least significant.
+
+    Also returns the number of squares taken by PLAYERX and by PLAYERO.
+    """
+    rows, cols = board.get_size()
+    index = 0
+    place = 1
+    xcount = 0
+    ocount = 0
+    for row in range(rows):
+        for col in range(cols):
+            square = board.get_square(row, col)
+            if square == PLAYERX:
+                xcount += 1
+            elif square == PLAYERO:
+                ocount += 1
+            index += square * place
+            place *= 3
+    return index, xcount, ocount
+
+
+def _record_size(dim: int) -> int:
+    """Return the number of bytes in one record of a table for boards with
+    the given dimension: one byte of score followed by a bitmask of best
+    moves.
+    """
+    return 1 + (dim * dim + 7) // 8
+
+
+def write_table(path: str, dim: int, positions: Iterable[Position]) -> None:
+    """Write a table holding positions to the file at path.
+
+    The file has one fixed-size record for every possible grid, found at
+    its position_index. A record holds the score for PLAYERX plus 2, or 0
+    if the grid is not in the table, followed by a little-endian bitmask
+    with bit (row * dim + col) set for every best move.
+    """
+    size = _record_size(dim)
+    length = _HEADER.size + size * 3 ** (dim * dim)
+    with open(path, 'wb+') as table_file:
+        table_file.write(_HEADER.pack(_MAGIC, TABLE_VERSION, dim, size))
+        table_file.truncate(length)
+        table_file.flush()
+
+        with mmap.mmap(table_file.fileno(), length) as records:
+            for grid, score, moves in positions:
+                index = 0
+                for square in reversed(grid):
+                    index = index * 3 + square
+                mask = 0
+                for row, col in moves:
+                    mask |= 1 << (row * dim + col)
+
+                offset = _HEADER.size + index * size
+                records[offset] = score + 2
+                records[offset + 1:offset + size] = mask.to_bytes(
+                    size - 1, 'little')
+            records.flush()
+
+
+def write_book_table(path: str = TABLE_PATH,
+                     book: Optional[OpeningBook] = None) -> None:
+    """Write a table holding every position of book, including all of the
+    rotations and reflections of its canonical positions.
+
+    Uses the shipped opening book if none is given.
+    """
+    if book is None:
+        book = load_book()
+    dim = book.get_dim()
+
+    def positions() -> Iterable[Position]:
+        """Yield the positions of book under all 8 symmetries.
+        """
+        for form, (score, moves) in book.items():
+            for transform in range(8):
+                grid = [EMPTY] * (dim * dim)
+                for square in range(dim * dim):
+                    row, col = transform_square(square // dim, square % dim,
+                                                dim, transform)
+                    grid[row * dim + col] = form[square]
+                yield (tuple(grid), score,
+                       [transform_square(move // dim, move % dim, dim,
+                                         transform) for move in moves])
+
+    write_table(path, dim, positions())
+
+
+@dataclass
+class PositionTable:
+    """A table of solved positions read straight from a memory-mapped file.
+
+    Records are only read from the mapped pages when probed, so opening a
+    table is cheap whatever its size, and every process opening the same
+    file shares one copy of it in the OS page cache.
+    """
+    # === Private Attributes ===
+    # _dim:
+    #     The dimension of the boards in the table.
+    # _size:
+    #     The number of bytes in one record.
+    # _records:
+    #     The memory-mapped table file.
+    path: str = TABLE_PATH
+    _dim: int = field(init=False)
+    _size: int = field(init=False)
+    _records: mmap.mmap = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+
+        Raises ValueError if the file is not a table of the current version,
+        or is not as long as such a table.
+        """
+        with open(self.path, 'rb') as table_file:
+            self._records = mmap.mmap(table_file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, self._dim, self._size = _HEADER.unpack_from(
+                self._records)
+        except struct.error:
+            # too short to hold a header
+            magic = version = None
+        if (magic != _MAGIC or version != TABLE_VERSION
+                or self._size != _record_size(self._dim)
+                or len(self._records) != _HEADER.size
+                + self._size * 3 ** (self._dim ** 2)):
+            self._records.close()
+            raise ValueError("Not a version {} table: {}".format(
+                TABLE_VERSION, self.path))
+
+    def __enter__(self) -> PositionTable:
+        """Use the table as a context manager that closes it on exit.
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the table.
+        """
+        self.close()
+
+    def get_dim(self) -> int:
+        """Return the dimension of the boards in the table.
+        """
+        return self._dim
+
+    def probe(self, board: TTTBoard,
+              player: int) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """Return the score for PLAYERX and the best move for player on
+        board, or None if board is not in the table.
+
+        Only boards where it is player's turn, with PLAYERX moving first,
+        are answered. Of several best moves, the first in row-major order
+        is returned.
+        """
+        if (board.get_size() != (self._dim, self._dim)
+                or board.get_win_length() != self._dim):
+            return None
+
+        index, xcount, ocount = position_index(board)
+        if player != (PLAYERX if xcount == ocount else PLAYERO):
+            return None
+
+        offset = _HEADER.size + index * self._size
+        score = self._records[offset]
+        if score == 0:
+            return None
+
+        mask = int.from_bytes(self._records[offset + 1:offset + self._size],
+                              'little')
+        square = (mask & -mask).bit_length() - 1
+        return score - 2, divmod(square, self._dim)
+
+    def close(self) -> None:
+        """Unmap the table file.
+        """
+        self._records.close()
+
+
+if __name__ == '__main__':
+    write_book_table()
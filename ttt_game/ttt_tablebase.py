@@ -0,0 +1,305 @@
+"""
+Retrograde Tablebase of Solved 4x4 Tic-Tac-Toe Positions
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from .ttt_bitboard import get_win_masks
+from .ttt_board import *
+from .ttt_table import position_index
+
+__all__ = ['Tablebase', 'TABLEBASE_VERSION', 'TABLEBASE_PATH',
+           'TABLEBASE_DIM', 'build_tablebase']
+
+# Version of the tablebase file format, bumped whenever it changes
+TABLEBASE_VERSION = 1
+
+# Dimension of the boards the default tablebase covers
+TABLEBASE_DIM = 4
+
+# Default location of the tablebase, which is built with
+# python -m ttt_game.ttt_tablebase
+TABLEBASE_PATH = os.path.join(os.path.dirname(__file__), 'data',
+                              'tablebase4.bin')
+
+# File header: magic, version, board dimension, win length
+_HEADER = struct.Struct('<4sHHH6x')
+_MAGIC = b'TTTR'
+
+# Flags of a position value, for the player to move. The low bits hold the
+# number of moves left until the game ends under perfect play, where the
+# winner ends it as soon as possible and the loser as late as possible.
+# A value of 0 marks a grid that cannot arise in a game.
+_WIN = 0x80
+_LOSS = 0x40
+_DRAW = 0x20
+_DISTANCE = 0x1f
+
+# Number of tasks each layer is split into per worker process
+_TASKS_PER_WORKER = 4
+
+
+def _solve_layer(path: str, dim: int, win_length: int, stones: int,
+                 part: int, parts: int) -> int:
+    """Solve part of the positions with the given number of stones in the
+    tablebase file at path, whose positions with one more stone are solved.
+
+    The positions are split into parts, by the squares PLAYERX holds, and
+    only the part-th is solved. Returns the number of positions solved.
+    """
+    squares = dim * dim
+    masks = get_win_masks(dim, dim, win_length)
+    powers = [3 ** square for square in range(squares)]
+    player = PLAYERX if stones % 2 == 0 else PLAYERO
+    xcount = (stones + 1) // 2
+    ocount = stones // 2
+    solved = 0
+
+    with open(path, 'r+b') as table_file, mmap.mmap(
+            table_file.fileno(), 0) as records:
+        offset = _HEADER.size
+        for number, xsquares in enumerate(itertools.combinations(
+                range(squares), xcount)):
+            if number % parts != part:
+                continue
+            xmask = 0
+            xrank = 0
+            for square in xsquares:
+                xmask |= 1 << square
+                xrank += powers[square]
+            xline = any(xmask & mask == mask for mask in masks)
+            free = [square for square in range(squares)
+                    if not xmask >> square & 1]
+
+            for osquares in itertools.combinations(free, ocount):
+                omask = 0
+                rank = xrank
+                for square in osquares:
+                    omask |= 1 << square
+                    rank += 2 * powers[square]
+                oline = any(omask & mask == mask for mask in masks)
+
+                # a line ends the game, and must belong to the last mover
+                if xline or oline:
+                    if xline != oline and xline == (player == PLAYERO):
+                        records[offset + rank] = _LOSS
+                        solved += 1
+                    continue
+                if stones == squares:
+                    records[offset + rank] = _DRAW
+                    solved += 1
+                    continue
+
+                # the best result over every move, from the other side
+                win = loss = None
+                draw = False
+                for square in free:
+                    if omask >> square & 1:
+                        continue
+                    value = records[offset + rank + player * powers[square]]
+                    distance = value & _DISTANCE
+                    if value & _LOSS:
+                        if win is None or distance < win:
+                            win = distance
+                    elif value & _DRAW:
+                        draw = True
+                    elif loss is None or distance > loss:
+                        loss = distance
+
+                if win is not None:
+                    records[offset + rank] = _WIN | win + 1
+                elif draw:
+                    records[offset + rank] = _DRAW
+                else:
+                    records[offset + rank] = _LOSS | loss + 1
+                solved += 1
+        records.flush()
+
+    return solved
+
+
+def build_tablebase(path: str = TABLEBASE_PATH, dim: int = TABLEBASE_DIM,
+                    win_length: Optional[int] = None,
+                    workers: Optional[int] = None) -> int:
+    """Solve every position of a game on a dim x dim board, with PLAYERX
+    moving first, and write them to a tablebase file at path.
+
+    The file has a one-byte value for every possible grid, found at its
+    position_index, so it takes 3 ** (dim * dim) bytes, 43 MB for 4x4. It
+    is solved by retrograde analysis: positions are enumerated by the
+    number of stones on the board, from the full board down to the empty
+    one, and each layer is solved from the one after it, starting from the
+    finished games. Only the file is held in memory, through a shared
+    memory map.
+
+    If workers is more than 1, each layer is split between that many
+    processes. Returns the number of positions solved.
+    """
+    if win_length is None:
+        win_length = dim
+    squares = dim * dim
+    length = _HEADER.size + 3 ** squares
+    with open(path, 'wb') as table_file:
+        table_file.write(_HEADER.pack(_MAGIC, TABLEBASE_VERSION, dim,
+                                      win_length))
+        table_file.truncate(length)
+
+    solved = 0
+    if workers is not None and workers > 1:
+        parts = workers * _TASKS_PER_WORKER
+        with ProcessPoolExecutor(workers) as executor:
+            for stones in range(squares, -1, -1):
+                solved += sum(executor.map(
+                    _solve_layer, *zip(*[
+                        (path, dim, win_length, stones, part, parts)
+                        for part in range(parts)])))
+    else:
+        for stones in range(squares, -1, -1):
+            solved += _solve_layer(path, dim, win_length, stones, 0, 1)
+    return solved
+
+
+@dataclass
+class Tablebase:
+    """A tablebase of solved positions read straight from a memory-mapped
+    file written by build_tablebase.
+
+    Every position of the game it covers is answered in constant time,
+    with the fastest win or, failing a draw, the slowest loss.
+    """
+    # === Private Attributes ===
+    # _dim:
+    #     The dimension of the boards in the tablebase.
+    # _win_length:
+    #     The number of squares in a line needed to win.
+    # _records:
+    #     The memory-mapped tablebase file.
+    path: str = TABLEBASE_PATH
+    _dim: int = field(init=False)
+    _win_length: int = field(init=False)
+    _records: mmap.mmap = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Initialize any variables that requires other var to be initialized.
+
+        Raises ValueError if the file is not a tablebase of the current
+        version.
+        """
+        with open(self.path, 'rb') as table_file:
+            self._records = mmap.mmap(table_file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, self._dim, self._win_length = (
+                _HEADER.unpack_from(self._records))
+        except struct.error:
+            # too short to hold a header
+            magic = version = None
+        if (magic != _MAGIC or version != TABLEBASE_VERSION
+                or len(self._records) != _HEADER.size
+                + 3 ** (self._dim ** 2)):
+            self._records.close()
+            raise ValueError("Not a version {} tablebase: {}".format(
+                TABLEBASE_VERSION, self.path))
+
+    def __enter__(self) -> Tablebase:
+        """Use the tablebase as a context manager that closes it on exit.
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the tablebase.
+        """
+        self.close()
+
+    def get_dim(self) -> int:
+        """Return the dimension of the boards in the tablebase.
+        """
+        return self._dim
+
+    def get_result(self, board: TTTBoard) -> Optional[Tuple[int, int]]:
+        """Return the result of board for the player to move, 1 for a win,
+        0 for a draw or -1 for a loss, and the number of moves left until
+        the game ends under perfect play, 0 for a draw.
+
+        Returns None if board is not in the tablebase.
+        """
+        if (board.get_size() != (self._dim, self._dim)
+                or board.get_win_length() != self._win_length):
+            return None
+
+        value = self._records[_HEADER.size + position_index(board)[0]]
+        if value & _WIN:
+            return 1, value & _DISTANCE
+        elif value & _LOSS:
+            return -1, value & _DISTANCE
+        elif value & _DRAW:
+            return 0, 0
+        return None
+
+    def probe(self, board: TTTBoard,
+              player: int) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """Return the score for PLAYERX and the best move for player on
+        board, or None if board is not in the tablebase or the game is
+        over.
+
+        Only boards where it is player's turn, with PLAYERX moving first,
+        are answered. The best move wins the soonest, or draws, or else
+        loses the latest; of several, the first in row-major order is
+        returned.
+        """
+        if (board.get_size() != (self._dim, self._dim)
+                or board.get_win_length() != self._win_length):
+            return None
+
+        index, xcount, ocount = position_index(board)
+        if player != (PLAYERX if xcount == ocount else PLAYERO):
+            return None
+        value = self._records[_HEADER.size + index]
+        if value == 0 or board.check_win() is not None:
+            return None
+
+        # rank every move by its value for the other player
+        best = None
+        best_move = None
+        for row, col in board.get_empty_squares():
+            child = self._records[_HEADER.size + index
+                                  + player * 3 ** (row * self._dim + col)]
+            distance = child & _DISTANCE
+            if child & _LOSS:
+                key = (0, distance)
+            elif child & _DRAW:
+                key = (1, 0)
+            else:
+                key = (2, -distance)
+            if best is None or key < best:
+                best = key
+                best_move = (row, col)
+
+        score = 1 - best[0]
+        return score if player == PLAYERX else -score, best_move
+
+    def close(self) -> None:
+        """Unmap the tablebase file.
+        """
+        self._records.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--output', default=TABLEBASE_PATH)
+    parser.add_argument('--dim', type=int, default=TABLEBASE_DIM)
+    parser.add_argument('--win-length', type=int)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print("{} positions solved".format(build_tablebase(
+        args.output, args.dim, args.win_length, args.workers)))
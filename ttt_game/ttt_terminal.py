@@ -0,0 +1,93 @@
+"""
+Terminal Front-End for Tic-Tac-Toe
+"""
+import logging
+import sys
+from typing import Callable, IO, Optional, Tuple
+
+from .ttt_board import *
+from .ttt_computer import SearchStats, takes_keyword
+
+__all__ = ['play_terminal', 'parse_move']
+
+# Logger the statistics of every AI move are written to
+logger = logging.getLogger(__name__)
+
+# Messages shown when a game ends
+RESULT_MESSAGES = {PLAYERX: "X Wins!",
+                   PLAYERO: "O Wins!",
+                   DRAW: "It's a tie!"}
+
+
+def parse_move(text: str, board: TTTBoard) -> Optional[Tuple[int, int]]:
+    """Return the square named by text, a row and a column numbered from 1
+    such as "2 3", or None if text does not name an empty square of board.
+    """
+    parts = text.replace(',', ' ').split()
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        return None
+    row, col = int(parts[0]) - 1, int(parts[1]) - 1
+    rows, cols = board.get_size()
+    if not (0 <= row < rows and 0 <= col < cols
+            and board.get_square(row, col) == EMPTY):
+        return None
+    return row, col
+
+
+def play_terminal(size: int, ai_player: int,
+                  ai_function: Callable[[TTTBoard, int], Tuple[int, int]],
+                  cols: Optional[int] = None,
+                  win_length: Optional[int] = None,
+                  read: Callable[[str], str] = input,
+                  output: IO = sys.stdout) -> Optional[int]:
+    """Play one game in the terminal, with the human playing against
+    ai_function as ai_player.
+
+    The board has size rows and cols columns, which defaults to size, and
+    is won with a line of win_length squares, which defaults to the shorter
+    side of the board. Moves are read with read, given the prompt, and the
+    game is written to output.
+
+    If ai_function takes a stats argument, as get_move does, the
+    SearchStats it fills in are logged at INFO level for every move.
+
+    Returns the result of the game, or None if the human quit by entering
+    "q" or closing the input.
+    """
+    board = TTTBoard(size, None, cols, win_length)
+    human_player = switch_player(ai_player)
+    turn = PLAYERX
+
+    while board.check_win() is None:
+        output.write("\n" + str(board) + "\n")
+        if turn == ai_player:
+            if takes_keyword(ai_function, 'stats'):
+                stats = SearchStats()
+                row, col = ai_function(board, ai_player, stats=stats)
+                logger.info("AI move %s: %s", (row, col), stats)
+            else:
+                row, col = ai_function(board, ai_player)
+            output.write("{} plays {} {}\n".format(STRMAP[ai_player],
+                                                   row + 1, col + 1))
+        else:
+            move = None
+            while move is None:
+                try:
+                    text = read("{} to move (row col, q to quit): ".format(
+                        STRMAP[human_player]))
+                except EOFError:
+                    return None
+                if text.strip().lower() in ('q', 'quit'):
+                    return None
+                move = parse_move(text, board)
+                if move is None:
+                    output.write("Enter the row and column of an empty "
+                                 "square, numbered from 1.\n")
+            row, col = move
+
+        board.move(row, col, turn)
+        turn = switch_player(turn)
+
+    winner = board.check_win()
+    output.write("\n" + str(board) + "\n" + RESULT_MESSAGES[winner] + "\n")
+    return winner